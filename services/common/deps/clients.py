@@ -1,14 +1,144 @@
+import asyncio
 import logging
+import importlib.util
+from typing import Dict, List, Optional, Set
+
 import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from common.models.exchanges import Exchange, ExchangeCredential
+from common.deps.config import settings
+
+log = logging.getLogger(__name__)
+
+# дефолтні публічні REST-ендпоінти, якщо біржа ще не сконфігурована з БД
+DEFAULT_PUBLIC_URLS: Dict[str, str] = {
+    "BINANCE": "https://api.binance.com",
+    "KRAKEN": "https://api.kraken.com",
+}
+DEFAULT_TIMEOUT_MS = 10000
+
+# =========================
+# HTTP client registry (один пул на біржу)
+# =========================
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+# клієнти, замінені після зміни конфігурації біржі: закриваються після grace-паузи
+# (подвоєний таймаут — запити, що ще в польоті, встигнуть завершитись) або при shutdown
+_retired_clients: List[httpx.AsyncClient] = []
+_retire_tasks: Set[asyncio.Task] = set()
+
+
+def _http2_enabled() -> bool:
+    if not settings.HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        log.warning("⚠️ HTTP2_ENABLED=true, але пакет h2 не встановлено → використовую HTTP/1.1")
+        return False
+    return True
+
+
+def _build_http_client(base_url: str, timeout_ms: Optional[int]) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=httpx.Timeout((timeout_ms or DEFAULT_TIMEOUT_MS) / 1000),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SEC,
+        ),
+        http2=_http2_enabled(),
+    )
+
+
+def _retire(client: httpx.AsyncClient) -> None:
+    _retired_clients.append(client)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # поза event loop — закриється в close_http_clients
+        return
+    grace = 2 * max(t for t in (client.timeout.connect, client.timeout.read, client.timeout.pool, 1.0) if t)
+    task = loop.create_task(_close_retired(client, grace))
+    _retire_tasks.add(task)
+    task.add_done_callback(_retire_tasks.discard)
+
+
+async def _close_retired(client: httpx.AsyncClient, grace: float) -> None:
+    await asyncio.sleep(grace)
+    if client in _retired_clients:
+        _retired_clients.remove(client)
+    try:
+        await client.aclose()
+        log.debug(f"🔌 Retired HTTP pool closed → {client.base_url}")
+    except Exception as e:
+        log.warning(f"⚠️ Failed to close retired HTTP client {client.base_url}: {e}")
+
+
+def get_http_client(exchange_code: str) -> httpx.AsyncClient:
+    """
+    Повертає довгоживучий httpx.AsyncClient для біржі (keep-alive пул).
+    Якщо біржу ще не сконфігуровано через configure_http_client — створює клієнт
+    з дефолтним публічним base_url.
+    """
+    key = exchange_code.upper()
+    client = _http_clients.get(key)
+    if client is None or client.is_closed:
+        base_url = DEFAULT_PUBLIC_URLS.get(key)
+        if not base_url:
+            raise ValueError(f"No HTTP client configured for {exchange_code}")
+        client = _build_http_client(base_url, DEFAULT_TIMEOUT_MS)
+        _http_clients[key] = client
+        log.info(f"🔌 HTTP pool created for {key} → {base_url}")
+    return client
+
+
+def configure_http_client(exchange: Exchange) -> Optional[httpx.AsyncClient]:
+    """
+    Створює (або перевикористовує) клієнт біржі з base_url та request_timeout_ms з таблиці exchanges.
+    Клієнт перебудовується лише якщо змінились base_url чи таймаут.
+    """
+    key = exchange.code.upper()
+    base_url = (
+        getattr(exchange, "base_url_private", None)
+        or getattr(exchange, "base_url_public", None)
+        or DEFAULT_PUBLIC_URLS.get(key)
+    )
+    if not base_url:
+        log.warning(f"⚠️ У {exchange.code} не задано base_url у таблиці exchanges")
+        return None
+
+    timeout = httpx.Timeout((exchange.request_timeout_ms or DEFAULT_TIMEOUT_MS) / 1000)
+    client = _http_clients.get(key)
+    if client is not None and not client.is_closed:
+        if str(client.base_url).rstrip("/") == base_url.rstrip("/") and client.timeout == timeout:
+            return client
+        _retire(client)
+
+    client = _build_http_client(base_url, exchange.request_timeout_ms)
+    _http_clients[key] = client
+    log.info(f"🔌 HTTP pool configured for {key} → {base_url} (timeout={timeout.read}s)")
+    return client
+
+
+async def close_http_clients() -> None:
+    """Закриває всі пули (викликається з FastAPI lifespan при shutdown)."""
+    for task in list(_retire_tasks):
+        task.cancel()
+    clients = list(_http_clients.values()) + _retired_clients
+    _http_clients.clear()
+    _retired_clients.clear()
+    for client in clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            log.warning(f"⚠️ Failed to close HTTP client {client.base_url}: {e}")
+    log.info(f"🔌 Closed {len(clients)} HTTP pools")
 
 
 async def get_exchange_client(session: AsyncSession, exchange: Exchange):
     """
     Універсальний клієнт для будь-якої біржі.
-    Будує httpx.AsyncClient з base_url з таблиці exchange + креденшли.
+    Бере спільний httpx.AsyncClient з реєстру (base_url з таблиці exchange) + креденшли.
     """
     res = await session.execute(
         select(ExchangeCredential)
@@ -23,9 +153,8 @@ async def get_exchange_client(session: AsyncSession, exchange: Exchange):
         logging.warning(f"⚠️ Немає сервісного акаунту для {exchange.code}")
         return None
 
-    base_url = getattr(exchange, "base_url_private", None) or getattr(exchange, "base_url_public", None)
-    if not base_url:
-        logging.warning(f"⚠️ У {exchange.code} не задано base_url у таблиці exchanges")
+    http = configure_http_client(exchange)
+    if http is None:
         return None
 
     client = {
@@ -34,7 +163,7 @@ async def get_exchange_client(session: AsyncSession, exchange: Exchange):
         "api_key": cred.api_key,
         "api_secret": cred.api_secret,
         "api_passphrase": cred.api_passphrase,
-        "http": httpx.AsyncClient(base_url=base_url)
+        "http": http,
     }
 
     return client
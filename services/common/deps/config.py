@@ -8,6 +8,15 @@ class BaseSettings:
     POSTGRES_PORT: int = int(os.getenv("POSTGRES_PORT", "5432"))
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "trade")
 
+    # in-memory кеш резолву exchange/symbol ID (common.utils.symbol_cache)
+    SYMBOL_CACHE_TTL_SEC: int = int(os.getenv("SYMBOL_CACHE_TTL_SEC") or "3600")
+
+    # HTTP пули до бірж (common.deps.clients)
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    HTTP_POOL_MAX_CONNECTIONS: int = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS") or "50")
+    HTTP_POOL_MAX_KEEPALIVE: int = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE") or "20")
+    HTTP_KEEPALIVE_EXPIRY_SEC: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SEC") or "60")
+
     @property
     def POSTGRES_DSN(self) -> str:
         return (
@@ -15,6 +24,14 @@ class BaseSettings:
             f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def POSTGRES_SYNC_DSN(self) -> str:
+        # синхронний драйвер для бібліотек без async (APScheduler SQLAlchemyJobStore)
+        return (
+            f"postgresql+psycopg2://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}"
+            f"@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
+        )
+
     def dict(self) -> dict:
         data = {}
         for name in dir(self.__class__):
@@ -33,6 +50,8 @@ class CoreNewsSettings(BaseSettings):
 
     UPDATE_NEWS_PRICES_INTERVAL_HOURS: int = int(os.getenv("UPDATE_NEWS_PRICES_INTERVAL_HOURS") or "4")
     FETCH_NEWS_INTERVAL_MIN: int = int(os.getenv("FETCH_NEWS_INTERVAL_MIN") or "15")
+    # наскільки далеко від моменту шукати найближчу ціну (межа дає відсікання партицій price_history)
+    NEWS_PRICE_LOOKUP_WINDOW_HOURS: int = int(os.getenv("NEWS_PRICE_LOOKUP_WINDOW_HOURS") or "24")
 
     NEWS_PARAMS: Dict = json.loads(os.getenv("NEWS_PARAMS", """
     {
@@ -101,5 +120,124 @@ class CoreBoardSettings(BaseSettings):
     FETCH_PRICE_INTERVAL_MIN: int = int(os.getenv("FETCH_PRICE_INTERVAL_MIN", "10"))
 class CoreFetchSettings(BaseSettings):
     FETCH_PRICE_INTERVAL_MIN: int = int(os.getenv("FETCH_PRICE_INTERVAL_MIN") or "10")
+
+    # паралельний fetch під rate-limit бюджетом біржі
+    FETCH_CONCURRENCY: int = int(os.getenv("FETCH_CONCURRENCY") or "16")
+    RATE_LIMIT_SAFETY: float = float(os.getenv("RATE_LIMIT_SAFETY") or "0.8")
+    RATE_LIMIT_BURST_SEC: float = float(os.getenv("RATE_LIMIT_BURST_SEC") or "5")
+    RATE_LIMIT_RELOAD_SEC: int = int(os.getenv("RATE_LIMIT_RELOAD_SEC") or "600")
+    RATE_LIMIT_DEFAULT_BACKOFF_SEC: float = float(os.getenv("RATE_LIMIT_DEFAULT_BACKOFF_SEC") or "60")
+
+    # circuit breaker на (біржа, ендпоінт) і обмежені ретраї з backoff + jitter
+    CB_WINDOW: int = int(os.getenv("CB_WINDOW") or "20")
+    CB_MIN_CALLS: int = int(os.getenv("CB_MIN_CALLS") or "5")
+    CB_FAILURE_RATE: float = float(os.getenv("CB_FAILURE_RATE") or "0.5")
+    CB_OPEN_SEC: float = float(os.getenv("CB_OPEN_SEC") or "30")
+    CB_OPEN_MAX_SEC: float = float(os.getenv("CB_OPEN_MAX_SEC") or "300")
+    CB_RETRY_BUDGET_MAX: float = float(os.getenv("CB_RETRY_BUDGET_MAX") or "10")
+    CB_RETRY_RATIO: float = float(os.getenv("CB_RETRY_RATIO") or "0.2")
+    HTTP_RETRY_MAX: int = int(os.getenv("HTTP_RETRY_MAX") or "2")
+    HTTP_RETRY_BASE_SEC: float = float(os.getenv("HTTP_RETRY_BASE_SEC") or "0.5")
+
+    # write-behind запис PriceHistory
+    PRICE_WRITER_QUEUE_SIZE: int = int(os.getenv("PRICE_WRITER_QUEUE_SIZE") or "50000")
+    PRICE_WRITER_BATCH_SIZE: int = int(os.getenv("PRICE_WRITER_BATCH_SIZE") or "2000")
+    PRICE_WRITER_FLUSH_SEC: float = float(os.getenv("PRICE_WRITER_FLUSH_SEC") or "2")
+    PRICE_WRITER_USE_COPY: bool = os.getenv("PRICE_WRITER_USE_COPY", "true").lower() == "true"
+    # після стількох помилок COPY підряд writer пише через INSERT протягом cooldown, потім знову пробує COPY
+    PRICE_WRITER_COPY_MAX_FAILURES: int = int(os.getenv("PRICE_WRITER_COPY_MAX_FAILURES") or "3")
+    PRICE_WRITER_COPY_COOLDOWN_SEC: float = float(os.getenv("PRICE_WRITER_COPY_COOLDOWN_SEC") or "300")
+
+    # deadband-компресія тиків перед записом (off | absolute | relative | tick).
+    # За замовчуванням off, а з STREAMING_ENABLED — tick з VALUE=1: miniTicker по всіх символах
+    # дає ~1 тик/с на символ, без компресії це ~86 400 рядків price_history на символ за добу
+    PRICE_DEADBAND_MODE: str = (
+        os.getenv("PRICE_DEADBAND_MODE")
+        or ("tick" if os.getenv("STREAMING_ENABLED", "false").lower() == "true" else "off")
+    ).lower()
+    PRICE_DEADBAND_VALUE: float = float(os.getenv("PRICE_DEADBAND_VALUE") or ("1" if PRICE_DEADBAND_MODE == "tick" else "0"))
+    PRICE_DEADBAND_HEARTBEAT_SEC: float = float(os.getenv("PRICE_DEADBAND_HEARTBEAT_SEC") or "300")
+
+    # безперервна агрегація тиків у OHLCV свічки по Timeframe
+    CANDLES_ENABLED: bool = os.getenv("CANDLES_ENABLED", "true").lower() == "true"
+    CANDLE_FLUSH_SEC: float = float(os.getenv("CANDLE_FLUSH_SEC") or "5")
+    CANDLE_TIMEFRAME_REFRESH_SEC: int = int(os.getenv("CANDLE_TIMEFRAME_REFRESH_SEC") or "300")
+
+    # бекфіл історичних klines у price_candles
+    BACKFILL_CONCURRENCY: int = int(os.getenv("BACKFILL_CONCURRENCY") or "4")
+    # глибина за замовчуванням, якщо в Timeframe не задано history_limit
+    BACKFILL_DEFAULT_CANDLES: int = int(os.getenv("BACKFILL_DEFAULT_CANDLES") or "1000")
+    # автоматичний бекфіл символів, доданих refresh_symbols
+    BACKFILL_NEW_SYMBOLS: bool = os.getenv("BACKFILL_NEW_SYMBOLS", "false").lower() == "true"
+
+    # партиції price_history: RANGE по timestamp, day / month
+    PRICE_HISTORY_PARTITION: str = os.getenv("PRICE_HISTORY_PARTITION", "month").lower()
+    # скільки партицій наперед тримати створеними
+    PRICE_HISTORY_PARTITIONS_AHEAD: int = int(os.getenv("PRICE_HISTORY_PARTITIONS_AHEAD") or "2")
+    # 0 — зберігати все; інакше партиції, старші за retention, від'єднуються (detach) або видаляються (drop)
+    PRICE_HISTORY_RETENTION_DAYS: int = int(os.getenv("PRICE_HISTORY_RETENTION_DAYS") or "0")
+    PRICE_HISTORY_RETENTION_ACTION: str = os.getenv("PRICE_HISTORY_RETENTION_ACTION", "drop").lower()
+    PARTITION_MAINTENANCE_SEC: int = int(os.getenv("PARTITION_MAINTENANCE_SEC") or "3600")
+
+    # ring buffer останніх тиків на символ для /prices/latest і /prices/recent; 0 — вимкнено
+    PRICE_BUFFER_SIZE: int = int(os.getenv("PRICE_BUFFER_SIZE") or "256")
+
+    # tiered retention: "raw=7d,1m=90d,1h=0" — сирі тики 7 днів, далі 1m OHLC 90 днів, 1h назавжди (0);
+    # порожньо — вимкнено. Тири зберігаються в price_rollups, окремо від свічок Timeframe у price_candles
+    PRICE_RETENTION_TIERS: str = os.getenv("PRICE_RETENTION_TIERS", "")
+    PRICE_RETENTION_INTERVAL_SEC: int = int(os.getenv("PRICE_RETENTION_INTERVAL_SEC") or "3600")
+    # rollup іде time-чанками цього розміру, кожен — одна транзакція
+    PRICE_RETENTION_CHUNK_MIN: int = int(os.getenv("PRICE_RETENTION_CHUNK_MIN") or "60")
+    # запізнілі тики: кожен чанк перезгортає ще стільки хвилин під watermark (округлено вгору до
+    # бакета найгрубішого тиру), і сирі дані прибираються лише нижче watermark мінус це вікно
+    PRICE_RETENTION_LATE_GRACE_MIN: int = int(os.getenv("PRICE_RETENTION_LATE_GRACE_MIN") or "60")
+    PRICE_RETENTION_DELETE_BATCH: int = int(os.getenv("PRICE_RETENTION_DELETE_BATCH") or "50000")
+
+    # експорт закритих діб price_history у Parquet (exchange=<CODE>/date=<YYYY-MM-DD>/part.parquet)
+    PRICE_EXPORT_ENABLED: bool = os.getenv("PRICE_EXPORT_ENABLED", "false").lower() == "true"
+    PRICE_EXPORT_DIR: str = os.getenv("PRICE_EXPORT_DIR", "/data/price_archive")
+    PRICE_EXPORT_INTERVAL_SEC: int = int(os.getenv("PRICE_EXPORT_INTERVAL_SEC") or "3600")
+    # скільки останніх діб дописувати; поки доба не в архіві, retention не прибирає її сирі тики
+    PRICE_EXPORT_LOOKBACK_DAYS: int = int(os.getenv("PRICE_EXPORT_LOOKBACK_DAYS") or "3")
+    # доба вважається закритою через стільки хвилин після опівночі UTC (запізнілі тики)
+    PRICE_EXPORT_LAG_MIN: int = int(os.getenv("PRICE_EXPORT_LAG_MIN") or "60")
+    PRICE_EXPORT_BATCH_ROWS: int = int(os.getenv("PRICE_EXPORT_BATCH_ROWS") or "100000")
+
+    # кеш exchangeInfo / AssetPairs, спільний для refresh_symbols/limits/fees
+    METADATA_CACHE_TTL_SEC: int = int(os.getenv("METADATA_CACHE_TTL_SEC") or "900")
+
+    # WebSocket streaming цін (Exchange.ws_public_url)
+    STREAMING_ENABLED: bool = os.getenv("STREAMING_ENABLED", "false").lower() == "true"
+    STREAM_RECONNECT_MIN_SEC: float = float(os.getenv("STREAM_RECONNECT_MIN_SEC") or "1")
+    STREAM_RECONNECT_MAX_SEC: float = float(os.getenv("STREAM_RECONNECT_MAX_SEC") or "60")
+    STREAM_STALE_SEC: float = float(os.getenv("STREAM_STALE_SEC") or "60")
+    STREAM_SYMBOL_SYNC_SEC: int = int(os.getenv("STREAM_SYMBOL_SYNC_SEC") or "300")
+
+    # APScheduler: персистентний jobstore (apscheduler_jobs) і м'який старт після рестарту
+    SCHEDULER_JOBSTORE: str = os.getenv("SCHEDULER_JOBSTORE", "sqlalchemy")   # sqlalchemy | memory
+    SCHEDULER_MISFIRE_GRACE_SEC: int = int(os.getenv("SCHEDULER_MISFIRE_GRACE_SEC") or "300")
+    SCHEDULER_STARTUP_SPREAD_SEC: int = int(os.getenv("SCHEDULER_STARTUP_SPREAD_SEC") or "300")
+    # version-polling змін exchanges/settings для live-перезавантаження job-ів (0 = вимкнено)
+    SCHEDULER_RELOAD_SEC: int = int(os.getenv("SCHEDULER_RELOAD_SEC") or "30")
+    # рознесення job-ів по фазі інтервалу + jitter, глобальні ліміти одночасних job-ів по типу
+    SCHEDULER_JITTER_SEC: int = int(os.getenv("SCHEDULER_JITTER_SEC") or "10")
+    SCHEDULER_MAX_PRICE_JOBS: int = int(os.getenv("SCHEDULER_MAX_PRICE_JOBS") or "4")
+    SCHEDULER_MAX_REFRESH_JOBS: int = int(os.getenv("SCHEDULER_MAX_REFRESH_JOBS") or "1")
+
+    # шардинг роботи між репліками (lease-таблиця core_fetch_replicas + rendezvous hashing)
+    SHARDING_ENABLED: bool = os.getenv("SHARDING_ENABLED", "false").lower() == "true"
+    SHARD_HEARTBEAT_SEC: int = int(os.getenv("SHARD_HEARTBEAT_SEC") or "10")
+    SHARD_LEASE_SEC: int = int(os.getenv("SHARD_LEASE_SEC") or "30")
+    SHARD_SYMBOL_SHARDS: int = int(os.getenv("SHARD_SYMBOL_SHARDS") or "64")
+
+    # адаптивна частота полінгу по символах
+    POLL_PLANNER_ENABLED: bool = os.getenv("POLL_PLANNER_ENABLED", "true").lower() == "true"
+    POLL_QUOTE_ASSETS: str = os.getenv("POLL_QUOTE_ASSETS", "")   # напр. "USDT,USDC,BTC"; порожньо = всі
+    POLL_WARM_EVERY: int = int(os.getenv("POLL_WARM_EVERY") or "3")
+    POLL_COLD_EVERY: int = int(os.getenv("POLL_COLD_EVERY") or "10")
+    POLL_HOT_VOLATILITY: float = float(os.getenv("POLL_HOT_VOLATILITY") or "0.01")
+    POLL_WARM_VOLATILITY: float = float(os.getenv("POLL_WARM_VOLATILITY") or "0.002")
+    POLL_VOLATILITY_ALPHA: float = float(os.getenv("POLL_VOLATILITY_ALPHA") or "0.2")
+    POLL_DEMAND_REFRESH_SEC: int = int(os.getenv("POLL_DEMAND_REFRESH_SEC") or "300")
 class CoreConfigSettings(BaseSettings):
     FETCH_PRICE_INTERVAL_MIN: int = int(os.getenv("FETCH_PRICE_INTERVAL_MIN", "10"))
\ No newline at end of file
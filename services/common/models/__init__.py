@@ -1,6 +1,7 @@
 from .base import Base
-from .markethistory import PriceHistory, NewsSentiment
+from .markethistory import PriceHistory, PriceCandle, PriceRollup, BackfillCheckpoint, RetentionWatermark, NewsSentiment
 from .users import User, Role, Permission, RolePermission
+from .scheduler import CoreFetchReplica
 from .exchanges import *
 from .markethistory import *
 from .scheduler import *
@@ -11,6 +12,6 @@ __all__ = [
     "Base",
     "Exchange", "ExchangeCredential", "ExchangeSymbol",
     "ExchangeFee", "ExchangeLimit", "ExchangeStatusHistory",
-    "PriceHistory", "NewsSentiment", "User", "Role", "Permission",
-    "RolePermission", "Command", "GroupIcon", "Timeframe", "ReasonCode", "TradeProfile", "TradeCondition"
+    "PriceHistory", "PriceCandle", "PriceRollup", "BackfillCheckpoint", "RetentionWatermark", "NewsSentiment", "User", "Role", "Permission",
+    "RolePermission", "CoreFetchReplica", "Command", "GroupIcon", "Timeframe", "ReasonCode", "TradeProfile", "TradeCondition"
 ]
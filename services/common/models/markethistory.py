@@ -1,6 +1,7 @@
 import uuid
 import datetime as dt
 from decimal import Decimal
+from typing import Optional
 from sqlalchemy import (
     BigInteger, Text, Numeric, TIMESTAMP, text,
     Column, String, DateTime, Float, UniqueConstraint
@@ -12,7 +13,33 @@ from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base
 
 class PriceHistory(Base):
+    """
+    Тики цін. core_fetch може писати їх з deadband-компресією (PRICE_DEADBAND_MODE):
+    рядок з'являється лише при зміні ціни понад deadband або раз на heartbeat,
+    тож ряд читається як ступінчастий — ціна в момент t = останній рядок з timestamp ≤ t.
+
+    Таблиця партиційована RANGE по timestamp (день / місяць, PRICE_HISTORY_PARTITION):
+    партиції наперед створює і за retention від'єднує/видаляє PartitionManager core_fetch.
+    Ключ партиціювання мусить входити в PK, тому PK — (id, timestamp).
+
+    Індекси: (symbol_id, timestamp DESC) INCLUDE (price) — пошук найближчої ціни символу
+    index-only scan-ом; BRIN по timestamp — діапазонні скани (рядки пишуться в порядку часу).
+    """
     __tablename__ = "price_history"
+    __table_args__ = (
+        sa.Index(
+            "ix_price_history_symbol_id_timestamp",
+            "symbol_id", sa.desc("timestamp"),
+            postgresql_include=["price"],
+        ),
+        sa.Index(
+            "ix_price_history_timestamp_brin",
+            "timestamp",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
 
     id: Mapped[int] = mapped_column(
         BigInteger, primary_key=True, autoincrement=True
@@ -31,20 +58,150 @@ class PriceHistory(Base):
         PG_UUID(as_uuid=True),
         ForeignKey("exchange_symbols.id", ondelete="CASCADE"),
         nullable=False,
-        index=True
     )
 
     price: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
 
     timestamp: Mapped[dt.datetime] = mapped_column(
         TIMESTAMP(timezone=True),
+        primary_key=True,
         nullable=False,
         server_default=text("now()"),
-        index=True
     )
 
     def __repr__(self) -> str:
         return f"<PriceHistory {self.exchange_id}:{self.symbol_id} {self.price} @ {self.timestamp}>"
+class PriceCandle(Base):
+    """
+    OHLCV свічки по Timeframe.code, агреговані з тиків (core_fetch CandleAggregator)
+    або з бекфілу klines. first_tick_at/last_tick_at потрібні для корекції запізнілих тиків:
+    open/close беруться від найранішого/найпізнішого тику бакета, а не від порядку надходження.
+    """
+    __tablename__ = "price_candles"
+
+    symbol_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("exchange_symbols.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    timeframe: Mapped[str] = mapped_column(Text, primary_key=True)
+    bucket_start: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
+
+    exchange_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("exchanges.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    open: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    # з тикерів обсягу немає — заповнюється лише з klines
+    volume: Mapped[Optional[Decimal]] = mapped_column(Numeric(28, 8), nullable=True)
+    tick_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+
+    first_tick_at: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    last_tick_at: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    def __repr__(self) -> str:
+        return f"<PriceCandle {self.symbol_id} {self.timeframe} {self.bucket_start} O={self.open} C={self.close}>"
+
+
+class PriceRollup(Base):
+    """
+    OHLC тирів tiered retention (PRICE_RETENTION_TIERS), згорнуті з сирих price_history.
+    Окремо від price_candles: коди тирів ("1m", "1h") збігаються з Timeframe.code, а тири
+    мають власний keep — їхнє чищення не повинно зачіпати свічки живої агрегації й бекфілу.
+    """
+    __tablename__ = "price_rollups"
+    __table_args__ = (
+        # retention тирів видаляє по (tier, bucket_start < cutoff)
+        sa.Index("ix_price_rollups_tier_bucket_start", "tier", "bucket_start"),
+    )
+
+    symbol_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("exchange_symbols.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    tier: Mapped[str] = mapped_column(Text, primary_key=True)
+    bucket_start: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), primary_key=True)
+
+    exchange_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("exchanges.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    open: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    high: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    low: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    close: Mapped[Decimal] = mapped_column(Numeric(18, 8), nullable=False)
+    tick_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+
+    first_tick_at: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    last_tick_at: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    def __repr__(self) -> str:
+        return f"<PriceRollup {self.symbol_id} {self.tier} {self.bucket_start} O={self.open} C={self.close}>"
+
+
+class BackfillCheckpoint(Base):
+    """
+    Прогрес бекфілу історичних свічок по (символ, таймфрейм).
+    Все з [range_start, watermark) уже завантажено — перерваний запуск продовжує з watermark.
+    """
+    __tablename__ = "backfill_checkpoints"
+
+    symbol_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("exchange_symbols.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    timeframe: Mapped[str] = mapped_column(Text, primary_key=True)
+    exchange_id: Mapped[uuid.UUID] = mapped_column(
+        PG_UUID(as_uuid=True),
+        ForeignKey("exchanges.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+
+    range_start: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    range_end: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    watermark: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+
+    status: Mapped[str] = mapped_column(Text, nullable=False, server_default=text("'pending'"))
+    candles_loaded: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default=text("0"))
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    def __repr__(self) -> str:
+        return f"<BackfillCheckpoint {self.symbol_id} {self.timeframe} {self.status} @ {self.watermark}>"
+
+
+class RetentionWatermark(Base):
+    """До якого моменту сирі дані джерела (price_history) вже згорнуті в тири price_rollups."""
+    __tablename__ = "retention_watermarks"
+
+    source: Mapped[str] = mapped_column(Text, primary_key=True)
+    rolled_until: Mapped[dt.datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False)
+    updated_at: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default=text("now()")
+    )
+
+    def __repr__(self) -> str:
+        return f"<RetentionWatermark {self.source} @ {self.rolled_until}>"
+
+
 class NewsSentiment(Base):
     __tablename__ = "news_sentiments"
 
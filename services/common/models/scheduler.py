@@ -1,6 +1,7 @@
 # app/models/apscheduler_job.py
+import datetime as dt
 from typing import Optional
-from sqlalchemy import String, Float, LargeBinary
+from sqlalchemy import String, Float, LargeBinary, TIMESTAMP, func
 from sqlalchemy.orm import Mapped, mapped_column
 from .base import Base
 
@@ -14,3 +15,20 @@ class ApschedulerJob(Base):
 
     def __repr__(self) -> str:
         return f"<ApschedulerJob id={self.id} next_run_time={self.next_run_time}>"
+
+
+class CoreFetchReplica(Base):
+    """Lease-рядок живої репліки core_fetch — за ним ділиться робота між подами."""
+    __tablename__ = "core_fetch_replicas"
+
+    replica_id: Mapped[str] = mapped_column(String(191), primary_key=True)
+    hostname: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    started_at: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False
+    )
+    heartbeat_at: Mapped[dt.datetime] = mapped_column(
+        TIMESTAMP(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<CoreFetchReplica id={self.replica_id} heartbeat_at={self.heartbeat_at}>"
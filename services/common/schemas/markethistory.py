@@ -17,6 +17,57 @@ class PriceHistoryOut(PriceHistoryBase):
 
     id: int
     timestamp: datetime
+class PriceCandleOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    symbol_id: UUID
+    exchange_id: UUID
+    timeframe: str
+    bucket_start: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Optional[Decimal] = None
+    tick_count: int
+class PriceSeriesPoint(BaseModel):
+    # tier: "raw" або timeframe тиру; для raw open=high=low=close=price
+    tier: str
+    timestamp: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+class LatestPriceOut(BaseModel):
+    # з in-process ring buffer core_fetch, не з price_history
+    symbol_id: UUID
+    exchange_id: UUID
+    price: float
+    timestamp: datetime
+class RecentPriceOut(BaseModel):
+    timestamp: datetime
+    price: float
+class BackfillRequest(BaseModel):
+    exchange_code: str
+    # біржові symbol_id ("BTCUSDT"); None → усі TRADING символи біржі
+    symbols: Optional[list[str]] = None
+    # Timeframe.code; None → усі таймфрейми біржі, які підтримує її klines API
+    timeframes: Optional[list[str]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+class BackfillCheckpointOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    symbol_id: UUID
+    timeframe: str
+    exchange_id: UUID
+    range_start: datetime
+    range_end: datetime
+    watermark: datetime
+    status: str
+    candles_loaded: int
+    error: Optional[str] = None
+    updated_at: datetime
 class NewsSentimentBase(BaseModel):
     published_at: datetime
     title: str = Field(..., min_length=3, max_length=500)
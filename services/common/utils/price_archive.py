@@ -0,0 +1,156 @@
+"""
+Холодний архів price_history у Parquet:
+
+    <root>/exchange=<CODE>/date=<YYYY-MM-DD>/part.parquet
+
+Один файл — одна біржа за одну добу UTC, рядки відсортовані по (symbol_id, timestamp),
+symbol_id dictionary-encoded. Модуль не залежить від БД: аналітика й бектести читають
+архів напряму через PriceArchive (memory-mapped), не чіпаючи Postgres.
+
+    archive = PriceArchive("/data/price_archive")
+    arrays = archive.read_numpy("BINANCE", start, end, symbol_ids=[btc_id])
+"""
+import os
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+try:
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    from pyarrow import fs as pafs
+except ImportError:  # pyarrow — лише для експорту/читання архіву
+    pa = None
+
+FILE_NAME = "part.parquet"
+COLUMNS = ["symbol_id", "timestamp", "price"]
+
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed: pip install pyarrow")
+
+
+def archive_schema() -> "pa.Schema":
+    require_pyarrow()
+    return pa.schema([
+        pa.field("symbol_id", pa.dictionary(pa.int32(), pa.string())),
+        pa.field("timestamp", pa.timestamp("us", tz="UTC")),
+        # float64 замість Numeric(18, 8): NumPy-арифметика без Decimal-об'єктів
+        pa.field("price", pa.float64()),
+    ])
+
+
+def day_path(root: str, exchange_code: str, day: date) -> str:
+    return os.path.join(root, f"exchange={exchange_code.upper()}", f"date={day.isoformat()}", FILE_NAME)
+
+
+class DayWriter:
+    """Пише добу біржі батчами в тимчасовий файл; close() атомарно публікує його rename-ом."""
+
+    def __init__(self, root: str, exchange_code: str, day: date, row_group_rows: int = 1_000_000):
+        require_pyarrow()
+        self.path = day_path(root, exchange_code, day)
+        # точка на початку — pyarrow.dataset не бачить недописаний файл
+        self.tmp_path = os.path.join(os.path.dirname(self.path), f".{FILE_NAME}.tmp")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.schema = archive_schema()
+        self.row_group_rows = row_group_rows
+        self.rows = 0
+        self._writer = pq.ParquetWriter(self.tmp_path, self.schema, compression="zstd", use_dictionary=["symbol_id"])
+
+    def write(self, symbol_ids: List[str], timestamps: List[datetime], prices: List[float]) -> None:
+        if not symbol_ids:
+            return
+        batch = pa.record_batch(
+            [
+                pa.array(symbol_ids, pa.string()).dictionary_encode(),
+                pa.array(timestamps, pa.timestamp("us", tz="UTC")),
+                pa.array(prices, pa.float64()),
+            ],
+            schema=self.schema,
+        )
+        self._writer.write_batch(batch, row_group_size=self.row_group_rows)
+        self.rows += len(symbol_ids)
+
+    def close(self) -> int:
+        self._writer.close()
+        os.replace(self.tmp_path, self.path)
+        return self.rows
+
+    def abort(self) -> None:
+        try:
+            self._writer.close()
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
+
+
+class PriceArchive:
+    """Читання архіву: predicate pushdown по date-партиціях, timestamp і symbol_id, файли — через mmap."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def has_day(self, exchange_code: str, day: date) -> bool:
+        return os.path.exists(day_path(self.root, exchange_code, day))
+
+    def days(self, exchange_code: str) -> List[date]:
+        base = os.path.join(self.root, f"exchange={exchange_code.upper()}")
+        if not os.path.isdir(base):
+            return []
+        return sorted(
+            date.fromisoformat(name.split("=", 1)[1])
+            for name in os.listdir(base)
+            if name.startswith("date=") and os.path.exists(os.path.join(base, name, FILE_NAME))
+        )
+
+    def read_table(self, exchange_code: str, start: datetime, end: datetime,
+                   symbol_ids: Optional[Iterable[uuid.UUID]] = None, sort: bool = True) -> "pa.Table":
+        """Тики біржі за [start, end) як pyarrow.Table (за потреби лише вказаних символів)."""
+        require_pyarrow()
+        base = os.path.join(self.root, f"exchange={exchange_code.upper()}")
+        if not os.path.isdir(base):
+            return archive_schema().empty_table()
+
+        start, end = start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+        dataset = ds.dataset(
+            base,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive"),
+            filesystem=pafs.LocalFileSystem(use_mmap=True),
+        )
+        ts_type = pa.timestamp("us", tz="UTC")
+        expr = (
+            (ds.field("date") >= start.date().isoformat())
+            & (ds.field("date") <= (end - timedelta(microseconds=1)).date().isoformat())
+            & (ds.field("timestamp") >= pa.scalar(start, ts_type))
+            & (ds.field("timestamp") < pa.scalar(end, ts_type))
+        )
+        if symbol_ids is not None:
+            expr = expr & ds.field("symbol_id").isin([str(s) for s in symbol_ids])
+
+        table = dataset.to_table(columns=COLUMNS, filter=expr)
+        return table.sort_by("timestamp") if sort and table.num_rows else table
+
+    def read_numpy(self, exchange_code: str, start: datetime, end: datetime,
+                   symbol_ids: Optional[Iterable[uuid.UUID]] = None) -> Dict[str, "np.ndarray"]:
+        """
+        {"timestamp": datetime64[us], "price": float64, "symbol_code": int32, "symbols": str}:
+        symbol_code — індекс у symbols (dictionary-кодування без матеріалізації рядків на кожен тик).
+        """
+        table = self.read_table(exchange_code, start, end, symbol_ids).unify_dictionaries().combine_chunks()
+        symbols = table.column("symbol_id")
+        if symbols.num_chunks:
+            encoded = symbols.chunk(0)
+            codes, dictionary = encoded.indices.to_numpy(zero_copy_only=False), encoded.dictionary.to_numpy(zero_copy_only=False)
+        else:
+            codes, dictionary = np.empty(0, dtype=np.int32), np.empty(0, dtype=object)
+        return {
+            "timestamp": table.column("timestamp").to_numpy(),
+            "price": table.column("price").to_numpy(),
+            "symbol_code": codes,
+            "symbols": dictionary,
+        }
@@ -0,0 +1,165 @@
+import time
+import uuid
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.deps.config import settings
+from common.models.exchanges import Exchange, ExchangeSymbol
+
+log = logging.getLogger(__name__)
+
+
+class SymbolResolverCache:
+    """
+    In-memory кеш резолву ID для запису цін:
+      - Exchange.code → Exchange.id
+      - (exchange_id, біржовий symbol_id, напр. "BTCUSDT") → ExchangeSymbol.id
+      - людиночитний symbol ("BTC/USDT") → ExchangeSymbol.id (для core_news)
+      - ExchangeSymbol.id → tick_size (deadband-компресія цін у core_fetch)
+    Прогрівається одним запитом, оновлюється після refresh_symbols,
+    а в інших сервісах — повністю перечитується раз на SYMBOL_CACHE_TTL_SEC.
+    """
+
+    def __init__(self, ttl_sec: int):
+        self.ttl_sec = ttl_sec
+        self.exchange_ids: Dict[str, uuid.UUID] = {}
+        self.symbols: Dict[Tuple[uuid.UUID, str], uuid.UUID] = {}
+        self.by_display: Dict[str, uuid.UUID] = {}
+        self.tick_sizes: Dict[uuid.UUID, Decimal] = {}
+        self.warmed_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = asyncio.Lock()
+
+    # ---------- loading ----------
+    def _expired(self) -> bool:
+        return self.warmed_at is None or time.monotonic() - self.warmed_at > self.ttl_sec
+
+    async def _load(self, session: AsyncSession) -> None:
+        res = await session.execute(select(Exchange.id, Exchange.code))
+        exchange_ids = {code.upper(): ex_id for ex_id, code in res.all()}
+
+        res = await session.execute(
+            select(
+                ExchangeSymbol.id, ExchangeSymbol.exchange_id, ExchangeSymbol.symbol_id,
+                ExchangeSymbol.symbol, ExchangeSymbol.tick_size,
+            )
+        )
+        symbols: Dict[Tuple[uuid.UUID, str], uuid.UUID] = {}
+        by_display: Dict[str, uuid.UUID] = {}
+        tick_sizes: Dict[uuid.UUID, Decimal] = {}
+        for sym_uuid, ex_id, symbol_id, symbol, tick_size in res.all():
+            symbols[(ex_id, symbol_id)] = sym_uuid
+            by_display.setdefault(symbol, sym_uuid)
+            if tick_size:
+                tick_sizes[sym_uuid] = tick_size
+
+        self.exchange_ids = exchange_ids
+        self.symbols = symbols
+        self.by_display = by_display
+        self.tick_sizes = tick_sizes
+        self.warmed_at = time.monotonic()
+        log.info(f"🗂️ Symbol cache warmed: {len(exchange_ids)} exchanges, {len(symbols)} symbols")
+
+    async def warm(self, session: AsyncSession) -> None:
+        """Bulk-завантаження всіх бірж і символів."""
+        async with self._lock:
+            await self._load(session)
+
+    async def _ensure_warm(self, session: AsyncSession) -> None:
+        if not self._expired():
+            return
+        async with self._lock:
+            if self._expired():
+                await self._load(session)
+
+    async def refresh_exchange(self, session: AsyncSession, exchange_id: uuid.UUID) -> None:
+        """Перечитати символи однієї біржі (після upsert у refresh_symbols)."""
+        res = await session.execute(
+            select(ExchangeSymbol.id, ExchangeSymbol.symbol_id, ExchangeSymbol.symbol, ExchangeSymbol.tick_size)
+            .where(ExchangeSymbol.exchange_id == exchange_id)
+        )
+        rows = res.all()
+        async with self._lock:
+            # старі записи біржі (перейменовані, делістнуті, з новим id) не мають пережити refresh
+            stale = {v for k, v in self.symbols.items() if k[0] == exchange_id}
+            self.symbols = {k: v for k, v in self.symbols.items() if k[0] != exchange_id}
+            self.by_display = {k: v for k, v in self.by_display.items() if v not in stale}
+            self.tick_sizes = {k: v for k, v in self.tick_sizes.items() if k not in stale}
+            for sym_uuid, symbol_id, symbol, tick_size in rows:
+                self.symbols[(exchange_id, symbol_id)] = sym_uuid
+                self.by_display[symbol] = sym_uuid
+                if tick_size:
+                    self.tick_sizes[sym_uuid] = tick_size
+        log.debug(f"🗂️ Symbol cache refreshed for {exchange_id}: {len(rows)} symbols")
+
+    def invalidate(self) -> None:
+        """Повне скидання — наступне звернення прогріє кеш заново."""
+        self.warmed_at = None
+
+    # ---------- lookups ----------
+    async def get_exchange_id(self, session: AsyncSession, exchange_code: str) -> Optional[uuid.UUID]:
+        await self._ensure_warm(session)
+        key = exchange_code.upper()
+        ex_id = self.exchange_ids.get(key)
+        if ex_id:
+            self.hits += 1
+            return ex_id
+
+        self.misses += 1
+        res = await session.execute(select(Exchange.id).where(Exchange.code == key))
+        ex_id = res.scalar_one_or_none()
+        if ex_id:
+            self.exchange_ids[key] = ex_id
+        return ex_id
+
+    async def get_symbol_uuid(self, session: AsyncSession, exchange_id: uuid.UUID, symbol_id: str) -> Optional[uuid.UUID]:
+        await self._ensure_warm(session)
+        sym_uuid = self.symbols.get((exchange_id, symbol_id))
+        if sym_uuid:
+            self.hits += 1
+            return sym_uuid
+
+        self.misses += 1
+        res = await session.execute(
+            select(ExchangeSymbol.id).where(
+                ExchangeSymbol.exchange_id == exchange_id,
+                ExchangeSymbol.symbol_id == symbol_id,
+            )
+        )
+        sym_uuid = res.scalar_one_or_none()
+        if sym_uuid:
+            self.symbols[(exchange_id, symbol_id)] = sym_uuid
+        return sym_uuid
+
+    async def get_symbol_uuid_by_display(self, session: AsyncSession, symbol: str) -> Optional[uuid.UUID]:
+        await self._ensure_warm(session)
+        sym_uuid = self.by_display.get(symbol)
+        if sym_uuid:
+            self.hits += 1
+            return sym_uuid
+
+        self.misses += 1
+        res = await session.execute(select(ExchangeSymbol.id).where(ExchangeSymbol.symbol == symbol).limit(1))
+        sym_uuid = res.scalar_one_or_none()
+        if sym_uuid:
+            self.by_display[symbol] = sym_uuid
+        return sym_uuid
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "exchanges": len(self.exchange_ids),
+            "symbols": len(self.symbols),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+        }
+
+
+symbol_cache = SymbolResolverCache(ttl_sec=settings.SYMBOL_CACHE_TTL_SEC)
@@ -0,0 +1,96 @@
+"""
+CLI core_fetch для разових операцій поза сервісом.
+
+    python -m core_fetch.app.cli backfill --exchange BINANCE --symbols BTCUSDT ETHUSDT --timeframes 1h 1d --days 30
+
+--base-url спрямовує запити на інший REST-ендпоінт, не змінюючи таблицю exchanges,
+напр. на локальний fake-сервер klines (core_fetch/tests/fake_exchange.py):
+
+    python -m core_fetch.tests.fake_exchange --port 8081
+    python -m core_fetch.app.cli backfill --exchange BINANCE --days 7 --base-url http://localhost:8081
+
+    python -m core_fetch.app.cli export --exchange BINANCE --start 2026-09-01 --end 2026-09-30
+"""
+import asyncio
+import argparse
+import logging
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+
+from common.deps.clients import close_http_clients
+from core_fetch.app.services.backfill import backfill_engine
+from core_fetch.app.services.price_export import price_exporter
+
+log = logging.getLogger(__name__)
+
+
+def _parse_dt(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+async def _backfill(args: argparse.Namespace) -> int:
+    start = _parse_dt(args.start) if args.start else None
+    end = _parse_dt(args.end) if args.end else None
+    if args.days and start is None:
+        start = (end or datetime.now(timezone.utc)) - timedelta(days=args.days)
+
+    http = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) if args.base_url else None
+    try:
+        state = await backfill_engine.run(
+            args.exchange, symbols=args.symbols, timeframes=args.timeframes, start=start, end=end, http=http,
+        )
+    finally:
+        if http is not None:
+            await http.aclose()
+        await close_http_clients()
+
+    print(
+        f"{state['status']}: {state['candles']} candles, {state['chunks_done']}/{state['chunks']} chunks, "
+        f"{state['pairs']} pairs, {state['duration_sec']}s"
+        + (f", skipped timeframes: {', '.join(state['skipped_timeframes'])}" if state["skipped_timeframes"] else "")
+        + (f", error: {state['error']}" if state.get("error") else "")
+    )
+    return 0 if state["status"] == "done" else 1
+
+
+async def _export(args: argparse.Namespace) -> int:
+    end = date.fromisoformat(args.end) if args.end else datetime.now(timezone.utc).date()
+    start = date.fromisoformat(args.start) if args.start else end
+    results = await price_exporter.export(args.exchange, start, end, force=args.force)
+    for entry in results:
+        print(f"{entry['exchange']} {entry['day']}: {entry['rows']} ticks, {entry['duration_sec']}s")
+    print(f"exported {len(results)} day files to {price_exporter.archive.root}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="core_fetch")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bf = sub.add_parser("backfill", help="Завантажити історичні свічки з klines API біржі в price_candles")
+    bf.add_argument("--exchange", required=True, help="Exchange.code, напр. BINANCE")
+    bf.add_argument("--symbols", nargs="*", help="біржові symbol_id; за замовчуванням усі TRADING")
+    bf.add_argument("--timeframes", nargs="*", help="Timeframe.code; за замовчуванням усі таймфрейми біржі")
+    bf.add_argument("--start", help="ISO datetime (UTC, якщо без зони)")
+    bf.add_argument("--end", help="ISO datetime, за замовчуванням — зараз")
+    bf.add_argument("--days", type=int, help="глибина від --end, якщо не задано --start")
+    bf.add_argument("--base-url", help="інший REST base_url біржі (напр. http://localhost:8081)")
+    bf.add_argument("--timeout", type=float, default=10.0, help="HTTP таймаут у секундах для --base-url")
+    bf.set_defaults(handler=_backfill)
+
+    ex = sub.add_parser("export", help="Експортувати закриті доби price_history у Parquet-архів")
+    ex.add_argument("--exchange", nargs="*", help="Exchange.code; за замовчуванням усі біржі")
+    ex.add_argument("--start", help="перша доба YYYY-MM-DD (UTC)")
+    ex.add_argument("--end", help="остання доба YYYY-MM-DD, за замовчуванням — сьогодні (незакриті пропускаються)")
+    ex.add_argument("--force", action="store_true", help="перезаписати вже експортовані доби")
+    ex.set_defaults(handler=_export)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
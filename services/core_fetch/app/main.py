@@ -1,17 +1,94 @@
-from fastapi import FastAPI
-from .scheduler import start_scheduler
-from core_fetch.app.routers import price_history, jobs
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from .scheduler import start_scheduler, stop_scheduler
+from core_fetch.app.routers import price_history, jobs, candles, backfill, prices
+from core_fetch.app.services.price_writer import price_writer
+from core_fetch.app.services.metadata_cache import metadata_cache
+from core_fetch.app.services.streaming import stream_manager
+from core_fetch.app.services.polling_planner import polling_planner
+from core_fetch.app.services.sharding import coordinator
+from core_fetch.app.services.candles import candle_aggregator
+from core_fetch.app.services.backfill import backfill_engine
+from core_fetch.app.services.partitions import partition_manager
+from core_fetch.app.services.retention import retention_engine
+from core_fetch.app.services.price_export import price_exporter
+from core_fetch.app.services.price_buffers import price_buffers
+from core_fetch.app.services import circuit_breaker, metrics  # noqa: F401 — реєструє колектор
+from common.deps.clients import close_http_clients
+from common.utils.symbol_cache import symbol_cache
 
-app = FastAPI(title="core_fetch")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    partition_manager.start()
+    retention_engine.start()
+    price_exporter.start()
+    price_writer.start()
+    price_buffers.start()
+    polling_planner.start()
+    await candle_aggregator.start()
+    await coordinator.start()
+    start_scheduler()
+    stream_manager.start()
+    yield
+    await stream_manager.stop()
+    stop_scheduler()
+    await backfill_engine.stop()
+    await coordinator.stop()
+    await candle_aggregator.stop()
+    await price_writer.stop()
+    await price_exporter.stop()
+    await retention_engine.stop()
+    await partition_manager.stop()
+    await circuit_breaker.drain()
+    await close_http_clients()
+
+app = FastAPI(title="core_fetch", lifespan=lifespan)
 
 # Register routers
 app.include_router(price_history.router)
 app.include_router(jobs.router)
-
-@app.on_event("startup")
-async def startup_event():
-    start_scheduler()
+app.include_router(candles.router)
+app.include_router(backfill.router)
+app.include_router(prices.router)
 
 @app.get("/health", tags=["system"])
 async def health():
     return {"status": "ok"}
+
+@app.get("/metrics", tags=["system"])
+async def prometheus_metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@app.get("/replicas", tags=["system"])
+async def replicas():
+    return coordinator.stats()
+
+@app.get("/circuits", tags=["system"])
+async def circuits():
+    return circuit_breaker.stats()
+
+@app.get("/partitions", tags=["system"])
+async def partitions():
+    return partition_manager.stats()
+
+@app.get("/retention", tags=["system"])
+async def retention():
+    return retention_engine.stats()
+
+@app.get("/archive", tags=["system"])
+async def archive():
+    return price_exporter.stats()
+
+@app.get("/cache/stats", tags=["system"])
+async def cache_stats():
+    return {
+        "symbols": symbol_cache.stats(),
+        "metadata": metadata_cache.stats(),
+        "polling_tiers": polling_planner.stats(),
+        "price_writer": price_writer.stats(),
+        "deadband": price_writer.deadband.stats(),
+        "candles": candle_aggregator.stats(),
+        "price_buffers": price_buffers.stats(),
+    }
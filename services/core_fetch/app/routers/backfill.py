@@ -0,0 +1,53 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from common.models.exchanges import Exchange
+from common.models.markethistory import BackfillCheckpoint
+from common.schemas.markethistory import BackfillRequest, BackfillCheckpointOut
+from common.deps.db import get_session
+from core_fetch.app.services.backfill import backfill_engine
+
+router = APIRouter(prefix="/backfill", tags=["backfill"])
+
+@router.post("/", status_code=202)
+async def start_backfill(req: BackfillRequest):
+    """
+    Start a background klines backfill into price_candles.
+    Resumes from stored checkpoints; progress via GET /backfill/runs/{run_id}.
+    """
+    run_id = backfill_engine.submit(req.exchange_code, req.symbols, req.timeframes, req.start, req.end)
+    return {"run_id": run_id}
+
+@router.get("/runs")
+async def list_runs():
+    """
+    Recent backfill runs of this replica
+    """
+    return backfill_engine.stats()
+
+@router.get("/runs/{run_id}")
+async def get_run(run_id: str):
+    run = backfill_engine.runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Backfill run not found")
+    return run
+
+@router.get("/checkpoints", response_model=list[BackfillCheckpointOut])
+async def list_checkpoints(
+    exchange_code: Optional[str] = None,
+    status: Optional[str] = Query(None, description="pending / running / done / error"),
+    limit: int = Query(500, ge=1, le=10000),
+    session: AsyncSession = Depends(get_session),
+):
+    query = select(BackfillCheckpoint)
+    if exchange_code:
+        query = query.join(Exchange, Exchange.id == BackfillCheckpoint.exchange_id).where(
+            Exchange.code == exchange_code.upper()
+        )
+    if status:
+        query = query.where(BackfillCheckpoint.status == status)
+    result = await session.execute(query.order_by(BackfillCheckpoint.updated_at.desc()).limit(limit))
+    return result.scalars().all()
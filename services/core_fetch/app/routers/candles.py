@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from common.models.markethistory import PriceCandle
+from common.schemas.markethistory import PriceCandleOut
+from common.deps.db import get_session
+
+router = APIRouter(prefix="/candles", tags=["candles"])
+
+@router.get("/{symbol_id}", response_model=list[PriceCandleOut])
+async def get_candles(
+    symbol_id: UUID,
+    timeframe: str = Query(..., description="Timeframe.code, e.g. 1h"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(500, ge=1, le=10000),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Candles of a symbol for one timeframe, oldest first.
+    Without `start` returns the latest `limit` candles.
+    """
+    query = select(PriceCandle).where(
+        PriceCandle.symbol_id == symbol_id,
+        PriceCandle.timeframe == timeframe,
+    )
+    if start is not None:
+        query = query.where(PriceCandle.bucket_start >= start)
+    if end is not None:
+        query = query.where(PriceCandle.bucket_start < end)
+
+    if start is None:
+        result = await session.execute(query.order_by(PriceCandle.bucket_start.desc()).limit(limit))
+        return list(reversed(result.scalars().all()))
+
+    result = await session.execute(query.order_by(PriceCandle.bucket_start).limit(limit))
+    return result.scalars().all()
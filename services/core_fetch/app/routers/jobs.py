@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from core_fetch.app.scheduler import scheduler
+from core_fetch.app.services.job_gate import job_gate
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
@@ -17,3 +18,10 @@ async def list_jobs():
             "trigger": str(job.trigger),
         })
     return jobs_info
+
+@router.get("/gate")
+async def job_gate_stats():
+    """
+    Active / waiting jobs per type in the global job gate
+    """
+    return job_gate.stats()
@@ -1,23 +1,58 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from common.models.markethistory import PriceHistory
-from common.schemas.markethistory import PriceHistoryCreate, PriceHistoryOut
+from common.schemas.markethistory import PriceHistoryCreate, PriceHistoryOut, PriceSeriesPoint
 from common.deps.db import get_session
+from core_fetch.app.services.retention import retention_engine
 
 router = APIRouter(prefix="/price-history", tags=["price-history"])
 
 @router.get("/", response_model=list[PriceHistoryOut])
-async def get_prices(limit: int = 50, session: AsyncSession = Depends(get_session)):
-    result = await session.execute(
-        select(PriceHistory).order_by(PriceHistory.timestamp.desc()).limit(limit)
-    )
+async def get_prices(
+    limit: int = Query(50, ge=1, le=10000),
+    symbol_id: Optional[UUID] = None,
+    since: Optional[datetime] = Query(None, description="lower bound; defaults to the last hour"),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Latest prices, newest first.
+    The time bound keeps the scan on the newest partition (BRIN on timestamp);
+    with `symbol_id` it is served by the (symbol_id, timestamp DESC) index.
+    """
+    if since is None:
+        since = datetime.now(timezone.utc) - timedelta(hours=1)
+    query = select(PriceHistory).where(PriceHistory.timestamp >= since)
+    if symbol_id is not None:
+        query = query.where(PriceHistory.symbol_id == symbol_id)
+    result = await session.execute(query.order_by(PriceHistory.timestamp.desc()).limit(limit))
     return result.scalars().all()
 
+@router.get("/series/{symbol_id}", response_model=list[PriceSeriesPoint])
+async def get_price_series(
+    symbol_id: UUID,
+    start: datetime,
+    end: Optional[datetime] = None,
+    limit: int = Query(10000, ge=1, le=100000),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Price series of a symbol over [start, end), oldest first.
+    Ranges past raw retention are read transparently from the coarser tiers
+    (PRICE_RETENTION_TIERS); each point carries the tier it came from.
+    """
+    return await retention_engine.read_series(session, symbol_id, start, end or datetime.now(timezone.utc), limit)
+
 @router.get("/{price_id}", response_model=PriceHistoryOut)
 async def get_price(price_id: int, session: AsyncSession = Depends(get_session)):
-    db_price = await session.get(PriceHistory, price_id)
+    # PK партиційованої таблиці — (id, timestamp), тож session.get за самим id не працює
+    result = await session.execute(select(PriceHistory).where(PriceHistory.id == price_id).limit(1))
+    db_price = result.scalar_one_or_none()
     if not db_price:
         raise HTTPException(status_code=404, detail="Price not found")
     return db_price
@@ -0,0 +1,30 @@
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import APIRouter, HTTPException, Query
+
+from common.schemas.markethistory import LatestPriceOut, RecentPriceOut
+from core_fetch.app.services.price_buffers import price_buffers
+
+router = APIRouter(prefix="/prices", tags=["prices"])
+
+@router.get("/latest", response_model=list[LatestPriceOut])
+async def get_latest_prices(
+    symbol_id: Optional[List[UUID]] = Query(None, description="repeat for bulk; omit for all buffered symbols"),
+):
+    """
+    Latest price per symbol from the in-process ring buffers, no DB access.
+    Symbols without ticks on this replica are omitted.
+    """
+    return price_buffers.latest_many(symbol_id)
+
+@router.get("/recent/{symbol_id}", response_model=list[RecentPriceOut])
+async def get_recent_prices(
+    symbol_id: UUID,
+    limit: int = Query(100, ge=1, le=10000),
+):
+    """Last ticks of a symbol from the ring buffer, newest first (at most PRICE_BUFFER_SIZE)."""
+    points = price_buffers.recent(symbol_id, limit)
+    if points is None:
+        raise HTTPException(status_code=404, detail="No buffered ticks for symbol")
+    return points
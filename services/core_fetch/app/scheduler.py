@@ -1,18 +1,35 @@
 import os
+import time
+import zlib
 import asyncio
 import logging
 import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy import select
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.jobstores.memory import MemoryJobStore
+from sqlalchemy import select, func
 from core_fetch.app.services.universal_fetcher import (
-    fetch_and_store_price, refresh_symbols,
+    fetch_and_store_price, fetch_and_store_prices_bulk, refresh_symbols,
     refresh_limits, refresh_fees
 )
+from core_fetch.app.services.adapters import require_adapter
+from core_fetch.app.services.streaming import stream_manager
+from core_fetch.app.services.polling_planner import polling_planner
+from core_fetch.app.services.fetch_engine import run_concurrent
+from core_fetch.app.services.metadata_cache import metadata_cache
+from core_fetch.app.services import rate_limiter
+from core_fetch.app.services.job_gate import job_gate
+from core_fetch.app.services.circuit_breaker import CircuitOpenError
+from core_fetch.app.services import metrics
+from core_fetch.app.services.sharding import coordinator
 from common.deps.session import SessionLocal
-from common.models.exchanges import Exchange, ExchangeSymbol
+from common.models.exchanges import Exchange, ExchangeSymbol, ExchangeCredential
 from common.models import ExchangeStatusHistory
 from common.deps.clients import get_exchange_client
 from common.utils.config_resolver import ConfigResolver
+from common.utils.symbol_cache import symbol_cache
 from common.deps.config import CoreFetchSettings
 settings = CoreFetchSettings()
 SERVICE_NAME = os.getenv("SERVICE_NAME", "core-fetch")
@@ -20,34 +37,150 @@ resolver = ConfigResolver(SERVICE_NAME, settings.dict(), extra_service_names=[f"
 
 log = logging.getLogger(__name__)
 
+# скільки відхилених біржею пар перелічувати в ExchangeStatusHistory.message циклу цін
+REJECTED_REPORTED = 10
+
+def _build_jobstore():
+    if settings.SCHEDULER_JOBSTORE == "memory":
+        return MemoryJobStore()
+    if settings.SHARDING_ENABLED:
+        # APScheduler 3 не координує кілька планувальників на одному jobstore: due job
+        # забирає той, хто встиг, і частки інших реплік пропускались би. Кожна репліка
+        # тримає повний розклад у пам'яті (фази детерміновані, тож він однаковий після рестарту),
+        # а у момент запуску виконує лише свою частку.
+        log.info("ℹ️ SHARDING_ENABLED: using per-replica memory jobstore")
+        return MemoryJobStore()
+    # та сама таблиця, яку показує core_admin (/scheduler/jobs)
+    return SQLAlchemyJobStore(url=settings.POSTGRES_SYNC_DSN, tablename="apscheduler_jobs")
+
+
 # Make scheduler global
-scheduler = AsyncIOScheduler()
+scheduler = AsyncIOScheduler(
+    jobstores={"default": _build_jobstore()},
+    job_defaults={
+        # після простою пропущені запуски зливаються в один
+        "coalesce": True,
+        "max_instances": 1,
+        "misfire_grace_time": settings.SCHEDULER_MISFIRE_GRACE_SEC,
+    },
+)
+
+REFRESH_JOBS = {
+    "symbols": refresh_symbols,
+    "limits": refresh_limits,
+    "fees": refresh_fees,
+}
+
+
+async def run_exchange_refresh(kind: str, exchange_id: uuid.UUID) -> None:
+    """
+    Точка входу persisted refresh-job-ів.
+    В jobstore пишуться лише (kind, exchange_id): клієнт з httpx-пулом і креденшлами
+    не серіалізується, тому резолвиться на кожному запуску.
+    """
+    if not coordinator.owns_exchange(exchange_id):
+        log.debug(f"🧩 {kind} refresh for {exchange_id} belongs to {coordinator.owner(f'exchange:{exchange_id}')}")
+        return
+    async with SessionLocal() as session:
+        ex = await session.get(Exchange, exchange_id)
+        if ex is None:
+            log.warning(f"⚠️ {kind} refresh: exchange {exchange_id} no longer exists")
+            return
+        client = await get_exchange_client(session, ex)
+    if not client:
+        log.warning(f"⚠️ Skipping {kind} refresh for {ex.code}, no client")
+        return
+    async with job_gate.slot("refresh"):
+        started = time.monotonic()
+        try:
+            await REFRESH_JOBS[kind](client, exchange_id)
+        finally:
+            _observe_cycle(kind, ex.code, time.monotonic() - started)
 
 async def fetch_and_store_exchange_prices(exchange_code: str, exchange_id: uuid.UUID) -> None:
     """Fetch latest prices for all active symbols of a given exchange."""
+    if stream_manager.is_healthy(exchange_id):
+        # ціни вже йдуть через WebSocket — REST-цикл не витрачає бюджет запитів
+        log.info(f"📡 {exchange_code} prices are streaming, skipping REST cycle")
+        return
+
+    async with job_gate.slot("prices"):
+        started = time.monotonic()
+        try:
+            await _fetch_exchange_prices(exchange_code, exchange_id)
+        finally:
+            _observe_cycle("prices", exchange_code, time.monotonic() - started)
+
+
+def _rejected_summary(rejected: Dict[str, str]) -> str:
+    shown = ", ".join(f"{code} ({err})" for code, err in list(rejected.items())[:REJECTED_REPORTED])
+    extra = len(rejected) - REJECTED_REPORTED
+    return shown + (f" and {extra} more" if extra > 0 else "")
+
+
+def _observe_cycle(job: str, exchange_code: str, duration: float) -> None:
+    metrics.CYCLE_DURATION.labels(job, exchange_code).observe(duration)
+    metrics.CYCLE_LAST_DURATION.labels(job, exchange_code).set(duration)
+
+
+async def _fetch_exchange_prices(exchange_code: str, exchange_id: uuid.UUID) -> None:
     try:
         async with SessionLocal() as session:
             res = await session.execute(
-                select(ExchangeSymbol.symbol_id)
+                select(ExchangeSymbol.symbol_id, ExchangeSymbol.symbol, ExchangeSymbol.quote_asset, ExchangeSymbol.id)
                 .where(
                     ExchangeSymbol.exchange_id == exchange_id,
                     ExchangeSymbol.status == "TRADING"
                 )
             )
-            symbols = [row[0] for row in res.all()]
+            # при шардингу — лише шарди цієї репліки, крім тих, що вже йдуть через живий стрім
+            streamed = stream_manager.streamed_symbols(exchange_id)
+            rows = [
+                row for row in res.all()
+                if coordinator.owns_symbol(exchange_id, row[0]) and row[3] not in streamed
+            ]
+        if not rows:
+            log.info(f"📡 {exchange_code}: no owned pairs left for REST polling, skipping cycle")
+            return
+
+        # лише символи, чий tier (попит / волатильність / quote asset) припадає на цей цикл
+        symbols = await polling_planner.select_due(exchange_id, rows)
 
-        log.info(f"💰 Fetching prices for {exchange_code}: {len(symbols)} pairs")
+        # найдешевша стратегія за заявленими можливостями адаптера біржі
+        strategy = require_adapter(exchange_code).price_strategy(len(symbols))
+        log.info(
+            f"💰 Fetching prices for {exchange_code}: {len(symbols)}/{len(rows)} pairs due ({strategy}), "
+            f"tiers={polling_planner.stats().get(str(exchange_id))}"
+        )
 
         ok_count = 0
         fail_count = 0
+        short_circuited = 0
+        # пари, які біржа явно відхилила (bulk): symbol_id → помилка біржі
+        rejected: Dict[str, str] = {}
 
-        for symbol_id in symbols:
-            try:
-                await fetch_and_store_price(exchange_code, symbol_id)
-                ok_count += 1
-            except Exception as e:
-                fail_count += 1
-                log.error(f"❌ {exchange_code}:{symbol_id} failed: {e}")
+        if strategy == "bulk":
+            # bulk mode: один знімок біржі → один batch ticks
+            ok_count, missing = await fetch_and_store_prices_bulk(exchange_code, exchange_id, symbols, rejected)
+            fail_count = len(missing)
+            if missing:
+                log.warning(f"⚠️ {exchange_code}: no price in snapshot for {len(missing)} pairs (e.g. {missing[:5]})")
+        else:
+            # fallback: по одному запиту на символ, паралельно в межах rate-limit бюджету
+            ok_count, failures = await run_concurrent(
+                exchange_code,
+                symbols.keys(),
+                lambda symbol_id: fetch_and_store_price(exchange_code, symbol_id),
+            )
+            fail_count = len(failures)
+            short_circuited = sum(1 for _, e in failures if isinstance(e, CircuitOpenError))
+
+        if fail_count == 0:
+            status = "ok"
+        elif short_circuited and ok_count == 0:
+            status = "circuit_open"
+        else:
+            status = "partial"
 
         # aggregated log
         async with SessionLocal() as session:
@@ -55,13 +188,34 @@ async def fetch_and_store_exchange_prices(exchange_code: str, exchange_id: uuid.
                 ExchangeStatusHistory(
                     exchange_id=exchange_id,
                     event="price_fetch",
-                    status="ok" if fail_count == 0 else "partial",
-                    message=f"Fetched prices for {exchange_code}: {ok_count} ok, {fail_count} failed",
+                    status=status,
+                    message=(
+                        f"Fetched prices for {exchange_code}: {ok_count} ok, {fail_count} failed"
+                        + (f" ({short_circuited} short-circuited)" if short_circuited else "")
+                        + (f"; rejected: {_rejected_summary(rejected)}" if rejected else "")
+                    ),
                 )
             )
             await session.commit()
 
-        log.info(f"✅ {exchange_code} prices done: {ok_count} ok, {fail_count} failed")
+        for result, value in (("due", len(symbols)), ("ok", ok_count), ("failed", fail_count), ("short_circuited", short_circuited)):
+            metrics.CYCLE_SYMBOLS.labels(exchange_code, result).set(value)
+        metrics.SYMBOLS_FETCHED.labels(exchange_code, "ok").inc(ok_count)
+        metrics.SYMBOLS_FETCHED.labels(exchange_code, "failed").inc(fail_count)
+        log.info(f"✅ {exchange_code} prices done: {ok_count} ok, {fail_count} failed, {short_circuited} short-circuited")
+
+    except CircuitOpenError as e:
+        log.warning(f"🔌 {exchange_code} price cycle short-circuited: {e}")
+        async with SessionLocal() as session:
+            session.add(
+                ExchangeStatusHistory(
+                    exchange_id=exchange_id,
+                    event="price_fetch",
+                    status="circuit_open",
+                    message=str(e),
+                )
+            )
+            await session.commit()
 
     except Exception as e:
         log.exception(f"❌ fetch_and_store_exchange_prices error for {exchange_code}: {e}")
@@ -76,64 +230,217 @@ async def fetch_and_store_exchange_prices(exchange_code: str, exchange_id: uuid.
             )
             await session.commit()
 
-async def load_jobs(scheduler: AsyncIOScheduler):
+def _startup_offset(job_id: str, window_sec: int) -> timedelta:
+    """Стабільний зсув у межах вікна — щоб job-и різних бірж не стартували одночасно."""
+    if window_sec <= 0:
+        return timedelta(0)
+    return timedelta(seconds=zlib.crc32(job_id.encode()) % window_sec)
+
+
+# спільний якір для фаз: розклад однаковий після рестартів і на всіх репліках
+PHASE_ANCHOR = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _phase_start(kind: str, exchange_id: uuid.UUID, minutes: int) -> datetime:
+    """Детермінований зсув (kind, біржа) всередині інтервалу замість спільної межі хвилини."""
+    interval_sec = max(int(minutes) * 60, 1)
+    return PHASE_ANCHOR + timedelta(seconds=zlib.crc32(f"{kind}:{exchange_id}".encode()) % interval_sec)
+
+
+def _same_schedule(job, func, minutes: int, args: list, start_date: datetime) -> bool:
+    trigger = job.trigger
+    return (
+        job.func is func
+        and getattr(trigger, "interval", None) == timedelta(minutes=minutes)
+        and getattr(trigger, "start_date", None) == start_date
+        and getattr(trigger, "jitter", None) == (settings.SCHEDULER_JITTER_SEC or None)
+        and list(job.args) == list(args)
+    )
+
+
+async def sync_jobs(scheduler: AsyncIOScheduler, startup: bool = False) -> None:
+    """
+    Звіряє jobstore з таблицею exchange (лише активні біржі).
+    Job-и з незмінним розкладом лишаються як є (зберігають next_run_time після рестарту),
+    нові/змінені — стартують у своїй фазі, job-и зниклих/вимкнених бірж — видаляються.
+    На старті прострочені job-и розкидаються по SCHEDULER_STARTUP_SPREAD_SEC замість одночасного старту.
+    Кожен (тип job-у, біржа) має власну фазу в інтервалі + jitter, тож job-и не збігаються на межі хвилини.
+    """
     async with SessionLocal() as session:
-        res = await session.execute(select(Exchange))
+        res = await session.execute(select(Exchange).where(Exchange.is_active == True))
         exchanges = res.scalars().all()
-        log.info(f"📊 Found {len(exchanges)} exchanges in DB")
+        log.info(f"📊 Found {len(exchanges)} active exchanges in DB")
 
+        fetch_interval = await resolver.get_int(session, "FETCH_PRICE_INTERVAL_MIN") or settings.FETCH_PRICE_INTERVAL_MIN
+
+        # job_id → (func, interval у хвилинах, args, фаза, extra kwargs)
+        wanted = {}
         for ex in exchanges:
             log.info(f"➡️ Processing exchange {ex.code} ({ex.name})")
+            # спільний http-клієнт перебудовується лише якщо змінились base_url/timeout
             client = await get_exchange_client(session, ex)
             if not client:
                 log.warning(f"⚠️ Skipping {ex.code}, no client")
                 continue
 
-            scheduler.add_job(
-                refresh_symbols,
-                "interval",
-                minutes=int(ex.fetch_symbols_interval_min),
-                args=[client, ex.id],
-                id=f"symbols_{ex.code}_{ex.id}",
-                replace_existing=True,
-            )
-            scheduler.add_job(
-                refresh_limits,
-                "interval",
-                minutes=int(ex.fetch_limits_interval_min),
-                args=[client, ex.id],
-                id=f"limits_{ex.code}_{ex.id}",
-                replace_existing=True,
-            )
-            scheduler.add_job(
-                refresh_fees,
-                "interval",
-                minutes=int(ex.fetch_fees_interval_min),
-                args=[client, ex.id],
-                id=f"fees_{ex.code}_{ex.id}",
-                replace_existing=True,
+            intervals = {
+                "symbols": int(ex.fetch_symbols_interval_min),
+                "limits": int(ex.fetch_limits_interval_min),
+                "fees": int(ex.fetch_fees_interval_min),
+            }
+            for kind, minutes in intervals.items():
+                wanted[f"{kind}_{ex.code}_{ex.id}"] = (
+                    run_exchange_refresh, minutes, [kind, ex.id], _phase_start(kind, ex.id, minutes), {}
+                )
+            wanted[f"prices_{ex.code}_{ex.id}"] = (
+                fetch_and_store_exchange_prices, int(fetch_interval), [ex.code, ex.id],
+                _phase_start("prices", ex.id, int(fetch_interval)), {"misfire_grace_time": 30},
             )
-            fetch_interval = await resolver.get_int(session, "FETCH_PRICE_INTERVAL_MIN") or settings.FETCH_PRICE_INTERVAL_MIN
-            scheduler.add_job(
-                fetch_and_store_exchange_prices,
-                "interval",
-                minutes=int(fetch_interval),
-                args=[ex.code, ex.id],
-                id=f"prices_{ex.code}_{ex.id}",
-                replace_existing=True,
-                max_instances=1,
-                misfire_grace_time=30,
+
+    now = datetime.now(timezone.utc)
+    spread = settings.SCHEDULER_STARTUP_SPREAD_SEC
+    existing = {job.id: job for job in scheduler.get_jobs()}
+    kept = added = deferred = 0
+
+    for job_id, (func, minutes, args, start_date, extra) in wanted.items():
+        # job_id = f"{kind}_{code}_{exchange_id}"; code може містити "_"
+        kind = job_id.split("_", 1)[0]
+        code = job_id[len(kind) + 1:-(len(str(args[1])) + 1)]
+        metrics.CYCLE_INTERVAL.labels(kind, code).set(minutes * 60)
+        job = existing.get(job_id)
+        if job is not None and _same_schedule(job, func, minutes, args, start_date):
+            kept += 1
+            if startup and job.next_run_time is not None and job.next_run_time <= now:
+                # прострочений за час простою: один (coalesced) запуск, але не всі разом
+                job.modify(next_run_time=now + _startup_offset(job_id, spread))
+                deferred += 1
+            continue
+
+        # перший запуск — найближча фаза job-у після now
+        scheduler.add_job(
+            func,
+            "interval",
+            minutes=minutes,
+            start_date=start_date,
+            jitter=settings.SCHEDULER_JITTER_SEC or None,
+            args=args,
+            id=job_id,
+            replace_existing=True,
+            **extra,
+        )
+        added += 1
+
+    removed = 0
+    for job_id in existing:
+        if job_id not in wanted and job_id.split("_", 1)[0] in ("symbols", "limits", "fees", "prices"):
+            scheduler.remove_job(job_id)
+            removed += 1
+
+    log.info(
+        f"🕑 Jobs synced: {kept} kept ({deferred} overdue deferred), {added} (re)scheduled, "
+        f"{removed} removed; prices every {fetch_interval}m"
+    )
+
+
+async def load_jobs(scheduler: AsyncIOScheduler):
+    try:
+        async with SessionLocal() as session:
+            await symbol_cache.warm(session)
+        await sync_jobs(scheduler, startup=True)
+        log.info("✅ Jobs loaded")
+    finally:
+        scheduler.resume()
+
+
+# =========================
+# Live reload
+# =========================
+async def _config_snapshot() -> Tuple[Dict[uuid.UUID, tuple], Optional[int]]:
+    """Дешевий знімок усього, від чого залежить розклад і клієнти бірж."""
+    async with SessionLocal() as session:
+        res = await session.execute(
+            select(
+                Exchange.id, Exchange.code, Exchange.is_active,
+                Exchange.fetch_symbols_interval_min, Exchange.fetch_limits_interval_min,
+                Exchange.fetch_fees_interval_min, Exchange.base_url_public, Exchange.ws_public_url,
+                Exchange.request_timeout_ms, Exchange.rate_limit_per_min,
             )
+        )
+        rows = {row[0]: tuple(row[1:]) for row in res.all()}
 
-        log.info(
-            f"🕑 Added {len(exchanges)} grouped price jobs "
-            f"(every {fetch_interval}m)"
+        # job-и без сервісного акаунту не ставляться — його поява теж зміна
+        res = await session.execute(
+            select(ExchangeCredential.exchange_id, func.count())
+            .where(ExchangeCredential.is_service == True, ExchangeCredential.is_active == True)
+            .group_by(ExchangeCredential.exchange_id)
         )
+        for exchange_id, count in res.all():
+            if exchange_id in rows:
+                rows[exchange_id] += (count,)
+
+        fetch_interval = await resolver.get_int(session, "FETCH_PRICE_INTERVAL_MIN")
+    return rows, fetch_interval
+
+
+async def watch_config(scheduler: AsyncIOScheduler) -> None:
+    """
+    Version-polling: раз на SCHEDULER_RELOAD_SEC порівнює знімок exchanges/settings з попереднім
+    і при змінах звіряє лише зачеплені job-и. HTTP-пули, кеші й незмінені job-и не чіпаються.
+    """
+    previous = await _config_snapshot()
+    while True:
+        await asyncio.sleep(settings.SCHEDULER_RELOAD_SEC)
+        try:
+            current = await _config_snapshot()
+            if current == previous:
+                continue
+
+            prev_rows, curr_rows = previous[0], current[0]
+            changed = [ex_id for ex_id in set(prev_rows) | set(curr_rows) if prev_rows.get(ex_id) != curr_rows.get(ex_id)]
+            for ex_id in changed:
+                old, new = prev_rows.get(ex_id), curr_rows.get(ex_id)
+                code = (new or old)[0]
+                # rate_limit_per_min міг змінитись — bucket перечитається при наступному acquire
+                rate_limiter.invalidate_bucket(code)
+                if old and new and old[5] != new[5]:
+                    # інший base_url → закешовані метадані від старого хоста
+                    metadata_cache.invalidate(code)
+            log.info(
+                f"🔄 Config change detected: {len(changed)} exchanges changed"
+                f"{', FETCH_PRICE_INTERVAL_MIN ' + str(previous[1]) + ' → ' + str(current[1]) if previous[1] != current[1] else ''}"
+            )
+
+            await sync_jobs(scheduler)
+            if changed:
+                async with SessionLocal() as session:
+                    await symbol_cache.warm(session)
+                await stream_manager.sync()
+            previous = current
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.exception(f"❌ Config reload failed: {e}")
+
+
+_background_tasks: List[asyncio.Task] = []
+
+
+async def _start_jobs(scheduler: AsyncIOScheduler) -> None:
+    await load_jobs(scheduler)
+    if settings.SCHEDULER_RELOAD_SEC > 0:
+        await watch_config(scheduler)
 
-    log.info("✅ Jobs loaded")
 
 def start_scheduler():
-    log.info("🟢 Starting AsyncIOScheduler")
-    asyncio.create_task(load_jobs(scheduler))
-    scheduler.start()
+    log.info(f"🟢 Starting AsyncIOScheduler (jobstore={settings.SCHEDULER_JOBSTORE})")
+    # paused: збережені job-и не стартують, доки load_jobs не розкидає прострочені
+    scheduler.start(paused=True)
+    _background_tasks.append(asyncio.create_task(_start_jobs(scheduler), name="scheduler_jobs"))
     log.info("✅ Scheduler started")
+
+def stop_scheduler():
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    scheduler.shutdown(wait=False)
+    log.info("🛑 Scheduler stopped")
@@ -0,0 +1,38 @@
+from typing import Dict, List, Optional
+
+from core_fetch.app.services.adapters.base import ExchangeAdapter, AdapterCapabilities, FeeTier, Kline
+from core_fetch.app.services.adapters.binance import BinanceAdapter
+from core_fetch.app.services.adapters.kraken import KrakenAdapter
+
+# =========================
+# registry: Exchange.code → adapter
+# =========================
+_ADAPTERS: Dict[str, ExchangeAdapter] = {}
+
+
+def register_adapter(adapter: ExchangeAdapter) -> None:
+    _ADAPTERS[adapter.code.upper()] = adapter
+
+
+def get_adapter(exchange_code: str) -> Optional[ExchangeAdapter]:
+    return _ADAPTERS.get(exchange_code.upper())
+
+
+def require_adapter(exchange_code: str) -> ExchangeAdapter:
+    adapter = get_adapter(exchange_code)
+    if adapter is None:
+        raise ValueError(f"No exchange adapter registered for {exchange_code}")
+    return adapter
+
+
+def list_adapters() -> List[ExchangeAdapter]:
+    return list(_ADAPTERS.values())
+
+
+register_adapter(BinanceAdapter())
+register_adapter(KrakenAdapter())
+
+__all__ = [
+    "ExchangeAdapter", "AdapterCapabilities", "FeeTier",
+    "register_adapter", "get_adapter", "require_adapter", "list_adapters",
+]
@@ -0,0 +1,139 @@
+import math
+import uuid
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from core_fetch.app.services.circuit_breaker import guarded_get
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AdapterCapabilities:
+    """Що вміє біржа і скільки це коштує в її REQUEST_WEIGHT бюджеті."""
+    batch_ticker: bool = False
+    # None → весь знімок біржі одним запитом
+    max_symbols_per_request: Optional[int] = None
+    ticker_weight: int = 1
+    batch_ticker_weight: int = 1
+    metadata_weight: int = 1
+    account_weight: int = 1
+    websocket: bool = False
+    # скільки символів мультиплексуємо в одне WS-з'єднання
+    max_streams_per_connection: int = 0
+    # скільки символів в одному subscribe-повідомленні
+    max_streams_per_subscribe: int = 0
+    # історичні свічки: максимум на один запит і вага запиту
+    klines_max_per_request: int = 0
+    klines_weight: int = 1
+
+
+@dataclass(frozen=True)
+class FeeTier:
+    # біржовий symbol_id (e.g. "XXBTZUSD"); None → комісія на всю біржу
+    symbol_id: Optional[str]
+    volume_threshold: Decimal
+    maker_fee: Optional[Decimal]
+    taker_fee: Optional[Decimal]
+
+
+@dataclass(frozen=True)
+class Kline:
+    open_time: datetime
+    open: Decimal
+    high: Decimal
+    low: Decimal
+    close: Decimal
+    volume: Optional[Decimal]
+
+
+class ExchangeAdapter:
+    """
+    Базовий адаптер біржі. Кожна біржа реалізує парсинг своїх REST/WS відповідей,
+    а universal_fetcher і scheduler працюють лише через цей інтерфейс.
+    """
+
+    code: str = ""
+    capabilities: AdapterCapabilities = AdapterCapabilities()
+
+    # ---------- HTTP ----------
+    async def _get(self, http: httpx.AsyncClient, weight: int, path: str,
+                   raise_for_status: bool = True, **kwargs) -> httpx.Response:
+        """GET через спільний клієнт з урахуванням rate-limit бюджету і circuit breaker-а біржі."""
+        resp = await guarded_get(self.code, http, weight, path, **kwargs)
+        if raise_for_status:
+            resp.raise_for_status()
+        return resp
+
+    # ---------- prices ----------
+    async def fetch_price(self, http: httpx.AsyncClient, symbol: str) -> float:
+        raise NotImplementedError(f"fetch_price not implemented for {self.code}")
+
+    async def fetch_prices_bulk(self, http: httpx.AsyncClient, symbols: List[str],
+                                errors: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        """
+        {exchange symbol code: last price}; символи, яких немає у відповіді, пропускаються.
+        Пари, які біржа явно відхилила, дописуються в errors як {symbol code: помилка біржі}.
+        """
+        raise NotImplementedError(f"fetch_prices_bulk not implemented for {self.code}")
+
+    # ---------- metadata ----------
+    async def fetch_symbols(self, http: httpx.AsyncClient, exchange_id: uuid.UUID) -> List[Dict[str, Any]]:
+        """Рядки для exchange_symbols (ключ: exchange_id + symbol_id)."""
+        raise NotImplementedError(f"fetch_symbols not implemented for {self.code}")
+
+    async def fetch_limits(self, http: httpx.AsyncClient, exchange_id: uuid.UUID) -> List[Dict[str, Any]]:
+        """Рядки для exchange_limits."""
+        raise NotImplementedError(f"fetch_limits not implemented for {self.code}")
+
+    async def fetch_fees(self, http: httpx.AsyncClient) -> List[FeeTier]:
+        raise NotImplementedError(f"fetch_fees not implemented for {self.code}")
+
+    # ---------- history ----------
+    # секунд у бакеті → значення параметра interval біржі
+    KLINE_INTERVALS: Dict[int, str] = {}
+
+    def kline_interval(self, seconds: int) -> Optional[str]:
+        return self.KLINE_INTERVALS.get(seconds)
+
+    async def fetch_klines(self, http: httpx.AsyncClient, symbol_id: str, seconds: int,
+                           start: datetime, end: datetime) -> List[Kline]:
+        """Свічки з open_time у [start, end), не більше capabilities.klines_max_per_request."""
+        raise NotImplementedError(f"fetch_klines not implemented for {self.code}")
+
+    # ---------- streaming ----------
+    def stream_key(self, symbol_id: str, symbol: str) -> str:
+        """Ключ символу в потоці біржі (за замовчуванням — біржовий symbol_id)."""
+        return symbol_id
+
+    def stream_url(self, ws_public_url: str) -> str:
+        raise NotImplementedError(f"streaming not implemented for {self.code}")
+
+    def subscribe_messages(self, keys: List[str]) -> List[Dict[str, Any]]:
+        raise NotImplementedError(f"streaming not implemented for {self.code}")
+
+    def parse_stream_message(self, message: Any) -> Dict[str, float]:
+        """{stream key: last price}; службові повідомлення (ack, heartbeat) → {}."""
+        raise NotImplementedError(f"streaming not implemented for {self.code}")
+
+    # ---------- strategy ----------
+    def bulk_request_count(self, n_symbols: int) -> int:
+        per_request = self.capabilities.max_symbols_per_request
+        if not per_request:
+            return 1
+        return math.ceil(n_symbols / per_request)
+
+    def price_strategy(self, n_symbols: int) -> str:
+        """
+        Найдешевша стратегія за вагою запитів: "bulk" (знімок біржі) або "per_symbol".
+        """
+        if not self.capabilities.batch_ticker or n_symbols == 0:
+            return "per_symbol"
+        bulk_cost = self.bulk_request_count(n_symbols) * self.capabilities.batch_ticker_weight
+        per_symbol_cost = n_symbols * self.capabilities.ticker_weight
+        return "bulk" if bulk_cost <= per_symbol_cost else "per_symbol"
@@ -0,0 +1,167 @@
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from core_fetch.app.services.adapters.base import ExchangeAdapter, AdapterCapabilities, FeeTier, Kline
+from core_fetch.app.services.metadata_cache import metadata_cache
+
+
+class BinanceAdapter(ExchangeAdapter):
+    code = "BINANCE"
+    capabilities = AdapterCapabilities(
+        batch_ticker=True,
+        max_symbols_per_request=None,   # /api/v3/ticker/price без symbol → усі пари
+        ticker_weight=2,
+        batch_ticker_weight=4,
+        metadata_weight=20,
+        account_weight=20,
+        websocket=True,
+        max_streams_per_connection=1024,  # ліміт Binance на одне з'єднання
+        max_streams_per_subscribe=200,
+        klines_max_per_request=1000,
+        klines_weight=2,
+    )
+
+    EXCHANGE_INFO = "/api/v3/exchangeInfo"
+    KLINE_INTERVALS = {
+        60: "1m", 180: "3m", 300: "5m", 900: "15m", 1800: "30m",
+        3600: "1h", 7200: "2h", 14400: "4h", 21600: "6h", 28800: "8h", 43200: "12h",
+        86400: "1d", 259200: "3d", 604800: "1w",
+    }
+
+    # ---------- prices ----------
+    async def fetch_price(self, http: httpx.AsyncClient, symbol: str) -> float:
+        resp = await self._get(http, self.capabilities.ticker_weight,
+                               "/api/v3/ticker/price", params={"symbol": symbol})
+        return float(resp.json()["price"])
+
+    async def fetch_prices_bulk(self, http: httpx.AsyncClient, symbols: List[str],
+                                errors: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        # без параметра symbol Binance повертає ціни всіх пар одним масивом
+        resp = await self._get(http, self.capabilities.batch_ticker_weight, "/api/v3/ticker/price")
+
+        wanted = set(symbols)
+        return {
+            item["symbol"]: float(item["price"])
+            for item in resp.json()
+            if item.get("symbol") in wanted
+        }
+
+    # ---------- metadata ----------
+    async def _exchange_info(self, http: httpx.AsyncClient) -> Dict[str, Any]:
+        return await metadata_cache.get(self.code, http, self.EXCHANGE_INFO, self.capabilities.metadata_weight)
+
+    async def fetch_symbols(self, http: httpx.AsyncClient, exchange_id: uuid.UUID) -> List[Dict[str, Any]]:
+        data = await self._exchange_info(http)
+        symbols: List[Dict[str, Any]] = []
+
+        # усі символи з реальним статусом (TRADING / BREAK / HALT ...): ціни, стріми й бекфіл
+        # беруть лише TRADING, а DELISTED стає тільки символ, якого немає у відповіді взагалі
+        for s in data.get("symbols", []):
+            filters = {f["filterType"]: f for f in s.get("filters", [])}
+
+            min_notional = None
+            max_notional = None
+            if "MIN_NOTIONAL" in filters:
+                min_notional = filters["MIN_NOTIONAL"].get("minNotional")
+            elif "NOTIONAL" in filters:
+                min_notional = filters["NOTIONAL"].get("minNotional")
+                max_notional = filters["NOTIONAL"].get("maxNotional")
+
+            symbols.append(dict(
+                exchange_id=exchange_id,
+                symbol_id=s["symbol"],                           # біржовий рядковий ID (e.g. "BTCUSDT")
+                symbol=f"{s['baseAsset']}/{s['quoteAsset']}",    # людиночитний
+                base_asset=s["baseAsset"],
+                quote_asset=s["quoteAsset"],
+                status=s["status"],
+                type="spot",
+                base_precision=s.get("baseAssetPrecision"),
+                quote_precision=s.get("quotePrecision"),
+                step_size=filters.get("LOT_SIZE", {}).get("stepSize"),
+                tick_size=filters.get("PRICE_FILTER", {}).get("tickSize"),
+                min_qty=filters.get("LOT_SIZE", {}).get("minQty"),
+                max_qty=filters.get("LOT_SIZE", {}).get("maxQty"),
+                min_notional=min_notional,
+                max_notional=max_notional,
+                filters=s.get("filters", []),
+                is_active=True,
+            ))
+
+        return symbols
+
+    async def fetch_limits(self, http: httpx.AsyncClient, exchange_id: uuid.UUID) -> List[Dict[str, Any]]:
+        data = await self._exchange_info(http)
+        return [
+            dict(
+                exchange_id=exchange_id,
+                limit_type=rl["rateLimitType"],
+                interval_unit=rl["interval"],
+                interval_num=rl["intervalNum"],
+                limit=rl["limit"],
+                raw_json=rl,
+            )
+            for rl in data.get("rateLimits", [])
+        ]
+
+    async def fetch_fees(self, http: httpx.AsyncClient) -> List[FeeTier]:
+        # Binance не віддає fees по символах — одна комісія на акаунт
+        # (без підпису запит повертає помилку, тоді лишаються дефолтні 0.1%)
+        resp = await self._get(http, self.capabilities.account_weight, "/api/v3/account", raise_for_status=False)
+        data = resp.json()
+        maker = float(data.get("makerCommission", 10)) / 10000
+        taker = float(data.get("takerCommission", 10)) / 10000
+        return [FeeTier(symbol_id=None, volume_threshold=Decimal(0),
+                        maker_fee=Decimal(maker), taker_fee=Decimal(taker))]
+
+    # ---------- history ----------
+    async def fetch_klines(self, http: httpx.AsyncClient, symbol_id: str, seconds: int,
+                           start: datetime, end: datetime) -> List[Kline]:
+        resp = await self._get(
+            http, self.capabilities.klines_weight, "/api/v3/klines",
+            params={
+                "symbol": symbol_id,
+                "interval": self.KLINE_INTERVALS[seconds],
+                "startTime": int(start.timestamp() * 1000),
+                "endTime": int(end.timestamp() * 1000) - 1,
+                "limit": self.capabilities.klines_max_per_request,
+            },
+        )
+        # [openTime, open, high, low, close, volume, closeTime, ...]
+        return [
+            Kline(
+                open_time=datetime.fromtimestamp(row[0] / 1000, tz=timezone.utc),
+                open=Decimal(row[1]), high=Decimal(row[2]), low=Decimal(row[3]),
+                close=Decimal(row[4]), volume=Decimal(row[5]),
+            )
+            for row in resp.json()
+        ]
+
+    # ---------- streaming ----------
+    def stream_url(self, ws_public_url: str) -> str:
+        return f"{ws_public_url.rstrip('/')}/ws"
+
+    def subscribe_messages(self, keys: List[str]) -> List[Dict[str, Any]]:
+        per_message = self.capabilities.max_streams_per_subscribe
+        return [
+            {
+                "method": "SUBSCRIBE",
+                "params": [f"{key.lower()}@miniTicker" for key in keys[i:i + per_message]],
+                "id": i // per_message + 1,
+            }
+            for i in range(0, len(keys), per_message)
+        ]
+
+    def parse_stream_message(self, message: Any) -> Dict[str, float]:
+        # combined stream загортає подію в {"stream": ..., "data": {...}}
+        if isinstance(message, dict) and "data" in message:
+            message = message["data"]
+        events = message if isinstance(message, list) else [message]
+        return {
+            e["s"]: float(e["c"])
+            for e in events
+            if isinstance(e, dict) and e.get("e") in ("24hrMiniTicker", "24hrTicker")
+        }
@@ -0,0 +1,210 @@
+import uuid
+import logging
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from core_fetch.app.services.adapters.base import ExchangeAdapter, AdapterCapabilities, FeeTier, Kline
+from core_fetch.app.services.metadata_cache import metadata_cache
+
+log = logging.getLogger(__name__)
+
+
+class KrakenAdapter(ExchangeAdapter):
+    code = "KRAKEN"
+    capabilities = AdapterCapabilities(
+        batch_ticker=True,
+        max_symbols_per_request=100,    # Ticker?pair=a,b,c — обмежуємо через довжину URL
+        ticker_weight=1,
+        batch_ticker_weight=1,
+        metadata_weight=1,
+        account_weight=1,
+        websocket=True,
+        max_streams_per_connection=500,
+        max_streams_per_subscribe=100,
+        klines_max_per_request=720,
+        klines_weight=1,
+    )
+
+    ASSET_PAIRS = "/0/public/AssetPairs"
+    # interval OHLC у хвилинах
+    KLINE_INTERVALS = {
+        60: "1", 300: "5", 900: "15", 1800: "30", 3600: "60",
+        14400: "240", 86400: "1440", 604800: "10080", 1296000: "21600",
+    }
+
+    # ---------- prices ----------
+    async def fetch_price(self, http: httpx.AsyncClient, symbol: str) -> float:
+        resp = await self._get(http, self.capabilities.ticker_weight, "/0/public/Ticker", params={"pair": symbol})
+        result = resp.json().get("result", {})
+        if not result:
+            raise ValueError(f"No ticker data for {symbol} from Kraken")
+        ticker = list(result.values())[0]
+        return float(ticker["c"][0])  # last trade price
+
+    async def fetch_prices_bulk(self, http: httpx.AsyncClient, symbols: List[str],
+                                errors: Optional[Dict[str, str]] = None) -> Dict[str, float]:
+        prices: Dict[str, float] = {}
+        batch_size = self.capabilities.max_symbols_per_request
+        for i in range(0, len(symbols), batch_size):
+            await self._ticker_batch(http, symbols[i:i + batch_size], prices, errors)
+        return prices
+
+    async def _ticker_batch(self, http: httpx.AsyncClient, batch: List[str], prices: Dict[str, float],
+                            errors: Optional[Dict[str, str]]) -> None:
+        resp = await self._get(http, self.capabilities.batch_ticker_weight,
+                               "/0/public/Ticker", params={"pair": ",".join(batch)})
+        data = resp.json()
+        if data.get("error") and not data.get("result"):
+            if len(batch) == 1:
+                log.warning(f"⚠️ Kraken Ticker rejected {batch[0]}: {data['error']}")
+                if errors is not None:
+                    errors[batch[0]] = "; ".join(map(str, data["error"]))
+                return
+            # одна невідома / делістингована пара валить увесь батч (EQuery:Unknown asset pair) —
+            # ділимо навпіл, доки не лишиться сама погана пара: ≈ 2·log2(batch) зайвих запитів на неї
+            mid = len(batch) // 2
+            await self._ticker_batch(http, batch[:mid], prices, errors)
+            await self._ticker_batch(http, batch[mid:], prices, errors)
+            return
+        for key, ticker in data.get("result", {}).items():
+            prices[key] = float(ticker["c"][0])  # last trade price
+
+    # ---------- metadata ----------
+    async def _asset_pairs(self, http: httpx.AsyncClient) -> Dict[str, Any]:
+        data = await metadata_cache.get(self.code, http, self.ASSET_PAIRS, self.capabilities.metadata_weight)
+        return data.get("result", {})
+
+    @staticmethod
+    def symbol_row(exchange_id: uuid.UUID, key: str, s: Dict[str, Any]) -> Dict[str, Any]:
+        """Kraken AssetPairs entry → рядок exchange_symbols."""
+        lot_decimals = int(s.get("lot_decimals", 0))
+        pair_decimals = int(s.get("pair_decimals", lot_decimals))
+
+        # Numeric-типи бажано як Decimal/str (сумісно з Numeric у моделі)
+        step_size: Optional[str] = None
+        tick_size: Optional[str] = None
+        if lot_decimals:
+            step_size = f"1e-{lot_decimals}"
+        if pair_decimals:
+            tick_size = f"1e-{pair_decimals}"
+
+        min_qty = s.get("ordermin")
+        min_qty = str(Decimal(min_qty)) if min_qty else None
+
+        return dict(
+            exchange_id=exchange_id,
+            symbol_id=key,                                      # біржовий рядковий ID Kraken (e.g. "XXBTZUSD")
+            symbol=s.get("wsname") or s.get("altname") or key,  # людиночитний
+            base_asset=s.get("base"),
+            quote_asset=s.get("quote"),
+            # online → TRADING; cancel_only / post_only / limit_only / reduce_only лишаються як є
+            status="TRADING" if s.get("status", "online") == "online" else s["status"].upper(),
+            type="spot",
+            base_precision=s.get("pair_decimals"),
+            quote_precision=s.get("lot_decimals"),
+            step_size=step_size,
+            tick_size=tick_size,
+            min_qty=min_qty,
+            max_qty=None,
+            min_notional=None,
+            max_notional=None,
+            filters=s,
+            is_active=True,
+        )
+
+    async def fetch_symbols(self, http: httpx.AsyncClient, exchange_id: uuid.UUID) -> List[Dict[str, Any]]:
+        pairs = await self._asset_pairs(http)
+        return [self.symbol_row(exchange_id, key, s) for key, s in pairs.items()]
+
+    async def fetch_limits(self, http: httpx.AsyncClient, exchange_id: uuid.UUID) -> List[Dict[str, Any]]:
+        # Kraken не публікує ліміти через API — фіксований дефолт
+        return [
+            dict(
+                exchange_id=exchange_id,
+                limit_type="REQUEST_WEIGHT",
+                interval_unit="SECOND",
+                interval_num=1,
+                limit=15,
+                raw_json={"docs": "https://support.kraken.com/..."},
+            )
+        ]
+
+    async def fetch_fees(self, http: httpx.AsyncClient) -> List[FeeTier]:
+        pairs = await self._asset_pairs(http)
+        tiers: List[FeeTier] = []
+
+        for key, s in pairs.items():
+            fees = s.get("fees", [])
+            fees_maker = s.get("fees_maker", [])
+
+            for idx, level in enumerate(fees):
+                volume, taker = level
+                maker = fees_maker[idx][1] if idx < len(fees_maker) else None
+                tiers.append(FeeTier(
+                    symbol_id=key,
+                    volume_threshold=Decimal(str(volume)),
+                    maker_fee=Decimal(str(maker)) if maker is not None else None,
+                    taker_fee=Decimal(str(taker)),
+                ))
+
+        return tiers
+
+    # ---------- history ----------
+    async def fetch_klines(self, http: httpx.AsyncClient, symbol_id: str, seconds: int,
+                           start: datetime, end: datetime) -> List[Kline]:
+        # OHLC віддає не більше 720 останніх свічок інтервалу: since старіше за це вікно
+        # повертає все одно лише останні 720, тож глибша історія для Kraken недоступна
+        resp = await self._get(
+            http, self.capabilities.klines_weight, "/0/public/OHLC",
+            params={
+                "pair": symbol_id,
+                "interval": self.KLINE_INTERVALS[seconds],
+                "since": int(start.timestamp()) - 1,
+            },
+        )
+        data = resp.json()
+        if data.get("error") and not data.get("result"):
+            raise ValueError(f"Kraken OHLC {symbol_id} failed: {data['error']}")
+
+        klines: List[Kline] = []
+        for key, rows in data.get("result", {}).items():
+            if key == "last":
+                continue
+            # [time, open, high, low, close, vwap, volume, count]
+            for row in rows:
+                open_time = datetime.fromtimestamp(int(row[0]), tz=timezone.utc)
+                if start <= open_time < end:
+                    klines.append(Kline(
+                        open_time=open_time,
+                        open=Decimal(row[1]), high=Decimal(row[2]), low=Decimal(row[3]),
+                        close=Decimal(row[4]), volume=Decimal(row[6]),
+                    ))
+        return klines
+
+    # ---------- streaming ----------
+    def stream_key(self, symbol_id: str, symbol: str) -> str:
+        # WS API v1 адресує пари через wsname ("XBT/USD"), який ми зберігаємо в ExchangeSymbol.symbol
+        return symbol
+
+    def stream_url(self, ws_public_url: str) -> str:
+        return ws_public_url
+
+    def subscribe_messages(self, keys: List[str]) -> List[Dict[str, Any]]:
+        per_message = self.capabilities.max_streams_per_subscribe
+        return [
+            {"event": "subscribe", "pair": keys[i:i + per_message], "subscription": {"name": "ticker"}}
+            for i in range(0, len(keys), per_message)
+        ]
+
+    def parse_stream_message(self, message: Any) -> Dict[str, float]:
+        # ticker: [channelID, {"c": [price, lot volume], ...}, "ticker", "XBT/USD"]
+        # службові події (heartbeat, subscriptionStatus) приходять як dict
+        if not isinstance(message, list) or len(message) < 4 or message[-2] != "ticker":
+            return {}
+        payload = message[1]
+        if not isinstance(payload, dict) or "c" not in payload:
+            return {}
+        return {message[-1]: float(payload["c"][0])}
@@ -0,0 +1,331 @@
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import httpx
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.postgresql import insert
+
+from common.deps.session import SessionLocal
+from common.deps.clients import configure_http_client
+from common.deps.config import CoreFetchSettings
+from common.models.config import Timeframe
+from common.models.exchanges import Exchange, ExchangeSymbol
+from common.models.markethistory import BackfillCheckpoint
+from core_fetch.app.services.adapters import require_adapter
+from core_fetch.app.services.candles import bucket_start, kline_upsert
+from core_fetch.app.services.fetch_engine import run_concurrent
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+RUNNING = "running"
+DONE = "done"
+ERROR = "error"
+# скільки останніх запусків тримати в self.runs
+RUNS_KEPT = 100
+
+
+@dataclass
+class _Pair:
+    """Один (символ, таймфрейм) запуску: чанки [resume_from + i*step, ...) до range_end."""
+    symbol_id: uuid.UUID
+    exchange_symbol: str
+    timeframe: str
+    seconds: int
+    range_start: datetime
+    range_end: datetime
+    resume_from: datetime
+    step: timedelta
+    chunks: int = 0
+    # індекси завантажених чанків і довжина суцільного префікса серед них
+    done: Set[int] = field(default_factory=set)
+    contiguous: int = 0
+    loaded: int = 0
+    error: Optional[str] = None
+
+    def watermark(self, extra: Optional[int] = None) -> datetime:
+        n = self.contiguous
+        while n in self.done or n == extra:
+            n += 1
+        return min(self.resume_from + self.step * n, self.range_end)
+
+
+@dataclass(slots=True)
+class _Chunk:
+    pair: _Pair
+    index: int
+    start: datetime
+    end: datetime
+
+    def __str__(self) -> str:
+        return f"{self.pair.exchange_symbol} {self.pair.timeframe} [{self.start:%Y-%m-%d %H:%M}, {self.end:%Y-%m-%d %H:%M})"
+
+
+class BackfillEngine:
+    """
+    Бекфіл історичних свічок з klines API біржі у price_candles.
+    Діапазон кожного (символ, таймфрейм) ріжеться на чанки по klines_max_per_request свічок;
+    чанки всіх пар ідуть паралельно через run_concurrent (темп — token bucket біржі в guarded_get).
+    Свічки чанку і прогрес у backfill_checkpoints комітяться однією транзакцією; watermark
+    зсувається лише по суцільному префіксу завантажених чанків, тож перерваний запуск
+    продовжує з watermark без дір.
+    """
+
+    def __init__(self):
+        self.runs: Dict[str, dict] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    # ---------- API ----------
+    def submit(self, exchange_code: str, symbols: Optional[List[str]] = None,
+               timeframes: Optional[List[str]] = None,
+               start: Optional[datetime] = None, end: Optional[datetime] = None) -> str:
+        """Запускає бекфіл у фоні й одразу повертає run_id (прогрес — у self.runs)."""
+        run_id = uuid.uuid4().hex[:12]
+        self.runs[run_id] = {"exchange": exchange_code.upper(), "status": "queued"}
+        while len(self.runs) > RUNS_KEPT:
+            self.runs.pop(next(iter(self.runs)))
+        task = asyncio.create_task(
+            self.run(exchange_code, symbols, timeframes, start, end, run_id=run_id),
+            name=f"backfill:{run_id}",
+        )
+        self._tasks[run_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(run_id, None))
+        return run_id
+
+    async def stop(self) -> None:
+        """Скасовує фонові запуски; завантажене лишається в checkpoint-ах і продовжиться наступним запуском."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, exchange_code: str, symbols: Optional[List[str]] = None,
+                  timeframes: Optional[List[str]] = None,
+                  start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  http: Optional[httpx.AsyncClient] = None, run_id: Optional[str] = None) -> dict:
+        run_id = run_id or uuid.uuid4().hex[:12]
+        ex_code = exchange_code.upper()
+        state = self.runs.setdefault(run_id, {"exchange": ex_code})
+        state.update(status=RUNNING, started_at=datetime.now(timezone.utc).isoformat(),
+                     pairs=0, chunks=0, chunks_done=0, candles=0, failed=0, skipped_timeframes=[])
+        started = time.monotonic()
+        try:
+            await self._run(ex_code, symbols, timeframes, start, end, http, state)
+            state["status"] = DONE if not state["failed"] else ERROR
+        except asyncio.CancelledError:
+            state["status"] = "cancelled"
+            raise
+        except Exception as e:
+            state.update(status=ERROR, error=str(e))
+            log.exception(f"❌ Backfill {run_id} for {ex_code} failed: {e}")
+        finally:
+            state["duration_sec"] = round(time.monotonic() - started, 1)
+        log.info(
+            f"📚 Backfill {run_id} {ex_code} {state['status']}: {state['candles']} candles, "
+            f"{state['chunks_done']}/{state['chunks']} chunks for {state['pairs']} pairs in {state['duration_sec']}s"
+        )
+        return state
+
+    # ---------- planning ----------
+    async def _run(self, ex_code: str, symbols: Optional[List[str]], timeframes: Optional[List[str]],
+                   start: Optional[datetime], end: Optional[datetime],
+                   http: Optional[httpx.AsyncClient], state: dict) -> None:
+        adapter = require_adapter(ex_code)
+        per_request = adapter.capabilities.klines_max_per_request
+        if not per_request:
+            raise ValueError(f"{ex_code} adapter does not support klines")
+
+        exchange, tf_all, sym_rows = await self._load_targets(ex_code, symbols, timeframes)
+        if http is None:
+            http = configure_http_client(exchange)
+            if http is None:
+                raise ValueError(f"No HTTP client for {ex_code}")
+        exchange_id = exchange.id
+
+        tf_rows = []
+        for code, hours, history_limit in tf_all:
+            seconds = int(round((hours or 0) * 3600))
+            if seconds <= 0 or adapter.kline_interval(seconds) is None:
+                log.warning(f"⚠️ Backfill {ex_code}: timeframe {code} not supported by klines API, skipping")
+                state["skipped_timeframes"].append(code)
+                continue
+            tf_rows.append((code, seconds, history_limit))
+
+        if not tf_rows or not sym_rows:
+            log.info(f"📚 Backfill {ex_code}: nothing to do ({len(sym_rows)} symbols, {len(tf_rows)} timeframes)")
+            return
+
+        checkpoints = await self._load_checkpoints([row[0] for row in sym_rows], [code for code, _, _ in tf_rows])
+
+        now = datetime.now(timezone.utc)
+        pairs: List[_Pair] = []
+        for code, seconds, history_limit in tf_rows:
+            # відкритий бакет не чіпаємо — його добудовує жива агрегація
+            range_end = bucket_start(min(end or now, now), seconds)
+            range_start = (
+                bucket_start(start, seconds) if start
+                else range_end - timedelta(seconds=seconds * (history_limit or settings.BACKFILL_DEFAULT_CANDLES))
+            )
+            if range_start >= range_end:
+                continue
+            for symbol_uuid, exchange_symbol in sym_rows:
+                pair = _Pair(
+                    symbol_id=symbol_uuid, exchange_symbol=exchange_symbol, timeframe=code, seconds=seconds,
+                    range_start=range_start, range_end=range_end, resume_from=range_start,
+                    step=timedelta(seconds=seconds * per_request),
+                )
+                cp = checkpoints.get((symbol_uuid, code))
+                # попередній запуск покриває початок діапазону → продовжуємо з його watermark
+                if cp is not None and cp.range_start <= range_start <= cp.watermark:
+                    if cp.watermark >= range_end:
+                        continue
+                    pair.range_start, pair.resume_from = cp.range_start, cp.watermark
+                pair.chunks = -(-(range_end - pair.resume_from) // pair.step)
+                pairs.append(pair)
+
+        if not pairs:
+            log.info(f"📚 Backfill {ex_code}: all checkpoints already up to date")
+            return
+        await self._start_checkpoints(exchange_id, pairs)
+
+        # чанки по колу між парами, щоб watermark-и всіх пар зсувались рівномірно
+        chunks = [
+            _Chunk(p, i, p.resume_from + p.step * i, min(p.resume_from + p.step * (i + 1), p.range_end))
+            for i in range(max(p.chunks for p in pairs))
+            for p in pairs
+            if i < p.chunks
+        ]
+        state.update(pairs=len(pairs), chunks=len(chunks))
+        log.info(f"📚 Backfill {ex_code}: {len(chunks)} chunks for {len(pairs)} pairs")
+
+        async def worker(chunk: _Chunk) -> None:
+            await self._load_chunk(adapter, http, exchange_id, chunk)
+            state["chunks_done"] += 1
+            state["candles"] = sum(p.loaded for p in pairs)
+
+        _, failures = await run_concurrent(ex_code, chunks, worker, concurrency=settings.BACKFILL_CONCURRENCY)
+        for chunk, e in failures:
+            chunk.pair.error = chunk.pair.error or f"{chunk}: {e}"
+        state["failed"] = len(failures)
+        await self._finish(pairs)
+
+    # ---------- loading ----------
+    async def _load_chunk(self, adapter, http: httpx.AsyncClient, exchange_id: uuid.UUID, chunk: _Chunk) -> None:
+        pair = chunk.pair
+        klines = await adapter.fetch_klines(http, pair.exchange_symbol, pair.seconds, chunk.start, chunk.end)
+        rows = [
+            dict(
+                symbol_id=pair.symbol_id, timeframe=pair.timeframe, bucket_start=k.open_time,
+                exchange_id=exchange_id, open=k.open, high=k.high, low=k.low, close=k.close,
+                volume=k.volume, tick_count=0,
+                # межі бакета: живий тик того ж бакета не перетре open/close закритої свічки
+                first_tick_at=k.open_time,
+                last_tick_at=k.open_time + timedelta(seconds=pair.seconds) - timedelta(microseconds=1),
+            )
+            for k in klines
+            if chunk.start <= k.open_time < chunk.end
+        ]
+        await self._store_chunk(pair, rows, pair.watermark(extra=chunk.index))
+
+        pair.done.add(chunk.index)
+        while pair.contiguous in pair.done:
+            pair.contiguous += 1
+        pair.loaded += len(rows)
+
+    # ---------- persistence ----------
+    async def _load_targets(self, ex_code: str, symbols: Optional[List[str]],
+                            timeframes: Optional[List[str]]) -> Tuple[Exchange, list, list]:
+        """Біржа, її таймфрейми (code, hours, history_limit) і TRADING-символи (id, symbol_id)."""
+        async with SessionLocal() as session:
+            exchange = (await session.execute(select(Exchange).where(Exchange.code == ex_code))).scalar_one_or_none()
+            if exchange is None:
+                raise ValueError(f"Exchange {ex_code} not found")
+
+            tf_query = select(Timeframe.code, Timeframe.hours, Timeframe.history_limit).where(
+                Timeframe.exchange_id == exchange.id
+            )
+            if timeframes:
+                tf_query = tf_query.where(Timeframe.code.in_(timeframes))
+
+            sym_query = select(ExchangeSymbol.id, ExchangeSymbol.symbol_id).where(
+                ExchangeSymbol.exchange_id == exchange.id,
+                ExchangeSymbol.status == "TRADING",
+            )
+            if symbols:
+                sym_query = sym_query.where(ExchangeSymbol.symbol_id.in_(symbols))
+            return exchange, (await session.execute(tf_query)).all(), (await session.execute(sym_query)).all()
+
+    async def _load_checkpoints(self, symbol_ids: List[uuid.UUID],
+                                timeframes: List[str]) -> Dict[Tuple[uuid.UUID, str], BackfillCheckpoint]:
+        async with SessionLocal() as session:
+            res = await session.execute(
+                select(BackfillCheckpoint).where(
+                    BackfillCheckpoint.symbol_id.in_(symbol_ids),
+                    BackfillCheckpoint.timeframe.in_(timeframes),
+                )
+            )
+            return {(cp.symbol_id, cp.timeframe): cp for cp in res.scalars().all()}
+
+    async def _start_checkpoints(self, exchange_id: uuid.UUID, pairs: List[_Pair]) -> None:
+        async with SessionLocal() as session:
+            stmt = insert(BackfillCheckpoint).values([
+                dict(symbol_id=p.symbol_id, timeframe=p.timeframe, exchange_id=exchange_id,
+                     range_start=p.range_start, range_end=p.range_end, watermark=p.resume_from, status=RUNNING)
+                for p in pairs
+            ])
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=[BackfillCheckpoint.symbol_id, BackfillCheckpoint.timeframe],
+                set_={
+                    "range_start": stmt.excluded.range_start,
+                    "range_end": stmt.excluded.range_end,
+                    "watermark": stmt.excluded.watermark,
+                    "status": RUNNING,
+                    "error": None,
+                    "updated_at": func.now(),
+                },
+            ))
+            await session.commit()
+
+    async def _store_chunk(self, pair: _Pair, rows: List[dict], watermark: datetime) -> None:
+        """Свічки чанку і зсув watermark — однією транзакцією."""
+        async with SessionLocal() as session:
+            if rows:
+                await session.execute(kline_upsert(rows))
+            await session.execute(
+                update(BackfillCheckpoint)
+                .where(BackfillCheckpoint.symbol_id == pair.symbol_id, BackfillCheckpoint.timeframe == pair.timeframe)
+                .values(
+                    # чанки комітяться не по порядку — watermark лише росте
+                    watermark=func.greatest(BackfillCheckpoint.watermark, watermark),
+                    candles_loaded=BackfillCheckpoint.candles_loaded + len(rows),
+                    updated_at=func.now(),
+                )
+            )
+            await session.commit()
+
+    async def _finish(self, pairs: List[_Pair]) -> None:
+        async with SessionLocal() as session:
+            for pair in pairs:
+                complete = len(pair.done) == pair.chunks
+                await session.execute(
+                    update(BackfillCheckpoint)
+                    .where(BackfillCheckpoint.symbol_id == pair.symbol_id, BackfillCheckpoint.timeframe == pair.timeframe)
+                    .values(
+                        watermark=func.greatest(BackfillCheckpoint.watermark, pair.watermark()),
+                        status=DONE if complete else ERROR,
+                        error=None if complete else (pair.error or "interrupted"),
+                        updated_at=func.now(),
+                    )
+                )
+            await session.commit()
+
+    def stats(self) -> dict:
+        return {"active": len(self._tasks), "runs": self.runs}
+
+
+backfill_engine = BackfillEngine()
@@ -0,0 +1,237 @@
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, case
+from sqlalchemy.dialects.postgresql import insert
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.config import Timeframe
+from common.models.markethistory import PriceCandle
+from core_fetch.app.services.price_writer import price_writer, PriceTick
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+UPSERT_CHUNK = 1000
+
+
+def bucket_start(ts: datetime, seconds: int) -> datetime:
+    """Початок бакета, вирівняний від epoch в UTC (1h → :00, 1d → 00:00 UTC)."""
+    epoch = int(ts.timestamp())
+    return datetime.fromtimestamp(epoch - epoch % seconds, tz=timezone.utc)
+
+
+@dataclass(slots=True)
+class _Partial:
+    """Частина свічки, накопичена з моменту останнього flush; у БД зливається з уже записаною."""
+    exchange_id: uuid.UUID
+    open: float
+    high: float
+    low: float
+    close: float
+    first_tick_at: datetime
+    last_tick_at: datetime
+    tick_count: int = 1
+    volume: Optional[Decimal] = None
+
+    def add(self, price: float, ts: datetime) -> None:
+        if price > self.high:
+            self.high = price
+        if price < self.low:
+            self.low = price
+        # запізнілий тик не перетирає open/close — вирішує час тику, а не порядок надходження
+        if ts < self.first_tick_at:
+            self.first_tick_at, self.open = ts, price
+        if ts >= self.last_tick_at:
+            self.last_tick_at, self.close = ts, price
+        self.tick_count += 1
+
+    def merge(self, other: "_Partial") -> None:
+        """Доливає іншу часткову свічку того ж бакета (ті ж правила, що й у candle_upsert)."""
+        self.high = max(self.high, other.high)
+        self.low = min(self.low, other.low)
+        if other.first_tick_at < self.first_tick_at:
+            self.first_tick_at, self.open = other.first_tick_at, other.open
+        if other.last_tick_at >= self.last_tick_at:
+            self.last_tick_at, self.close = other.last_tick_at, other.close
+        self.tick_count += other.tick_count
+        if other.volume is not None:
+            self.volume = (self.volume or 0) + other.volume
+
+
+def candle_upsert(rows: List[dict]):
+    """
+    INSERT ... ON CONFLICT, що зливає часткову свічку з записаною:
+    high/low — extrema, open/close — від найранішого/найпізнішого тику, tick_count/volume — сума.
+    Тож тик, що прийшов після flush свого бакета, коректно доправляє вже записану свічку.
+    """
+    stmt = insert(PriceCandle).values(rows)
+    ex = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[PriceCandle.symbol_id, PriceCandle.timeframe, PriceCandle.bucket_start],
+        set_={
+            "high": func.greatest(PriceCandle.high, ex.high),
+            "low": func.least(PriceCandle.low, ex.low),
+            "open": case((ex.first_tick_at < PriceCandle.first_tick_at, ex.open), else_=PriceCandle.open),
+            "first_tick_at": func.least(PriceCandle.first_tick_at, ex.first_tick_at),
+            "close": case((ex.last_tick_at >= PriceCandle.last_tick_at, ex.close), else_=PriceCandle.close),
+            "last_tick_at": func.greatest(PriceCandle.last_tick_at, ex.last_tick_at),
+            "tick_count": PriceCandle.tick_count + ex.tick_count,
+            "volume": case(
+                (ex.volume.is_(None), PriceCandle.volume),
+                else_=func.coalesce(PriceCandle.volume, 0) + ex.volume,
+            ),
+            "updated_at": func.now(),
+        },
+    )
+
+
+def kline_upsert(rows: List[dict]):
+    """
+    Закриті свічки з klines біржі авторитетні для свого бакета: OHLCV перезаписуються,
+    tick_count лишається від живої агрегації. Повторний бекфіл того ж діапазону ідемпотентний.
+    """
+    stmt = insert(PriceCandle).values(rows)
+    ex = stmt.excluded
+    return stmt.on_conflict_do_update(
+        index_elements=[PriceCandle.symbol_id, PriceCandle.timeframe, PriceCandle.bucket_start],
+        set_={
+            "open": ex.open,
+            "high": ex.high,
+            "low": ex.low,
+            "close": ex.close,
+            "volume": ex.volume,
+            "first_tick_at": ex.first_tick_at,
+            "last_tick_at": ex.last_tick_at,
+            "updated_at": func.now(),
+        },
+    )
+
+
+class CandleAggregator:
+    """
+    Безперервна агрегація тиків у OHLCV свічки для кожного Timeframe біржі.
+    Слухає PriceWriter (бачить усі тики, зокрема відсічені deadband-ом), тримає в пам'яті
+    лише часткові свічки з моменту останнього flush і раз на CANDLE_FLUSH_SEC зливає їх
+    у price_candles одним upsert-ом. Таймфрейми перечитуються раз на CANDLE_TIMEFRAME_REFRESH_SEC.
+    """
+
+    def __init__(self):
+        # exchange_id → [(Timeframe.code, секунд у бакеті)]
+        self.timeframes: Dict[uuid.UUID, List[Tuple[str, int]]] = {}
+        # (symbol_id, timeframe, bucket_start) → часткова свічка
+        self._partials: Dict[Tuple[uuid.UUID, str, datetime], _Partial] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._timeframes_loaded_at = 0.0
+        self.flushed = 0
+        self.failed = 0
+
+    # ---------- lifecycle ----------
+    async def start(self) -> None:
+        if not settings.CANDLES_ENABLED:
+            log.info("ℹ️ Candle aggregation disabled (CANDLES_ENABLED=false)")
+            return
+        await self.load_timeframes()
+        price_writer.add_listener(self.observe)
+        self._task = asyncio.create_task(self._run(), name="candle_aggregator")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self.flush()
+
+    async def load_timeframes(self) -> None:
+        async with SessionLocal() as session:
+            res = await session.execute(select(Timeframe.exchange_id, Timeframe.code, Timeframe.hours))
+            timeframes: Dict[uuid.UUID, List[Tuple[str, int]]] = {}
+            for exchange_id, code, hours in res.all():
+                if not hours or hours <= 0:
+                    continue
+                timeframes.setdefault(exchange_id, []).append((code, int(round(hours * 3600))))
+        self.timeframes = timeframes
+        self._timeframes_loaded_at = time.monotonic()
+        log.info(f"🕯️ Candle timeframes loaded: {sum(len(v) for v in timeframes.values())} for {len(timeframes)} exchanges")
+
+    # ---------- ingestion ----------
+    def observe(self, tick: PriceTick) -> None:
+        timeframes = self.timeframes.get(tick.exchange_id)
+        if not timeframes:
+            return
+        price = float(tick.price)
+        for code, seconds in timeframes:
+            key = (tick.symbol_id, code, bucket_start(tick.timestamp, seconds))
+            partial = self._partials.get(key)
+            if partial is None:
+                self._partials[key] = _Partial(
+                    exchange_id=tick.exchange_id, open=price, high=price, low=price, close=price,
+                    first_tick_at=tick.timestamp, last_tick_at=tick.timestamp,
+                )
+            else:
+                partial.add(price, tick.timestamp)
+
+    # ---------- flushing ----------
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.CANDLE_FLUSH_SEC)
+            await self.flush()
+            if time.monotonic() - self._timeframes_loaded_at > settings.CANDLE_TIMEFRAME_REFRESH_SEC:
+                try:
+                    await self.load_timeframes()
+                except Exception as e:
+                    log.warning(f"⚠️ Candle timeframes reload failed: {e}")
+
+    async def flush(self) -> None:
+        if not self._partials:
+            return
+        partials, self._partials = self._partials, {}
+        rows = [
+            dict(
+                symbol_id=symbol_id, timeframe=code, bucket_start=start, exchange_id=p.exchange_id,
+                open=p.open, high=p.high, low=p.low, close=p.close, volume=p.volume,
+                tick_count=p.tick_count, first_tick_at=p.first_tick_at, last_tick_at=p.last_tick_at,
+            )
+            for (symbol_id, code, start), p in partials.items()
+        ]
+        try:
+            await upsert_candles(rows)
+            self.flushed += len(rows)
+        except Exception as e:
+            self.failed += len(rows)
+            # агрегати повертаються назад (разом з тиками, що прийшли за час flush) — наступний flush повторить
+            for key, partial in partials.items():
+                newer = self._partials.get(key)
+                if newer is not None:
+                    partial.merge(newer)
+                self._partials[key] = partial
+            log.exception(f"❌ Candle flush of {len(rows)} rows failed, will retry: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "timeframes": {str(k): [c for c, _ in v] for k, v in self.timeframes.items()},
+            "open_partials": len(self._partials),
+            "flushed": self.flushed,
+            "failed": self.failed,
+        }
+
+
+async def upsert_candles(rows: List[dict]) -> None:
+    async with SessionLocal() as session:
+        for i in range(0, len(rows), UPSERT_CHUNK):
+            await session.execute(candle_upsert(rows[i:i + UPSERT_CHUNK]))
+        await session.commit()
+
+
+candle_aggregator = CandleAggregator()
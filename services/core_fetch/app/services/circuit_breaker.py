@@ -0,0 +1,227 @@
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Deque, Dict, Optional, Set, Tuple
+
+import httpx
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models import ExchangeStatusHistory
+from common.utils.symbol_cache import symbol_cache
+from core_fetch.app.services import rate_limiter, metrics
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# asyncio тримає задачі лише слабкими посиланнями — запис переходу в історію тримаємо тут до завершення
+_record_tasks: Set[asyncio.Task] = set()
+
+
+class CircuitOpenError(Exception):
+    """Запит не відправлено: breaker (біржа, ендпоінт) відкритий."""
+
+    def __init__(self, exchange_code: str, endpoint: str, retry_in: float):
+        self.exchange_code = exchange_code
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+        super().__init__(f"circuit open for {exchange_code} {endpoint} (retry in {retry_in:.0f}s)")
+
+
+class CircuitBreaker:
+    """
+    Breaker на пару (біржа, ендпоінт).
+    closed → open: частка невдач у вікні останніх CB_WINDOW викликів ≥ CB_FAILURE_RATE (мін. CB_MIN_CALLS);
+    open → half_open: після open-таймауту пропускається один пробний запит;
+    half_open → closed при успіху, інакше знову open з подвоєним таймаутом (до CB_OPEN_MAX_SEC).
+    """
+
+    def __init__(self, exchange_code: str, endpoint: str):
+        self.exchange_code = exchange_code
+        self.endpoint = endpoint
+        self.state = CLOSED
+        self.outcomes: Deque[bool] = deque(maxlen=settings.CB_WINDOW)
+        self.open_sec = float(settings.CB_OPEN_SEC)
+        self.opened_until = 0.0
+        self.probing = False
+        self.short_circuited = 0
+        # retry budget: поповнюється на частку від кожного запиту, ретрай витрачає 1
+        self.retry_tokens = float(settings.CB_RETRY_BUDGET_MAX)
+
+    def before_call(self) -> None:
+        if self.state == CLOSED:
+            return
+        now = time.monotonic()
+        if self.state == OPEN and now >= self.opened_until:
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN and not self.probing:
+            self.probing = True
+            return
+        self.short_circuited += 1
+        raise CircuitOpenError(self.exchange_code, self.endpoint, max(self.opened_until - now, 0.0))
+
+    def record(self, ok: bool) -> None:
+        self.retry_tokens = min(settings.CB_RETRY_BUDGET_MAX, self.retry_tokens + settings.CB_RETRY_RATIO)
+        if self.state == HALF_OPEN:
+            self.probing = False
+            if ok:
+                self.outcomes.clear()
+                self.open_sec = float(settings.CB_OPEN_SEC)
+                self._transition(CLOSED)
+            else:
+                self.open_sec = min(self.open_sec * 2, settings.CB_OPEN_MAX_SEC)
+                self._open()
+            return
+
+        self.outcomes.append(ok)
+        if self.state == CLOSED and len(self.outcomes) >= settings.CB_MIN_CALLS:
+            failure_rate = self.outcomes.count(False) / len(self.outcomes)
+            if failure_rate >= settings.CB_FAILURE_RATE:
+                self._open()
+
+    def release_probe(self) -> None:
+        """Пробний запит скасовано до результату — наступний виклик зможе спробувати знову."""
+        if self.state == HALF_OPEN:
+            self.probing = False
+
+    def take_retry(self) -> bool:
+        if self.state != CLOSED or self.retry_tokens < 1:
+            return False
+        self.retry_tokens -= 1
+        return True
+
+    def _open(self) -> None:
+        self.opened_until = time.monotonic() + self.open_sec
+        self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        previous, self.state = self.state, state
+        if state == OPEN:
+            log.warning(
+                f"🔌 Circuit OPEN for {self.exchange_code} {self.endpoint} "
+                f"({self.outcomes.count(False)}/{len(self.outcomes)} failed, retry in {self.open_sec:.0f}s)"
+            )
+        else:
+            log.info(f"🔌 Circuit {previous} → {state} for {self.exchange_code} {self.endpoint}")
+        # half_open — проміжний стан, в історію пишемо лише відкриття/закриття
+        if state != HALF_OPEN:
+            task = asyncio.create_task(self._record_transition(state))
+            _record_tasks.add(task)
+            task.add_done_callback(_record_tasks.discard)
+
+    async def _record_transition(self, state: str) -> None:
+        try:
+            async with SessionLocal() as session:
+                exchange_id = await symbol_cache.get_exchange_id(session, self.exchange_code)
+                if not exchange_id:
+                    return
+                session.add(
+                    ExchangeStatusHistory(
+                        exchange_id=exchange_id,
+                        event="circuit_breaker",
+                        status=state,
+                        message=(
+                            f"{self.endpoint}: circuit {state}"
+                            + (f" for {self.open_sec:.0f}s, {self.short_circuited} calls short-circuited so far"
+                               if state == OPEN else "")
+                        ),
+                    )
+                )
+                await session.commit()
+        except Exception as e:
+            log.warning(f"⚠️ Failed to record circuit transition for {self.exchange_code}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "calls": len(self.outcomes),
+            "failures": self.outcomes.count(False),
+            "short_circuited": self.short_circuited,
+            "retry_tokens": round(self.retry_tokens, 2),
+            "open_for_sec": round(max(self.opened_until - time.monotonic(), 0.0), 1) if self.state == OPEN else 0,
+        }
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+
+def get_breaker(exchange_code: str, endpoint: str) -> CircuitBreaker:
+    key = (exchange_code.upper(), endpoint)
+    breaker = _breakers.get(key)
+    if breaker is None:
+        breaker = _breakers[key] = CircuitBreaker(*key)
+    return breaker
+
+
+def _is_failure(resp: Optional[httpx.Response]) -> bool:
+    # 429/418 — це наш перебір ваги, а не збій біржі: ним займається rate_limiter
+    return resp is None or resp.status_code >= 500
+
+
+async def guarded_get(exchange_code: str, http: httpx.AsyncClient, weight: float, path: str,
+                      **kwargs) -> httpx.Response:
+    """
+    GET із breaker-ом (біржа, ендпоінт), rate-limit бюджетом і обмеженими ретраями
+    (експоненційний backoff з full jitter) на таймаути/транспортні помилки/5xx.
+    Коли breaker відкритий — CircuitOpenError за мілісекунди, без витрати ваги.
+    """
+    code = exchange_code.upper()
+    breaker = get_breaker(code, path)
+    attempt = 0
+    while True:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            metrics.HTTP_SHORT_CIRCUITED.labels(code, path).inc()
+            raise
+        resp: Optional[httpx.Response] = None
+        error: Optional[Exception] = None
+        try:
+            await rate_limiter.acquire(code, weight)
+            started = time.monotonic()
+            try:
+                resp = await http.get(path, **kwargs)
+            finally:
+                metrics.HTTP_LATENCY.labels(code, path, str(resp.status_code) if resp is not None else "error").observe(
+                    time.monotonic() - started
+                )
+            rate_limiter.observe_response(code, resp)
+        except httpx.TransportError as e:
+            error = e
+        except BaseException:
+            breaker.release_probe()
+            raise
+
+        failed = _is_failure(resp)
+        breaker.record(not failed)
+        if not failed:
+            return resp
+
+        if attempt >= settings.HTTP_RETRY_MAX or not breaker.take_retry():
+            if error is not None:
+                raise error
+            return resp
+
+        delay = random.uniform(0, settings.HTTP_RETRY_BASE_SEC * (2 ** attempt))
+        attempt += 1
+        metrics.HTTP_RETRIES.labels(code, path).inc()
+        log.debug(f"🔁 {code} {path} retry {attempt}/{settings.HTTP_RETRY_MAX} in {delay:.2f}s ({error or resp.status_code})")
+        await asyncio.sleep(delay)
+
+
+async def drain() -> None:
+    """Дочекатися записів переходів у exchange_status_history (shutdown)."""
+    if _record_tasks:
+        await asyncio.gather(*list(_record_tasks), return_exceptions=True)
+
+
+def stats() -> dict:
+    return {f"{code} {endpoint}": breaker.stats() for (code, endpoint), breaker in _breakers.items()}
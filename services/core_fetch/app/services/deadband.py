@@ -0,0 +1,99 @@
+import uuid
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+from common.deps.config import CoreFetchSettings
+from common.utils.symbol_cache import symbol_cache
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+OFF = "off"
+ABSOLUTE = "absolute"
+RELATIVE = "relative"
+TICK = "tick"
+MODES = (OFF, ABSOLUTE, RELATIVE, TICK)
+
+
+class DeadbandFilter:
+    """
+    Deadband-компресія тиків перед записом у price_history.
+    Тримає в пам'яті останню *збережену* ціну символу і пропускає тик лише якщо
+      - зміна від неї ≥ deadband:
+          absolute — |Δ| ≥ PRICE_DEADBAND_VALUE (в одиницях ціни),
+          relative — |Δ| / last ≥ PRICE_DEADBAND_VALUE (0.0005 = 5 bps),
+          tick     — |Δ| ≥ PRICE_DEADBAND_VALUE × ExchangeSymbol.tick_size
+                     (символи без tick_size пишуться без компресії);
+      - або з останнього запису минуло ≥ PRICE_DEADBAND_HEARTBEAT_SEC.
+
+    Правило відновлення для читачів (step series / LOCF):
+      ціна символу в момент t = price останнього рядка з timestamp ≤ t.
+      Похибка такого відновлення не перевищує deadband (рахується від збереженої ціни,
+      тож не накопичується), а поки символ политься, сусідні рядки не далі ніж
+      heartbeat + інтервал полінгу. Більший розрив — це відсутність даних, а не пласка ціна.
+    """
+
+    def __init__(self, mode: str, value: float, heartbeat_sec: float):
+        if mode not in MODES:
+            log.warning(f"⚠️ Unknown PRICE_DEADBAND_MODE={mode!r}, compression disabled")
+            mode = OFF
+        self.mode = mode
+        self.value = value
+        self.heartbeat_sec = heartbeat_sec
+        # ExchangeSymbol.id → (остання збережена ціна, її timestamp)
+        self._last: Dict[uuid.UUID, Tuple[float, datetime]] = {}
+        self.passed = 0
+        self.suppressed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != OFF
+
+    def _threshold(self, symbol_id: uuid.UUID, last_price: float) -> Optional[float]:
+        if self.mode == ABSOLUTE:
+            return self.value
+        if self.mode == RELATIVE:
+            return abs(last_price) * self.value
+        tick_size = symbol_cache.tick_sizes.get(symbol_id)
+        return float(tick_size) * self.value if tick_size else None
+
+    def accept(self, symbol_id: uuid.UUID, price: float, timestamp: datetime) -> bool:
+        if not self.enabled:
+            return True
+
+        price = float(price)
+        last = self._last.get(symbol_id)
+        if last is not None:
+            last_price, last_ts = last
+            threshold = self._threshold(symbol_id, last_price)
+            silent_for = (timestamp - last_ts).total_seconds()
+            if (
+                threshold is not None
+                and abs(price - last_price) < threshold
+                and silent_for < self.heartbeat_sec
+            ):
+                self.suppressed += 1
+                return False
+
+        self._last[symbol_id] = (price, timestamp)
+        self.passed += 1
+        return True
+
+    def forget(self, symbol_id: Optional[uuid.UUID] = None) -> None:
+        """Наступний тик символу (або всіх) буде записаний безумовно."""
+        if symbol_id is None:
+            self._last.clear()
+        else:
+            self._last.pop(symbol_id, None)
+
+    def stats(self) -> dict:
+        total = self.passed + self.suppressed
+        return {
+            "mode": self.mode,
+            "value": self.value,
+            "heartbeat_sec": self.heartbeat_sec,
+            "passed": self.passed,
+            "suppressed": self.suppressed,
+            "suppressed_ratio": round(self.suppressed / total, 4) if total else None,
+        }
@@ -0,0 +1,43 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Iterable, List, Tuple
+
+from common.deps.config import CoreFetchSettings
+from core_fetch.app.services.circuit_breaker import CircuitOpenError
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+
+async def run_concurrent(
+    exchange_code: str,
+    items: Iterable[Any],
+    worker: Callable[[Any], Awaitable[Any]],
+    concurrency: int | None = None,
+) -> Tuple[int, List[Tuple[Any, Exception]]]:
+    """
+    Запускає `worker(item)` паралельно (не більше `concurrency` одночасно).
+    Темп запитів обмежує token bucket біржі всередині самих fetch-функцій
+    (rate_limiter.acquire), тож тут лише контроль паралельності.
+    Повертає (кількість успішних, [(item, exception), ...]).
+    """
+    limit = concurrency or settings.FETCH_CONCURRENCY
+    sem = asyncio.Semaphore(limit)
+    failures: List[Tuple[Any, Exception]] = []
+
+    async def _run(item: Any) -> bool:
+        async with sem:
+            try:
+                await worker(item)
+                return True
+            except CircuitOpenError as e:
+                # breaker відкритий — відмова миттєва, лог агрегується на рівні циклу
+                failures.append((item, e))
+                return False
+            except Exception as e:
+                failures.append((item, e))
+                log.error(f"❌ {exchange_code}:{item} failed: {e}")
+                return False
+
+    results = await asyncio.gather(*(_run(item) for item in items))
+    return sum(results), failures
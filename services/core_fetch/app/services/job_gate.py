@@ -0,0 +1,76 @@
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from common.deps.config import CoreFetchSettings
+from core_fetch.app.services import metrics
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+
+class JobGate:
+    """
+    Глобальний ліміт одночасних job-ів по типу.
+    Типи взаємовиключні: поки йде важкий refresh (symbols/limits/fees), цикли цін чекають, і навпаки.
+    Щоб часті цикли цін не заморили refresh, тип, що чекає, отримує чергу (_preferred),
+    і новий job іншого типу не стартує, доки той не відпрацює.
+    """
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = limits
+        self._active: Dict[str, int] = {kind: 0 for kind in limits}
+        self._waiting: Dict[str, int] = {kind: 0 for kind in limits}
+        self._preferred: Optional[str] = None
+        self._cond = asyncio.Condition()
+
+    def _others(self, kind: str):
+        return [k for k in self.limits if k != kind]
+
+    def _can_enter(self, kind: str) -> bool:
+        if self._active[kind] >= self.limits[kind]:
+            return False
+        if any(self._active[o] for o in self._others(kind)):
+            return False
+        if self._preferred not in (None, kind) and self._waiting[self._preferred] > 0:
+            return False
+        return True
+
+    @asynccontextmanager
+    async def slot(self, kind: str):
+        started = time.monotonic()
+        async with self._cond:
+            if not self._can_enter(kind):
+                self._waiting[kind] += 1
+                if self._preferred is None:
+                    self._preferred = kind
+                log.debug(f"⏳ {kind} job waiting for gate (active={self._active})")
+                try:
+                    await self._cond.wait_for(lambda: self._can_enter(kind))
+                finally:
+                    self._waiting[kind] -= 1
+            if self._preferred == kind and self._waiting[kind] == 0:
+                self._preferred = None
+            self._active[kind] += 1
+        metrics.JOB_GATE_WAIT.labels(kind).observe(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._active[kind] -= 1
+                if self._active[kind] == 0:
+                    waiting = [o for o in self._others(kind) if self._waiting[o]]
+                    if waiting:
+                        self._preferred = waiting[0]
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        return {"active": dict(self._active), "waiting": dict(self._waiting), "limits": dict(self.limits)}
+
+
+job_gate = JobGate({
+    "prices": settings.SCHEDULER_MAX_PRICE_JOBS,
+    "refresh": settings.SCHEDULER_MAX_REFRESH_JOBS,
+})
@@ -0,0 +1,97 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from common.deps.config import CoreFetchSettings
+from core_fetch.app.services.circuit_breaker import guarded_get
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _Entry:
+    data: Any
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@dataclass
+class ExchangeMetadataCache:
+    """
+    Кеш важких метаданих бірж (Binance exchangeInfo, Kraken AssetPairs).
+    Кожен ендпоінт тягнеться не частіше ніж раз на TTL; refresh_symbols/limits/fees
+    отримують один і той самий розпарсений об'єкт (його не можна мутувати).
+    Після TTL — умовний запит (If-None-Match / If-Modified-Since), якщо біржа дала ETag/Last-Modified.
+    """
+
+    ttl_sec: float
+    _entries: Dict[Tuple[str, str], _Entry] = field(default_factory=dict)
+    _locks: Dict[Tuple[str, str], asyncio.Lock] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+    revalidated: int = 0
+
+    async def get(self, exchange_code: str, http: httpx.AsyncClient, path: str, weight: int = 1) -> Any:
+        key = (exchange_code.upper(), path)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+
+        # один lock на ендпоінт: паралельні job-и чекають одне завантаження замість дубля
+        async with lock:
+            entry = self._entries.get(key)
+            now = time.monotonic()
+            if entry and now - entry.fetched_at < self.ttl_sec:
+                self.hits += 1
+                return entry.data
+
+            headers = {}
+            if entry and entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry and entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+            resp = await guarded_get(key[0], http, weight, path, headers=headers)
+
+            if resp.status_code == 304 and entry:
+                entry.fetched_at = now
+                self.revalidated += 1
+                log.debug(f"📦 {key[0]} {path} not modified")
+                return entry.data
+
+            resp.raise_for_status()
+            data = resp.json()
+            self._entries[key] = _Entry(
+                data=data,
+                fetched_at=now,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+            self.misses += 1
+            log.info(f"📦 {key[0]} {path} fetched ({len(resp.content)} bytes)")
+            return data
+
+    def invalidate(self, exchange_code: Optional[str] = None) -> None:
+        if exchange_code is None:
+            self._entries.clear()
+            return
+        code = exchange_code.upper()
+        for key in [k for k in self._entries if k[0] == code]:
+            del self._entries[key]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.revalidated
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "hit_ratio": round((self.hits + self.revalidated) / total, 4) if total else None,
+        }
+
+
+metadata_cache = ExchangeMetadataCache(ttl_sec=settings.METADATA_CACHE_TTL_SEC)
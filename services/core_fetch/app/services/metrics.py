@@ -0,0 +1,153 @@
+import logging
+
+from prometheus_client import Counter, Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+log = logging.getLogger(__name__)
+
+# =========================
+# HTTP до бірж
+# =========================
+HTTP_LATENCY = Histogram(
+    "core_fetch_http_request_seconds",
+    "Latency of exchange REST calls",
+    ["exchange", "endpoint", "status"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_SHORT_CIRCUITED = Counter(
+    "core_fetch_http_short_circuited_total",
+    "Exchange calls rejected by an open circuit breaker",
+    ["exchange", "endpoint"],
+)
+HTTP_RETRIES = Counter(
+    "core_fetch_http_retries_total",
+    "Retried exchange calls",
+    ["exchange", "endpoint"],
+)
+RATE_LIMIT_WEIGHT = Counter(
+    "core_fetch_rate_limit_weight_total",
+    "Request weight acquired from the exchange token bucket",
+    ["exchange"],
+)
+RATE_LIMIT_WAIT = Histogram(
+    "core_fetch_rate_limit_wait_seconds",
+    "Time spent waiting for rate-limit tokens",
+    ["exchange"],
+    buckets=(0.001, 0.01, 0.1, 0.5, 1, 5, 15, 60),
+)
+
+# =========================
+# запис у БД
+# =========================
+DB_WRITE_LATENCY = Histogram(
+    "core_fetch_db_write_seconds",
+    "Latency of PriceWriter batch flushes",
+    ["method"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_WRITE_BATCH = Histogram(
+    "core_fetch_db_write_batch_rows",
+    "Rows per PriceWriter flush",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2000, 5000),
+)
+DB_ROWS = Counter(
+    "core_fetch_db_rows_total",
+    "PriceHistory rows flushed by PriceWriter",
+    ["result"],
+)
+
+# =========================
+# job-и / цикли
+# =========================
+CYCLE_DURATION = Histogram(
+    "core_fetch_cycle_seconds",
+    "Duration of scheduled fetch/refresh cycles",
+    ["job", "exchange"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 900),
+)
+CYCLE_LAST_DURATION = Gauge(
+    "core_fetch_cycle_last_seconds",
+    "Duration of the most recent cycle",
+    ["job", "exchange"],
+)
+CYCLE_INTERVAL = Gauge(
+    "core_fetch_cycle_interval_seconds",
+    "Configured interval of the job; alert when last cycle duration approaches it",
+    ["job", "exchange"],
+)
+CYCLE_SYMBOLS = Gauge(
+    "core_fetch_cycle_symbols",
+    "Symbols handled in the most recent price cycle",
+    ["exchange", "result"],
+)
+SYMBOLS_FETCHED = Counter(
+    "core_fetch_symbols_fetched_total",
+    "Symbol prices fetched by price cycles",
+    ["exchange", "result"],
+)
+JOB_GATE_WAIT = Histogram(
+    "core_fetch_job_gate_wait_seconds",
+    "Time a job waited for the global job gate",
+    ["kind"],
+    buckets=(0.01, 0.1, 0.5, 1, 5, 15, 60, 300),
+)
+
+
+class RuntimeCollector:
+    """Стан, який і так лежить у пам'яті (черги, бакети, кеші, breaker-и), читається в момент scrape."""
+
+    def describe(self):
+        # без describe() REGISTRY.register викликав би collect() ще під час імпорту
+        return []
+
+    def collect(self):
+        # lazy import: ці модулі самі імпортують metrics
+        from common.utils.symbol_cache import symbol_cache
+        from core_fetch.app.services import rate_limiter, circuit_breaker
+        from core_fetch.app.services.price_writer import price_writer
+        from core_fetch.app.services.metadata_cache import metadata_cache
+        from core_fetch.app.services.job_gate import job_gate
+
+        queue = GaugeMetricFamily("core_fetch_price_writer_queue_depth", "Ticks waiting in the PriceWriter queue")
+        queue.add_metric([], price_writer.queue.qsize())
+        yield queue
+        capacity = GaugeMetricFamily("core_fetch_price_writer_queue_capacity", "PriceWriter queue size limit")
+        capacity.add_metric([], price_writer.queue.maxsize)
+        yield capacity
+        deadband = CounterMetricFamily(
+            "core_fetch_deadband_ticks", "Ticks seen by the deadband filter", labels=["result"]
+        )
+        deadband.add_metric(["passed"], price_writer.deadband.passed)
+        deadband.add_metric(["suppressed"], price_writer.deadband.suppressed)
+        yield deadband
+
+        tokens = GaugeMetricFamily("core_fetch_rate_limit_tokens", "Tokens left in the exchange bucket", labels=["exchange"])
+        bucket_capacity = GaugeMetricFamily("core_fetch_rate_limit_capacity", "Exchange bucket capacity", labels=["exchange"])
+        for code, bucket in rate_limiter._buckets.items():
+            tokens.add_metric([code], bucket.tokens)
+            bucket_capacity.add_metric([code], bucket.capacity)
+        yield tokens
+        yield bucket_capacity
+
+        hits = CounterMetricFamily("core_fetch_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("core_fetch_cache_misses", "Cache misses", labels=["cache"])
+        for name, stats in (("symbols", symbol_cache.stats()), ("metadata", metadata_cache.stats())):
+            hits.add_metric([name], stats["hits"] + stats.get("revalidated", 0))
+            misses.add_metric([name], stats["misses"])
+        yield hits
+        yield misses
+
+        circuits = GaugeMetricFamily(
+            "core_fetch_circuit_open", "1 if the breaker is not closed", labels=["exchange", "endpoint"]
+        )
+        for (code, endpoint), breaker in circuit_breaker._breakers.items():
+            circuits.add_metric([code, endpoint], 0 if breaker.state == circuit_breaker.CLOSED else 1)
+        yield circuits
+
+        gate = GaugeMetricFamily("core_fetch_job_gate_active", "Running jobs per gate kind", labels=["kind"])
+        for kind, active in job_gate.stats()["active"].items():
+            gate.add_metric([kind], active)
+        yield gate
+
+
+REGISTRY.register(RuntimeCollector())
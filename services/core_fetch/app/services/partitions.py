@@ -0,0 +1,263 @@
+import re
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.markethistory import PriceHistory
+from core_fetch.app.services.price_export import price_exporter
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+DAY = "day"
+MONTH = "month"
+DETACH = "detach"
+DROP = "drop"
+# усі репліки core_fetch ганяють обслуговування, advisory lock пускає лише одну за раз
+LOCK_KEY = "price_history_partitions"
+
+_BOUND_TO = re.compile(r"TO \('([^']+)'\)")
+_BOUND_FROM = re.compile(r"FROM \('([^']+)'\)")
+
+
+def period_start(ts: datetime, unit: str) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    if unit == DAY:
+        return ts.replace(hour=0, minute=0, second=0, microsecond=0)
+    return ts.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def next_period(start: datetime, unit: str) -> datetime:
+    if unit == DAY:
+        return start + timedelta(days=1)
+    return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(table: str, start: datetime, unit: str) -> str:
+    return f"{table}_p{start:%Y%m%d}" if unit == DAY else f"{table}_p{start:%Y%m}"
+
+
+class PartitionManager:
+    """
+    Обслуговування RANGE-партицій price_history по timestamp.
+      - наперед тримає PRICE_HISTORY_PARTITIONS_AHEAD партицій (day / month), щоб інсерти
+        ніколи не падали в default-партицію;
+      - рядки, що таки потрапили в default, переносяться в нову партицію при її створенні;
+      - партиції, цілком старші за PRICE_HISTORY_RETENTION_DAYS, від'єднуються або видаляються —
+        retention без DELETE і без vacuum після нього; з PRICE_EXPORT_ENABLED — лише коли
+        всі їхні доби вже є в Parquet-архіві.
+    Межі існуючих партицій читаються з каталогу, тож зміна day ↔ month не створює перекриттів.
+    """
+
+    def __init__(self, table: str = PriceHistory.__tablename__):
+        self.table = table
+        self.unit = settings.PRICE_HISTORY_PARTITION if settings.PRICE_HISTORY_PARTITION in (DAY, MONTH) else MONTH
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[datetime] = None
+        self.created: List[str] = []
+        self.removed: List[str] = []
+        self.last_error: Optional[str] = None
+        # найстаріший тик партицій з межею FROM (MINVALUE) — рахується один раз (повний скан)
+        self._lower_bounds: dict = {}
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="partition_manager")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.maintain()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.exception(f"❌ {self.table} partition maintenance failed: {e}")
+            await asyncio.sleep(settings.PARTITION_MAINTENANCE_SEC)
+
+    # ---------- maintenance ----------
+    async def maintain(self) -> None:
+        now = datetime.now(timezone.utc)
+        async with SessionLocal() as session:
+            await session.execute(text("SET LOCAL TimeZone = 'UTC'"))
+            got_lock = (await session.execute(
+                text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"), {"key": LOCK_KEY}
+            )).scalar()
+            if not got_lock:
+                log.debug(f"⏭️ {self.table} partition maintenance runs on another replica")
+                return
+
+            partitions = await self._partitions(session)
+            if partitions is None:
+                log.warning(f"⚠️ {self.table} is not partitioned yet, run the partitioning migration")
+                return
+
+            created = await self._create_ahead(session, partitions, now)
+            removed = await self._apply_retention(session, partitions, now)
+            await session.commit()
+
+        self.last_run = now
+        self.created = (self.created + created)[-50:]
+        self.removed = (self.removed + removed)[-50:]
+        if created or removed:
+            log.info(f"🗂️ {self.table} partitions: created {created or '-'}, {settings.PRICE_HISTORY_RETENTION_ACTION} {removed or '-'}")
+
+    async def is_partitioned(self, session) -> bool:
+        return bool((await session.execute(
+            text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                 "WHERE c.relname = :table)"),
+            {"table": self.table},
+        )).scalar())
+
+    async def _partitions(self, session) -> Optional[List[Tuple[str, Optional[datetime], Optional[datetime]]]]:
+        """[(ім'я, from, to)] з каталогу; from=None — MINVALUE, to=None — default-партиція."""
+        if not await self.is_partitioned(session):
+            return None
+
+        res = await session.execute(
+            text(
+                "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+                "FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": self.table},
+        )
+        partitions = []
+        for name, bound in res.all():
+            if bound == "DEFAULT":
+                partitions.append((name, None, None))
+                continue
+            lo, hi = _BOUND_FROM.search(bound), _BOUND_TO.search(bound)
+            partitions.append((
+                name,
+                datetime.fromisoformat(lo.group(1)) if lo else None,
+                datetime.fromisoformat(hi.group(1)) if hi else None,
+            ))
+        return partitions
+
+    async def _create_ahead(self, session, partitions, now: datetime) -> List[str]:
+        ranges = [(lo, hi) for _, lo, hi in partitions if hi is not None]
+        default = next((name for name, _, hi in partitions if hi is None), None)
+        created = []
+
+        start = period_start(now, self.unit)
+        for _ in range(settings.PRICE_HISTORY_PARTITIONS_AHEAD + 1):
+            end = next_period(start, self.unit)
+            lo, hi = start, end
+            # вже покрите існуючими партиціями (зокрема іншої гранулярності) — підрізаємо
+            for elo, ehi in sorted(ranges, key=lambda r: r[1]):
+                if (elo is None or elo <= lo) and lo < ehi:
+                    lo = ehi
+            for elo, _ in ranges:
+                if elo is not None and lo < elo < hi:
+                    hi = elo
+            if lo < hi:
+                name = partition_name(self.table, start, self.unit)
+                await self._create(session, name, lo, hi, default)
+                ranges.append((lo, hi))
+                created.append(name)
+            start = end
+        return created
+
+    async def _create(self, session, name: str, lo: datetime, hi: datetime, default: Optional[str]) -> None:
+        bounds = {"lo": lo, "hi": hi}
+        stray = default and (await session.execute(
+            text(f'SELECT EXISTS (SELECT 1 FROM "{default}" WHERE "timestamp" >= :lo AND "timestamp" < :hi)'), bounds
+        )).scalar()
+        bound_sql = f"FOR VALUES FROM ('{lo.isoformat()}') TO ('{hi.isoformat()}')"
+        if not stray:
+            await session.execute(text(f'CREATE TABLE "{name}" PARTITION OF "{self.table}" {bound_sql}'))
+            return
+
+        # у default уже є рядки цього діапазону: CREATE ... PARTITION OF впав би,
+        # тож створюємо окрему таблицю, переносимо рядки й приєднуємо її
+        log.warning(f"⚠️ {default} holds rows for [{lo}, {hi}), moving them into {name}")
+        await session.execute(text(
+            f'CREATE TABLE "{name}" (LIKE "{self.table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        ))
+        await session.execute(text(
+            f'WITH moved AS (DELETE FROM "{default}" WHERE "timestamp" >= :lo AND "timestamp" < :hi RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved'
+        ), bounds)
+        await session.execute(text(f'ALTER TABLE "{self.table}" ATTACH PARTITION "{name}" {bound_sql}'))
+
+    async def _apply_retention(self, session, partitions, now: datetime) -> List[str]:
+        # з PRICE_RETENTION_TIERS сирі тики прибирає RetentionEngine — лише після rollup у свічки
+        if settings.PRICE_HISTORY_RETENTION_DAYS <= 0 or settings.PRICE_RETENTION_TIERS:
+            return []
+        return await self._remove_below(session, partitions, now - timedelta(days=settings.PRICE_HISTORY_RETENTION_DAYS))
+
+    async def remove_below(self, cutoff: datetime) -> Optional[List[str]]:
+        """Від'єднує/видаляє партиції, цілком старші за cutoff. None — таблиця не партиційована."""
+        async with SessionLocal() as session:
+            await session.execute(text("SET LOCAL TimeZone = 'UTC'"))
+            await session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": LOCK_KEY})
+            partitions = await self._partitions(session)
+            if partitions is None:
+                return None
+            removed = await self._remove_below(session, partitions, cutoff)
+            await session.commit()
+        self.removed = (self.removed + removed)[-50:]
+        return removed
+
+    async def _remove_below(self, session, partitions, cutoff: datetime) -> List[str]:
+        removed = []
+        for name, lo, hi in partitions:
+            # default не чіпаємо; партиція йде лише коли вся її межа старша за cutoff
+            if hi is None or hi > cutoff:
+                continue
+            if not await self._archived(session, name, lo, hi):
+                continue
+            if settings.PRICE_HISTORY_RETENTION_ACTION == DETACH:
+                await session.execute(text(f'ALTER TABLE "{self.table}" DETACH PARTITION "{name}"'))
+            else:
+                await session.execute(text(f'DROP TABLE "{name}"'))
+            removed.append(name)
+        return removed
+
+    async def _archived(self, session, name: str, lo: Optional[datetime], hi: datetime) -> bool:
+        """Чи вивантажено всі доби партиції в Parquet (без PRICE_EXPORT_ENABLED — завжди так)."""
+        if not settings.PRICE_EXPORT_ENABLED:
+            return True
+        if lo is None:
+            if name not in self._lower_bounds:
+                self._lower_bounds[name] = (await session.execute(
+                    text(f'SELECT min("timestamp") FROM "{name}"')
+                )).scalar()
+            lo = self._lower_bounds[name]
+            if lo is None:
+                # порожня партиція
+                return True
+        return await price_exporter.is_archived(lo, hi)
+
+    def stats(self) -> dict:
+        return {
+            "unit": self.unit,
+            "ahead": settings.PRICE_HISTORY_PARTITIONS_AHEAD,
+            "retention_days": settings.PRICE_HISTORY_RETENTION_DAYS,
+            "retention_action": settings.PRICE_HISTORY_RETENTION_ACTION,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "recently_created": self.created,
+            "recently_removed": self.removed,
+            "last_error": self.last_error,
+        }
+
+
+partition_manager = PartitionManager()
@@ -0,0 +1,143 @@
+import math
+import time
+import uuid
+import zlib
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Set, Tuple
+
+from sqlalchemy import select, or_
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.users import UserActiveSymbols
+from common.models.config import TradeProfile
+from core_fetch.app.services.price_writer import price_writer, PriceTick
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+HOT = "hot"      # кожен цикл: символи ботів і волатильні
+WARM = "warm"    # раз на POLL_WARM_EVERY циклів
+COLD = "cold"    # раз на POLL_COLD_EVERY циклів
+OFF = "off"      # не полимо (quote asset поза POLL_QUOTE_ASSETS)
+
+
+@dataclass
+class _ExchangePlan:
+    cycle: int = 0
+    demand: Set[str] = field(default_factory=set)
+    demand_loaded_at: float = 0.0
+    tiers: Dict[str, int] = field(default_factory=lambda: {HOT: 0, WARM: 0, COLD: 0, OFF: 0})
+
+
+class PollingPlanner:
+    """
+    Пріоритизація полінгу цін по символах.
+    Tier визначається попитом (UserActiveSymbols, у т.ч. TradeProfile.active_symbols),
+    волатильністю (EWMA |log return| з тиків, що проходять через PriceWriter)
+    і фільтром quote asset. Попит перечитується раз на POLL_DEMAND_REFRESH_SEC.
+    """
+
+    def __init__(self):
+        self.plans: Dict[uuid.UUID, _ExchangePlan] = {}
+        # ExchangeSymbol.id → (остання ціна, EWMA |log return|)
+        self.volatility: Dict[uuid.UUID, Tuple[float, float]] = {}
+        allowed = settings.POLL_QUOTE_ASSETS
+        self.quote_assets = {q.strip().upper() for q in allowed.split(",") if q.strip()} if allowed else set()
+        self._listening = False
+
+    def start(self) -> None:
+        if not self._listening:
+            price_writer.add_listener(self.observe)
+            self._listening = True
+
+    # ---------- inputs ----------
+    def observe(self, tick: PriceTick) -> None:
+        price = float(tick.price)
+        if price <= 0:
+            return
+        prev = self.volatility.get(tick.symbol_id)
+        if prev is None:
+            self.volatility[tick.symbol_id] = (price, 0.0)
+            return
+        last_price, ewma = prev
+        ret = abs(math.log(price / last_price))
+        alpha = settings.POLL_VOLATILITY_ALPHA
+        self.volatility[tick.symbol_id] = (price, alpha * ret + (1 - alpha) * ewma)
+
+    async def _refresh_demand(self, exchange_id: uuid.UUID, plan: _ExchangePlan) -> None:
+        if time.monotonic() - plan.demand_loaded_at < settings.POLL_DEMAND_REFRESH_SEC:
+            return
+        async with SessionLocal() as session:
+            # watchlist-и користувачів біржі + символи ботів (TradeProfile.active_symbols) профілів цієї біржі;
+            # символ з auto_trade_enabled торгує бот, навіть якщо з watchlist-а його прибрали
+            res = await session.execute(
+                select(UserActiveSymbols.symbol)
+                .outerjoin(TradeProfile, TradeProfile.id == UserActiveSymbols.trade_profile_id)
+                .where(
+                    or_(UserActiveSymbols.exchange_id == exchange_id, TradeProfile.exchange_id == exchange_id),
+                    or_(UserActiveSymbols.is_active == True, UserActiveSymbols.auto_trade_enabled == True),
+                )
+                .distinct()
+            )
+            # у watchlist-ах символ може бути як "BTCUSDT", так і "BTC/USDT"
+            plan.demand = {row[0].upper() for row in res.all() if row[0]}
+        plan.demand_loaded_at = time.monotonic()
+
+    # ---------- planning ----------
+    def tier(self, plan: _ExchangePlan, symbol_id: str, symbol: str, quote_asset: str, symbol_uuid: uuid.UUID) -> str:
+        if symbol_id.upper() in plan.demand or (symbol or "").upper() in plan.demand:
+            return HOT
+        vol = self.volatility.get(symbol_uuid, (0.0, 0.0))[1]
+        if vol >= settings.POLL_HOT_VOLATILITY:
+            return HOT
+        if self.quote_assets and (quote_asset or "").upper() not in self.quote_assets:
+            return OFF
+        if vol >= settings.POLL_WARM_VOLATILITY:
+            return WARM
+        return COLD
+
+    @staticmethod
+    def _is_due(tier: str, cycle: int, symbol_id: str) -> bool:
+        if tier == HOT:
+            return True
+        if tier == OFF:
+            return False
+        every = settings.POLL_WARM_EVERY if tier == WARM else settings.POLL_COLD_EVERY
+        # стабільний зсув по символу рівномірно розкладає повільні tier-и між циклами
+        return (cycle + zlib.crc32(symbol_id.encode())) % max(every, 1) == 0
+
+    async def select_due(
+        self,
+        exchange_id: uuid.UUID,
+        rows: Iterable[Tuple[str, str, str, uuid.UUID]],
+    ) -> Dict[str, uuid.UUID]:
+        """
+        rows: (symbol_id, symbol, quote_asset, ExchangeSymbol.id) усіх TRADING символів біржі.
+        Повертає {symbol_id: uuid} тих, кого треба полити в цьому циклі.
+        """
+        rows = list(rows)
+        if not settings.POLL_PLANNER_ENABLED:
+            return {symbol_id: sym_uuid for symbol_id, _, _, sym_uuid in rows}
+
+        plan = self.plans.setdefault(exchange_id, _ExchangePlan())
+        await self._refresh_demand(exchange_id, plan)
+
+        tiers = {HOT: 0, WARM: 0, COLD: 0, OFF: 0}
+        due: Dict[str, uuid.UUID] = {}
+        for symbol_id, symbol, quote_asset, sym_uuid in rows:
+            t = self.tier(plan, symbol_id, symbol, quote_asset, sym_uuid)
+            tiers[t] += 1
+            if self._is_due(t, plan.cycle, symbol_id):
+                due[symbol_id] = sym_uuid
+
+        plan.tiers = tiers
+        plan.cycle += 1
+        return due
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {str(exchange_id): dict(plan.tiers) for exchange_id, plan in self.plans.items()}
+
+
+polling_planner = PollingPlanner()
@@ -0,0 +1,117 @@
+import uuid
+import logging
+from array import array
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from common.deps.config import CoreFetchSettings
+from core_fetch.app.services.price_writer import PriceTick, price_writer
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+
+class _Ring:
+    """Останні size тиків символу: два array('d') (epoch-секунди, ціна) + позиція запису."""
+
+    __slots__ = ("exchange_id", "ts", "px", "pos", "count")
+
+    def __init__(self, exchange_id: uuid.UUID, size: int):
+        self.exchange_id = exchange_id
+        self.ts = array("d", bytes(8 * size))
+        self.px = array("d", bytes(8 * size))
+        self.pos = 0
+        self.count = 0
+
+    def push(self, ts: float, price: float) -> bool:
+        size = len(self.ts)
+        if self.count and ts < self.ts[(self.pos - 1) % size]:
+            # запізнілий тик (REST-опитування після WS) не повинен ставати "останнім"
+            return False
+        self.ts[self.pos] = ts
+        self.px[self.pos] = price
+        self.pos = (self.pos + 1) % size
+        self.count = min(self.count + 1, size)
+        return True
+
+    def latest(self) -> Tuple[float, float]:
+        i = (self.pos - 1) % len(self.ts)
+        return self.ts[i], self.px[i]
+
+    def recent(self, limit: int) -> List[Tuple[float, float]]:
+        """Найновіші спочатку."""
+        size = len(self.ts)
+        return [
+            (self.ts[i], self.px[i])
+            for i in ((self.pos - 1 - k) % size for k in range(min(limit, self.count)))
+        ]
+
+
+def _dt(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+class PriceRingBuffers:
+    """
+    In-process ring buffer останніх PRICE_BUFFER_SIZE тиків на символ.
+    Слухає PriceWriter (кожен тик, зокрема відсічені deadband-ом), тож /prices/latest
+    і /prices/recent відповідають з пам'яті без запиту до price_history.
+    Бачить лише тики цієї репліки: з шардуванням символ є в буферах репліки-власника.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._rings: Dict[uuid.UUID, _Ring] = {}
+        self.observed = 0
+        self.dropped_stale = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def start(self) -> None:
+        if not self.enabled:
+            log.info("ℹ️ Price ring buffers disabled (PRICE_BUFFER_SIZE=0)")
+            return
+        price_writer.add_listener(self.observe)
+
+    # ---------- ingestion ----------
+    def observe(self, tick: PriceTick) -> None:
+        ring = self._rings.get(tick.symbol_id)
+        if ring is None:
+            ring = self._rings[tick.symbol_id] = _Ring(tick.exchange_id, self.size)
+        if ring.push(tick.timestamp.timestamp(), float(tick.price)):
+            self.observed += 1
+        else:
+            self.dropped_stale += 1
+
+    # ---------- reads ----------
+    def latest(self, symbol_id: uuid.UUID) -> Optional[dict]:
+        ring = self._rings.get(symbol_id)
+        if ring is None or not ring.count:
+            return None
+        ts, price = ring.latest()
+        return {"symbol_id": symbol_id, "exchange_id": ring.exchange_id, "price": price, "timestamp": _dt(ts)}
+
+    def latest_many(self, symbol_ids: Optional[Iterable[uuid.UUID]] = None) -> List[dict]:
+        """Останні ціни вказаних символів (відсутні пропускаються); None — усіх у буферах."""
+        ids = self._rings.keys() if symbol_ids is None else symbol_ids
+        return [point for point in map(self.latest, ids) if point is not None]
+
+    def recent(self, symbol_id: uuid.UUID, limit: int) -> Optional[List[dict]]:
+        ring = self._rings.get(symbol_id)
+        if ring is None:
+            return None
+        return [{"timestamp": _dt(ts), "price": price} for ts, price in ring.recent(limit)]
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "symbols": len(self._rings),
+            "bytes": len(self._rings) * self.size * 16,
+            "observed": self.observed,
+            "dropped_stale": self.dropped_stale,
+        }
+
+
+price_buffers = PriceRingBuffers(settings.PRICE_BUFFER_SIZE)
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import select
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.exchanges import Exchange
+from common.models.markethistory import PriceHistory
+from common.utils.price_archive import DayWriter, PriceArchive
+from core_fetch.app.services.sharding import coordinator
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+RUNS_KEPT = 50
+
+
+def day_bounds(day: date):
+    start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start, start + timedelta(days=1)
+
+
+class PriceExporter:
+    """
+    Експорт закритих діб price_history у Parquet-архів (common.utils.price_archive).
+    Доба біржі вважається закритою через PRICE_EXPORT_LAG_MIN після опівночі UTC; кожен цикл
+    дописує відсутні файли за останні PRICE_EXPORT_LOOKBACK_DAYS діб; старші пропущені доби
+    (експортер лежав довше за lookback) дописуються CLI `export`.
+    Рядки стрімляться серверним курсором батчами по PRICE_EXPORT_BATCH_ROWS, запис файлу —
+    у потоці, щоб не блокувати event loop. Біржу експортує лише репліка-власник (sharding),
+    тож з кількома репліками PRICE_EXPORT_DIR має бути спільним томом.
+    Поки експорт увімкнено, retention (PartitionManager, RetentionEngine) не прибирає сирі
+    дані доби, доки для неї немає файлу кожної біржі — див. is_archived.
+    """
+
+    def __init__(self, root: str):
+        self.archive = PriceArchive(root)
+        self._task: Optional[asyncio.Task] = None
+        self.exported: List[dict] = []
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        # "біржа доба", на якій востаннє зупинився retention
+        self.blocking: Optional[str] = None
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if not settings.PRICE_EXPORT_ENABLED or self._task is not None:
+            return
+        log.info(f"📦 Price export → {self.archive.root}, lookback {settings.PRICE_EXPORT_LOOKBACK_DAYS}d")
+        self._task = asyncio.create_task(self._run(), name="price_exporter")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.exception(f"❌ Price export cycle failed: {e}")
+            await asyncio.sleep(settings.PRICE_EXPORT_INTERVAL_SEC)
+
+    # ---------- export ----------
+    async def _exchanges(self, codes: Optional[List[str]] = None) -> List[Exchange]:
+        async with SessionLocal() as session:
+            query = select(Exchange)
+            # без codes — усі біржі, зокрема деактивовані: їхні старі тики теж мають потрапити в архів
+            if codes:
+                query = query.where(Exchange.code.in_([c.upper() for c in codes]))
+            return list((await session.execute(query)).scalars().all())
+
+    def closed_days(self, start: date, end: date, now: Optional[datetime] = None) -> List[date]:
+        """Доби [start, end], що вже закриті (кінець доби + lag у минулому)."""
+        now = now or datetime.now(timezone.utc)
+        lag = timedelta(minutes=settings.PRICE_EXPORT_LAG_MIN)
+        days, day = [], start
+        while day <= end:
+            if day_bounds(day)[1] + lag <= now:
+                days.append(day)
+            day += timedelta(days=1)
+        return days
+
+    async def run_once(self) -> int:
+        now = datetime.now(timezone.utc)
+        today = now.date()
+        days = self.closed_days(today - timedelta(days=settings.PRICE_EXPORT_LOOKBACK_DAYS), today, now)
+        exported = 0
+        for ex in await self._exchanges():
+            if not coordinator.owns_exchange(ex.id):
+                continue
+            for day in days:
+                if self.archive.has_day(ex.code, day):
+                    continue
+                await self.export_day(ex, day)
+                exported += 1
+        self.last_run = now
+        return exported
+
+    async def export(self, codes: List[str], start: date, end: date, force: bool = False) -> List[dict]:
+        """Разовий експорт діапазону діб (CLI); force — перезаписати вже наявні файли."""
+        results = []
+        days = self.closed_days(start, end)
+        for ex in await self._exchanges(codes):
+            for day in days:
+                if not force and self.archive.has_day(ex.code, day):
+                    continue
+                results.append(await self.export_day(ex, day))
+        return results
+
+    async def export_day(self, exchange: Exchange, day: date) -> dict:
+        lo, hi = day_bounds(day)
+        started = datetime.now(timezone.utc)
+        writer = await asyncio.to_thread(DayWriter, self.archive.root, exchange.code, day)
+        try:
+            async with SessionLocal() as session:
+                result = await session.stream(
+                    select(PriceHistory.symbol_id, PriceHistory.timestamp, PriceHistory.price)
+                    .where(
+                        PriceHistory.exchange_id == exchange.id,
+                        PriceHistory.timestamp >= lo,
+                        PriceHistory.timestamp < hi,
+                    )
+                    .order_by(PriceHistory.symbol_id, PriceHistory.timestamp)
+                    .execution_options(yield_per=settings.PRICE_EXPORT_BATCH_ROWS)
+                )
+                async for rows in result.partitions():
+                    await asyncio.to_thread(
+                        writer.write,
+                        [str(r[0]) for r in rows],
+                        [r[1] for r in rows],
+                        [float(r[2]) for r in rows],
+                    )
+            # порожня доба теж отримує файл — щоб не перевіряти її кожен цикл
+            rows = await asyncio.to_thread(writer.close)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+
+        entry = {
+            "exchange": exchange.code,
+            "day": day.isoformat(),
+            "rows": rows,
+            "duration_sec": round((datetime.now(timezone.utc) - started).total_seconds(), 2),
+        }
+        self.exported = (self.exported + [entry])[-RUNS_KEPT:]
+        log.info(f"📦 Exported {exchange.code} {day}: {rows} ticks in {entry['duration_sec']}s")
+        return entry
+
+    async def is_archived(self, lo: datetime, hi: datetime) -> bool:
+        """Чи є файл кожної біржі за кожну добу, що перетинає [lo, hi). Без експорту — завжди True."""
+        if not settings.PRICE_EXPORT_ENABLED:
+            return True
+        first, last = lo.astimezone(timezone.utc).date(), (hi - timedelta(microseconds=1)).astimezone(timezone.utc).date()
+        codes = [ex.code for ex in await self._exchanges()]
+        day = first
+        while day <= last:
+            missing = next((code for code in codes if not self.archive.has_day(code, day)), None)
+            if missing is not None:
+                self.blocking = f"{missing} {day.isoformat()}"
+                log.warning(f"⏸️ Raw price_history for {day} is kept: {missing} is not archived yet")
+                return False
+            day += timedelta(days=1)
+        self.blocking = None
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "enabled": settings.PRICE_EXPORT_ENABLED,
+            "root": self.archive.root,
+            "lookback_days": settings.PRICE_EXPORT_LOOKBACK_DAYS,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "recently_exported": self.exported,
+            "retention_blocked_by": self.blocking,
+            "last_error": self.last_error,
+        }
+
+
+price_exporter = PriceExporter(settings.PRICE_EXPORT_DIR)
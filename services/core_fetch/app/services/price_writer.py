@@ -0,0 +1,225 @@
+import time
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, List, Optional
+
+from sqlalchemy import insert
+
+from common.deps.session import engine, SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.markethistory import PriceHistory
+from core_fetch.app.services import metrics
+from core_fetch.app.services.deadband import DeadbandFilter
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+COPY_COLUMNS = ["timestamp", "exchange_id", "symbol_id", "price"]
+
+
+@dataclass(slots=True)
+class PriceTick:
+    timestamp: datetime
+    exchange_id: uuid.UUID
+    symbol_id: uuid.UUID
+    price: float
+
+
+class PriceWriter:
+    """
+    Write-behind запис PriceHistory.
+    Fetch-шлях кладе тики в обмежену asyncio.Queue; фонова задача зливає їх батчами
+    (по розміру або по часу) через asyncpg COPY, з fallback на multi-row INSERT.
+    Якщо БД повільна — черга заповнюється і submit() чекає (backpressure).
+    Слухачі бачать кожен тик; у чергу потрапляють лише ті, що пройшли deadband
+    (правило відновлення ряду — див. DeadbandFilter).
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval_sec: float):
+        self.batch_size = batch_size
+        self.flush_interval_sec = flush_interval_sec
+        self.queue: asyncio.Queue[PriceTick] = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        # батч, який flush-ився в момент зупинки
+        self._pending: List[PriceTick] = []
+        self._use_copy = settings.PRICE_WRITER_USE_COPY
+        # COPY після PRICE_WRITER_COPY_MAX_FAILURES помилок підряд вимикається на cooldown
+        self._copy_failures = 0
+        self._copy_disabled_until = 0.0
+        self.written = 0
+        self.failed = 0
+        # синхронні слухачі, яким передається кожен тик при надходженні (planner, кеші тощо)
+        self._listeners: List[Callable[[PriceTick], None]] = []
+        self.deadband = DeadbandFilter(
+            mode=settings.PRICE_DEADBAND_MODE,
+            value=settings.PRICE_DEADBAND_VALUE,
+            heartbeat_sec=settings.PRICE_DEADBAND_HEARTBEAT_SEC,
+        )
+
+    # ---------- producer API ----------
+    def add_listener(self, listener: Callable[[PriceTick], None]) -> None:
+        self._listeners.append(listener)
+
+    def _notify(self, tick: PriceTick) -> None:
+        for listener in self._listeners:
+            try:
+                listener(tick)
+            except Exception as e:
+                log.warning(f"⚠️ PriceWriter listener {listener} failed: {e}")
+
+    async def submit(self, tick: PriceTick) -> None:
+        self._notify(tick)
+        if self.deadband.accept(tick.symbol_id, tick.price, tick.timestamp):
+            await self.queue.put(tick)
+
+    async def submit_many(self, ticks: List[PriceTick]) -> None:
+        for tick in ticks:
+            self._notify(tick)
+            if self.deadband.accept(tick.symbol_id, tick.price, tick.timestamp):
+                await self.queue.put(tick)
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="price_writer")
+            log.info(
+                f"🟢 PriceWriter started (batch={self.batch_size}, "
+                f"flush={self.flush_interval_sec}s, queue={self.queue.maxsize})"
+            )
+
+    async def stop(self) -> None:
+        """Зупиняє writer і дописує все, що лишилось у черзі."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._pending:
+            await self._flush(self._pending)
+            self._pending = []
+        batch = self._drain(self.batch_size)
+        while batch:
+            await self._flush(batch)
+            batch = self._drain(self.batch_size)
+        log.info(f"🛑 PriceWriter stopped ({self.written} written, {self.failed} failed)")
+
+    # ---------- consumer ----------
+    def _drain(self, limit: int) -> List[PriceTick]:
+        batch: List[PriceTick] = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            first = await self.queue.get()
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval_sec
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+                batch.extend(self._drain(self.batch_size - len(batch)))
+
+            # якщо shutdown скасує flush, stop() допише цей батч
+            self._pending = batch
+            await self._flush(batch)
+            self._pending = []
+
+    async def _flush(self, batch: List[PriceTick]) -> None:
+        if not batch:
+            return
+        started = time.monotonic()
+        method = "copy" if self._copy_available() else "insert"
+        metrics.DB_WRITE_BATCH.observe(len(batch))
+        try:
+            if method == "copy":
+                try:
+                    await self._copy(batch)
+                    self._copy_failures = 0
+                except Exception as e:
+                    # лише цей батч іде через INSERT; COPY лишається основним шляхом
+                    self._copy_failed(e)
+                    method = "insert"
+                    await self._insert(batch)
+            else:
+                await self._insert(batch)
+            self.written += len(batch)
+            metrics.DB_ROWS.labels("ok").inc(len(batch))
+            log.debug(f"💾 Flushed {len(batch)} prices in {time.monotonic() - started:.3f}s")
+        except Exception as e:
+            self.failed += len(batch)
+            metrics.DB_ROWS.labels("failed").inc(len(batch))
+            # ці ціни не збереглись — наступний тик символу не повинен відсікатись відносно них
+            for tick in batch:
+                self.deadband.forget(tick.symbol_id)
+            log.exception(f"❌ PriceWriter flush of {len(batch)} rows failed: {e}")
+        finally:
+            metrics.DB_WRITE_LATENCY.labels(method).observe(time.monotonic() - started)
+
+    def _copy_available(self) -> bool:
+        return self._use_copy and time.monotonic() >= self._copy_disabled_until
+
+    def _copy_failed(self, error: Exception) -> None:
+        self._copy_failures += 1
+        if self._copy_failures < settings.PRICE_WRITER_COPY_MAX_FAILURES:
+            log.warning(f"⚠️ COPY into price_history failed ({self._copy_failures}), batch falls back to INSERT: {error}")
+            return
+        self._copy_disabled_until = time.monotonic() + settings.PRICE_WRITER_COPY_COOLDOWN_SEC
+        self._copy_failures = 0
+        log.warning(
+            f"⚠️ COPY into price_history failed {settings.PRICE_WRITER_COPY_MAX_FAILURES} times in a row, "
+            f"using INSERT for {settings.PRICE_WRITER_COPY_COOLDOWN_SEC}s: {error}"
+        )
+
+    def stats(self) -> dict:
+        return {
+            "mode": "copy" if self._copy_available() else "insert",
+            "copy_enabled": self._use_copy,
+            "copy_disabled_for_sec": round(max(self._copy_disabled_until - time.monotonic(), 0), 1),
+            "copy_failures": self._copy_failures,
+            "queued": self.queue.qsize(),
+            "written": self.written,
+            "failed": self.failed,
+        }
+
+    async def _copy(self, batch: List[PriceTick]) -> None:
+        records = [
+            (t.timestamp, t.exchange_id, t.symbol_id, Decimal(str(t.price)))
+            for t in batch
+        ]
+        async with engine.connect() as conn:
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                PriceHistory.__tablename__, records=records, columns=COPY_COLUMNS
+            )
+
+    async def _insert(self, batch: List[PriceTick]) -> None:
+        rows = [
+            dict(timestamp=t.timestamp, exchange_id=t.exchange_id, symbol_id=t.symbol_id, price=t.price)
+            for t in batch
+        ]
+        async with SessionLocal() as session:
+            await session.execute(insert(PriceHistory), rows)
+            await session.commit()
+
+
+price_writer = PriceWriter(
+    max_queue=settings.PRICE_WRITER_QUEUE_SIZE,
+    batch_size=settings.PRICE_WRITER_BATCH_SIZE,
+    flush_interval_sec=settings.PRICE_WRITER_FLUSH_SEC,
+)
@@ -0,0 +1,201 @@
+import time
+import asyncio
+import logging
+from typing import Dict, Optional, List
+
+import httpx
+from sqlalchemy import select
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models import Exchange, ExchangeLimit
+from core_fetch.app.services import metrics
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+# тривалість інтервалу ExchangeLimit у секундах
+INTERVAL_SECONDS = {
+    "SECOND": 1,
+    "MINUTE": 60,
+    "HOUR": 3600,
+    "DAY": 86400,
+}
+# суфікс заголовка X-MBX-USED-WEIGHT-<n><unit> → одиниця інтервалу
+HEADER_UNITS = {"s": "SECOND", "m": "MINUTE", "h": "HOUR", "d": "DAY"}
+USED_WEIGHT_HEADER = "x-mbx-used-weight-"
+
+# якщо в exchange_limits нічого немає — консервативний дефолт
+DEFAULT_LIMIT_PER_MIN = 600
+
+
+class TokenBucket:
+    """
+    Token bucket: `capacity` токенів, поповнення `refill_per_sec` токенів/сек.
+    Вага запиту = кількість токенів, що списуються перед викликом.
+    """
+
+    def __init__(self, exchange_code: str, capacity: float, refill_per_sec: float,
+                 windows: Optional[Dict[str, float]] = None):
+        self.exchange_code = exchange_code
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        # {interval key, напр. "1MINUTE": ліміт ваги} — для звірки з заголовками біржі
+        self.windows = windows or {}
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.loaded_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_per_sec)
+        self.updated = now
+
+    async def acquire(self, weight: float = 1) -> None:
+        weight = min(weight, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill()
+                if self.tokens >= weight:
+                    self.tokens -= weight
+                    return
+                await asyncio.sleep((weight - self.tokens) / self.refill_per_sec)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+        log.warning(f"⏸️ Rate limit backoff for {self.exchange_code}: {seconds:.1f}s")
+
+    def sync_used(self, window_key: str, used: float) -> None:
+        """Підрізає локальний бюджет за фактичною вагою, яку повідомила біржа."""
+        limit = self.windows.get(window_key)
+        if not limit:
+            return
+        self._refill()
+        remaining = limit * settings.RATE_LIMIT_SAFETY - used
+        if remaining < self.tokens:
+            self.tokens = max(0.0, remaining)
+
+
+# =========================
+# registry
+# =========================
+_buckets: Dict[str, TokenBucket] = {}
+_load_lock = asyncio.Lock()
+
+
+def build_bucket(exchange_code: str, limits: List[ExchangeLimit], rate_limit_per_min: Optional[int]) -> TokenBucket:
+    """
+    Обирає найжорсткіший REQUEST_WEIGHT ліміт (найменша швидкість поповнення)
+    серед exchange_limits і Exchange.rate_limit_per_min.
+    """
+    safety = settings.RATE_LIMIT_SAFETY
+    windows: Dict[str, float] = {}
+    candidates = []  # (refill_per_sec, capacity)
+
+    for lim in limits:
+        if lim.limit_type != "REQUEST_WEIGHT":
+            continue
+        unit_sec = INTERVAL_SECONDS.get(lim.interval_unit)
+        if not unit_sec or not lim.limit:
+            continue
+        window_sec = unit_sec * lim.interval_num
+        windows[f"{lim.interval_num}{lim.interval_unit}"] = lim.limit
+        candidates.append((lim.limit * safety / window_sec, lim.limit * safety))
+
+    if rate_limit_per_min:
+        windows.setdefault("1MINUTE", rate_limit_per_min)
+        candidates.append((rate_limit_per_min * safety / 60, rate_limit_per_min * safety))
+
+    if not candidates:
+        candidates.append((DEFAULT_LIMIT_PER_MIN * safety / 60, DEFAULT_LIMIT_PER_MIN * safety))
+
+    refill, capacity = min(candidates, key=lambda c: c[0])
+    # burst не більше ніж за BURST_SEC секунд поповнення, щоб не вичерпати хвилинне вікно за мить
+    capacity = max(1.0, min(capacity, refill * settings.RATE_LIMIT_BURST_SEC))
+    return TokenBucket(exchange_code, capacity, refill, windows)
+
+
+async def get_bucket(exchange_code: str) -> TokenBucket:
+    key = exchange_code.upper()
+    bucket = _buckets.get(key)
+    if bucket and time.monotonic() - bucket.loaded_at < settings.RATE_LIMIT_RELOAD_SEC:
+        return bucket
+
+    async with _load_lock:
+        bucket = _buckets.get(key)
+        if bucket and time.monotonic() - bucket.loaded_at < settings.RATE_LIMIT_RELOAD_SEC:
+            return bucket
+
+        async with SessionLocal() as session:
+            res = await session.execute(select(Exchange).where(Exchange.code == key))
+            ex = res.scalar_one_or_none()
+            limits = []
+            if ex:
+                res = await session.execute(select(ExchangeLimit).where(ExchangeLimit.exchange_id == ex.id))
+                limits = res.scalars().all()
+
+        new_bucket = build_bucket(key, limits, ex.rate_limit_per_min if ex else None)
+        if bucket:
+            # зберігаємо поточний стан, щоб перезавантаження лімітів не давало "безкоштовний" burst
+            new_bucket.tokens = min(new_bucket.capacity, bucket.tokens)
+            new_bucket.paused_until = bucket.paused_until
+        _buckets[key] = new_bucket
+        log.info(
+            f"🪣 Rate limit bucket for {key}: {new_bucket.refill_per_sec * 60:.0f}/min, "
+            f"burst={new_bucket.capacity:.0f}"
+        )
+        return new_bucket
+
+
+def invalidate_bucket(exchange_code: str) -> None:
+    """Примусово перечитати ліміти при наступному acquire (після refresh_limits)."""
+    bucket = _buckets.get(exchange_code.upper())
+    if bucket:
+        bucket.loaded_at = 0.0
+
+
+async def acquire(exchange_code: str, weight: float = 1) -> None:
+    bucket = await get_bucket(exchange_code)
+    started = time.monotonic()
+    await bucket.acquire(weight)
+    metrics.RATE_LIMIT_WAIT.labels(bucket.exchange_code).observe(time.monotonic() - started)
+    metrics.RATE_LIMIT_WEIGHT.labels(bucket.exchange_code).inc(weight)
+
+
+def observe_response(exchange_code: str, resp: httpx.Response) -> None:
+    """
+    Підлаштовує бакет за відповіддю біржі:
+      - X-MBX-USED-WEIGHT-1M і подібні → фактично використана вага;
+      - 429 / 418 → пауза на Retry-After (418 = IP бан у Binance).
+    """
+    bucket = _buckets.get(exchange_code.upper())
+    if bucket is None:
+        return
+
+    for name, value in resp.headers.items():
+        name = name.lower()
+        if not name.startswith(USED_WEIGHT_HEADER):
+            continue
+        suffix = name[len(USED_WEIGHT_HEADER):]
+        unit = HEADER_UNITS.get(suffix[-1:])
+        if not unit or not suffix[:-1].isdigit():
+            continue
+        try:
+            bucket.sync_used(f"{int(suffix[:-1])}{unit}", float(value))
+        except ValueError:
+            continue
+
+    if resp.status_code in (429, 418):
+        retry_after = resp.headers.get("Retry-After")
+        try:
+            seconds = float(retry_after) if retry_after else settings.RATE_LIMIT_DEFAULT_BACKOFF_SEC
+        except ValueError:
+            seconds = settings.RATE_LIMIT_DEFAULT_BACKOFF_SEC
+        bucket.pause(seconds)
@@ -0,0 +1,362 @@
+import re
+import uuid
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Integer, bindparam, select, func, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.markethistory import PriceHistory, PriceRollup, RetentionWatermark
+from core_fetch.app.services.candles import bucket_start
+from core_fetch.app.services.partitions import partition_manager
+from core_fetch.app.services.price_export import price_exporter
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+RAW = "raw"
+SOURCE = PriceHistory.__tablename__
+LOCK_KEY = "price_history_retention"
+
+_DURATION = re.compile(r"^(\d+)([smhdw])$")
+_UNIT_SEC = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# OHLC бакетів тиру з сирих тиків чанку; бакет вирівняний від epoch — як у CandleAggregator.
+# Конфлікт зливається як у candle_upsert: high/low — extrema, open/close — від найранішого/
+# найпізнішого тику. Бакети grace-вікна згортаються повторно з тих самих сирих тиків плюс
+# запізнілі, тож tick_count — максимум, а не сума: перезгортка не подвоює лічильник
+ROLLUP_SQL = text("""
+    INSERT INTO price_rollups (symbol_id, tier, bucket_start, exchange_id, open, high, low, close,
+                               tick_count, first_tick_at, last_tick_at)
+    SELECT symbol_id, :tier, bucket,
+           (array_agg(exchange_id))[1],
+           (array_agg(price ORDER BY "timestamp"))[1],
+           max(price), min(price),
+           (array_agg(price ORDER BY "timestamp" DESC))[1],
+           count(*), min("timestamp"), max("timestamp")
+    FROM (
+        SELECT symbol_id, exchange_id, price, "timestamp",
+               to_timestamp(floor(extract(epoch FROM "timestamp") / :seconds) * :seconds) AS bucket
+        FROM price_history
+        WHERE "timestamp" >= :lo AND "timestamp" < :hi
+    ) ticks
+    GROUP BY symbol_id, bucket
+    ON CONFLICT (symbol_id, tier, bucket_start) DO UPDATE SET
+        high = GREATEST(price_rollups.high, EXCLUDED.high),
+        low = LEAST(price_rollups.low, EXCLUDED.low),
+        open = CASE WHEN EXCLUDED.first_tick_at < price_rollups.first_tick_at
+                    THEN EXCLUDED.open ELSE price_rollups.open END,
+        first_tick_at = LEAST(price_rollups.first_tick_at, EXCLUDED.first_tick_at),
+        close = CASE WHEN EXCLUDED.last_tick_at >= price_rollups.last_tick_at
+                     THEN EXCLUDED.close ELSE price_rollups.close END,
+        last_tick_at = GREATEST(price_rollups.last_tick_at, EXCLUDED.last_tick_at),
+        tick_count = GREATEST(price_rollups.tick_count, EXCLUDED.tick_count),
+        updated_at = now()
+""").bindparams(bindparam("seconds", type_=Integer))
+
+
+def parse_duration(value: str) -> int:
+    match = _DURATION.match(value.strip())
+    if not match:
+        raise ValueError(f"Bad duration {value!r}, expected e.g. 30s, 1m, 1h, 7d, 2w")
+    return int(match.group(1)) * _UNIT_SEC[match.group(2)]
+
+
+@dataclass(frozen=True)
+class Tier:
+    code: str
+    # розмір бакета; 0 — сирі тики
+    seconds: int
+    # None — зберігати назавжди
+    keep: Optional[timedelta]
+
+
+def parse_tiers(spec: str) -> List[Tier]:
+    """
+    "raw=7d,1m=90d,1h=0" → [raw 7d, 1m 90d, 1h назавжди].
+    Перший тир — raw зі скінченним keep, далі тири свічок від дрібного до грубого.
+    """
+    tiers: List[Tier] = []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        code, _, keep = part.partition("=")
+        code, keep = code.strip(), keep.strip()
+        keep_sec = 0 if keep in ("", "0") else parse_duration(keep)
+        tiers.append(Tier(
+            code=code,
+            seconds=0 if code == RAW else parse_duration(code),
+            keep=timedelta(seconds=keep_sec) if keep_sec else None,
+        ))
+    if not tiers:
+        return []
+    if tiers[0].code != RAW or tiers[0].keep is None:
+        raise ValueError("PRICE_RETENTION_TIERS must start with raw=<duration>")
+    if len(tiers) < 2:
+        raise ValueError("PRICE_RETENTION_TIERS needs at least one candle tier after raw")
+    for finer, coarser in zip(tiers[1:], tiers[2:]):
+        if coarser.seconds <= finer.seconds or coarser.seconds % finer.seconds:
+            raise ValueError(f"Tier {coarser.code} must be a coarser multiple of {finer.code}")
+    for finer, coarser in zip(tiers, tiers[1:]):
+        if finer.keep is None or (coarser.keep is not None and coarser.keep < finer.keep):
+            raise ValueError(f"Tier {coarser.code} must be kept at least as long as {finer.code}")
+    return tiers
+
+
+class RetentionEngine:
+    """
+    Tiered retention price_history.
+    Сирі тики старші за keep тиру raw згортаються time-чанками (PRICE_RETENTION_CHUNK_MIN)
+    в OHLC кожного тиру (price_rollups, не price_candles — keep тирів не чіпає свічки
+    Timeframe з тим же кодом) одним INSERT ... SELECT ... GROUP BY на тир; чанк і зсув
+    retention_watermarks — одна транзакція, тож перерваний цикл продовжує з watermark.
+    Запізнілі тики: кожен чанк згортає [watermark - grace, watermark + chunk), де grace —
+    PRICE_RETENTION_LATE_GRACE_MIN, округлене до бакета найгрубішого тиру; тик, що прийшов
+    пізніше за grace під watermark, у тири вже не потрапляє.
+    Сирі дані нижче watermark - grace прибираються: у партиційованій таблиці — drop/detach
+    цілих партицій (без DELETE і vacuum), інакше — DELETE в тій же транзакції, що й чанк.
+    З PRICE_EXPORT_ENABLED сирі дані прибираються лише після Parquet-експорту їхніх діб.
+    Тири чистяться пакетами по PRICE_RETENTION_DELETE_BATCH за своїм keep.
+    read_series віддає для довільного діапазону найдрібніший доступний тир по кожному відрізку.
+    """
+
+    def __init__(self, spec: str):
+        try:
+            self.tiers = parse_tiers(spec)
+        except ValueError as e:
+            log.error(f"❌ Invalid PRICE_RETENTION_TIERS={spec!r}: {e}; tiered retention disabled")
+            self.tiers = []
+        self._task: Optional[asyncio.Task] = None
+        self.rolled_until: Optional[datetime] = None
+        self.rolled_chunks = 0
+        self.purged_candles = 0
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.tiers)
+
+    @property
+    def candle_tiers(self) -> List[Tier]:
+        return self.tiers[1:]
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        if not self.enabled:
+            return
+        described = ", ".join(f"{t.code}={t.keep or 'forever'}" for t in self.tiers)
+        log.info(f"🧊 Tiered retention: {described}")
+        self._task = asyncio.create_task(self._run(), name="retention_engine")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.exception(f"❌ Retention cycle failed: {e}")
+            await asyncio.sleep(settings.PRICE_RETENTION_INTERVAL_SEC)
+
+    # ---------- cycle ----------
+    async def run_once(self) -> None:
+        now = datetime.now(timezone.utc)
+        coarsest = self.candle_tiers[-1].seconds
+        # згортаються лише цілі бакети найгрубішого тиру, тож і дрібніші тири отримують повні бакети
+        cutoff = bucket_start(now - self.tiers[0].keep, coarsest)
+        chunk = timedelta(seconds=max(settings.PRICE_RETENTION_CHUNK_MIN * 60 // coarsest, 1) * coarsest)
+        grace = self.grace
+
+        async with SessionLocal() as session:
+            partitioned = await partition_manager.is_partitioned(session)
+
+        rolled = 0
+        while await self._roll_chunk(cutoff, chunk, grace, partitioned):
+            rolled += 1
+        self.rolled_chunks += rolled
+
+        removed = []
+        if partitioned and self.rolled_until is not None:
+            removed = await partition_manager.remove_below(self.rolled_until - grace) or []
+
+        purged = await self._purge_tiers(now)
+        self.purged_candles += purged
+        self.last_run = now
+        if rolled or removed or purged:
+            log.info(
+                f"🧊 Retention: rolled {rolled} chunks up to {self.rolled_until}, "
+                f"raw partitions removed {removed or '-'}, {purged} expired candles purged"
+            )
+
+    @property
+    def grace(self) -> timedelta:
+        """Вікно перезгортки під watermark, кратне бакету найгрубішого тиру (межі бакетів не ріжуться)."""
+        coarsest = self.candle_tiers[-1].seconds
+        return timedelta(seconds=-(-settings.PRICE_RETENTION_LATE_GRACE_MIN * 60 // coarsest) * coarsest)
+
+    async def _roll_chunk(self, cutoff: datetime, chunk: timedelta, grace: timedelta, partitioned: bool) -> bool:
+        """
+        Згортає чанк [watermark - grace, watermark + chunk) і зсуває watermark на chunk.
+        False — нема що робити.
+        """
+        async with SessionLocal() as session:
+            got_lock = (await session.execute(
+                text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"), {"key": LOCK_KEY}
+            )).scalar()
+            if not got_lock:
+                return False
+
+            watermark = await self._load_watermark(session, lock=True)
+            if watermark is None:
+                # порожня таблиця
+                return False
+            if watermark >= cutoff:
+                self.rolled_until = watermark
+                return False
+
+            lo, hi = watermark, min(watermark + chunk, cutoff)
+            # DELETE нижче — лише після Parquet-експорту діб, які він прибирає
+            if not partitioned and not await price_exporter.is_archived(lo - grace, hi - grace):
+                self.rolled_until = watermark
+                return False
+            for tier in self.candle_tiers:
+                await session.execute(
+                    ROLLUP_SQL, {"tier": tier.code, "seconds": tier.seconds, "lo": lo - grace, "hi": hi}
+                )
+            if not partitioned:
+                # без нижньої межі: разом з чанком ідуть і тики, що запізнились більше ніж на grace
+                await session.execute(
+                    text('DELETE FROM price_history WHERE "timestamp" < :hi'),
+                    {"hi": hi - grace},
+                )
+            stmt = insert(RetentionWatermark).values(source=SOURCE, rolled_until=hi)
+            await session.execute(stmt.on_conflict_do_update(
+                index_elements=[RetentionWatermark.source],
+                set_={"rolled_until": stmt.excluded.rolled_until, "updated_at": func.now()},
+            ))
+            await session.commit()
+
+        self.rolled_until = hi
+        return True
+
+    async def _load_watermark(self, session: AsyncSession, lock: bool = False) -> Optional[datetime]:
+        query = select(RetentionWatermark.rolled_until).where(RetentionWatermark.source == SOURCE)
+        watermark = (await session.execute(query.with_for_update() if lock else query)).scalar_one_or_none()
+        if watermark is not None:
+            return watermark
+        # перший запуск: найстаріший тик (одноразовий повний прохід — btree по timestamp немає)
+        first = (await session.execute(select(func.min(PriceHistory.timestamp)))).scalar()
+        return bucket_start(first, self.candle_tiers[-1].seconds) if first else None
+
+    async def _purge_tiers(self, now: datetime) -> int:
+        purged = 0
+        for tier in self.candle_tiers:
+            if tier.keep is None:
+                continue
+            cutoff = now - tier.keep
+            while True:
+                async with SessionLocal() as session:
+                    res = await session.execute(
+                        text(
+                            "DELETE FROM price_rollups WHERE ctid IN ("
+                            "  SELECT ctid FROM price_rollups"
+                            "  WHERE tier = :tier AND bucket_start < :cutoff LIMIT :batch)"
+                        ),
+                        {"tier": tier.code, "cutoff": cutoff, "batch": settings.PRICE_RETENTION_DELETE_BATCH},
+                    )
+                    await session.commit()
+                deleted = res.rowcount or 0
+                purged += deleted
+                if deleted < settings.PRICE_RETENTION_DELETE_BATCH:
+                    break
+        return purged
+
+    # ---------- reads ----------
+    def plan(self, start: datetime, end: datetime, now: Optional[datetime] = None,
+             rolled_until: Optional[datetime] = None) -> List[Tuple[Tier, datetime, datetime]]:
+        """[(тир, from, to)] від старого до нового: кожен відрізок — з найдрібнішого тиру, що його ще тримає."""
+        if not self.enabled:
+            return [(Tier(RAW, 0, None), start, end)]
+        now = now or datetime.now(timezone.utc)
+        segments = []
+        upper = end
+        for tier in self.tiers:
+            if tier.code == RAW:
+                available = rolled_until
+            else:
+                available = bucket_start(now - tier.keep, tier.seconds) if tier.keep else None
+            lower = max(start, available) if available else start
+            if lower < upper:
+                segments.append((tier, lower, upper))
+                upper = lower
+            if upper <= start:
+                break
+        return list(reversed(segments))
+
+    async def read_series(self, session: AsyncSession, symbol_id: uuid.UUID,
+                          start: datetime, end: datetime, limit: int) -> List[dict]:
+        """Ряд цін символу за [start, end): свіже — сирими тиками, старе — прозоро з грубших тирів."""
+        rolled_until = await self._load_watermark(session) if self.enabled else None
+        points: List[dict] = []
+        for tier, lo, hi in self.plan(start, end, rolled_until=rolled_until):
+            left = limit - len(points)
+            if left <= 0:
+                break
+            if tier.code == RAW:
+                res = await session.execute(
+                    select(PriceHistory.timestamp, PriceHistory.price)
+                    .where(PriceHistory.symbol_id == symbol_id, PriceHistory.timestamp >= lo, PriceHistory.timestamp < hi)
+                    .order_by(PriceHistory.timestamp)
+                    .limit(left)
+                )
+                points.extend(
+                    dict(tier=RAW, timestamp=ts, open=price, high=price, low=price, close=price)
+                    for ts, price in res.all()
+                )
+            else:
+                res = await session.execute(
+                    select(PriceRollup.bucket_start, PriceRollup.open, PriceRollup.high, PriceRollup.low, PriceRollup.close)
+                    .where(
+                        PriceRollup.symbol_id == symbol_id,
+                        PriceRollup.tier == tier.code,
+                        PriceRollup.bucket_start >= lo,
+                        PriceRollup.bucket_start < hi,
+                    )
+                    .order_by(PriceRollup.bucket_start)
+                    .limit(left)
+                )
+                points.extend(
+                    dict(tier=tier.code, timestamp=ts, open=o, high=h, low=l, close=c)
+                    for ts, o, h, l, c in res.all()
+                )
+        return points
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "tiers": [{"tier": t.code, "keep_days": t.keep.days if t.keep else None} for t in self.tiers],
+            "late_grace_min": int(self.grace.total_seconds() // 60) if self.enabled else None,
+            "rolled_until": self.rolled_until.isoformat() if self.rolled_until else None,
+            "rolled_chunks": self.rolled_chunks,
+            "purged_candles": self.purged_candles,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_error": self.last_error,
+        }
+
+
+retention_engine = RetentionEngine(settings.PRICE_RETENTION_TIERS)
@@ -0,0 +1,134 @@
+import os
+import uuid
+import zlib
+import socket
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.scheduler import CoreFetchReplica
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+
+class ReplicaCoordinator:
+    """
+    Розподіл роботи між репліками core_fetch через lease-таблицю core_fetch_replicas.
+    Кожна репліка шле heartbeat; живі — ті, чий heartbeat молодший за SHARD_LEASE_SEC.
+    Власник ключа (біржа для refresh, шард символів біржі для цін/стрімів) обирається
+    rendezvous-хешуванням по живих репліках: при вході/виході репліки переїжджає
+    лише її частка ключів, а job-и перевіряють власність у момент запуску.
+    Без SHARDING_ENABLED репліка вважає себе власником усього.
+    """
+
+    def __init__(self):
+        self.enabled = settings.SHARDING_ENABLED
+        self.replica_id = os.getenv("POD_NAME") or f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
+        self.replicas: List[str] = [self.replica_id]
+        self._task: Optional[asyncio.Task] = None
+        # викликаються після зміни складу реплік (перепідписка стрімів тощо)
+        self._listeners: List[Callable[[], Awaitable[None]]] = []
+
+    def add_listener(self, listener: Callable[[], Awaitable[None]]) -> None:
+        self._listeners.append(listener)
+
+    # ---------- lifecycle ----------
+    async def start(self) -> None:
+        if not self.enabled:
+            log.info("ℹ️ Sharding disabled (SHARDING_ENABLED=false), this replica owns all work")
+            return
+        # перший heartbeat синхронно — щоб load_jobs і стріми вже бачили склад кластера
+        await self._beat()
+        self._task = asyncio.create_task(self._heartbeat_loop(), name="replica_heartbeat")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # відпускаємо lease одразу, щоб інші репліки забрали частку без очікування TTL
+        try:
+            async with SessionLocal() as session:
+                await session.execute(delete(CoreFetchReplica).where(CoreFetchReplica.replica_id == self.replica_id))
+                await session.commit()
+        except Exception as e:
+            log.warning(f"⚠️ Failed to release replica lease {self.replica_id}: {e}")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SHARD_HEARTBEAT_SEC)
+            try:
+                await self._beat()
+            except Exception as e:
+                log.warning(f"⚠️ Replica heartbeat failed: {e}")
+
+    async def _beat(self) -> None:
+        now = datetime.now(timezone.utc)
+        expired = now - timedelta(seconds=settings.SHARD_LEASE_SEC)
+        async with SessionLocal() as session:
+            stmt = insert(CoreFetchReplica).values(
+                replica_id=self.replica_id, hostname=socket.gethostname(), heartbeat_at=now
+            )
+            await session.execute(
+                stmt.on_conflict_do_update(
+                    index_elements=[CoreFetchReplica.replica_id],
+                    set_={"heartbeat_at": stmt.excluded.heartbeat_at},
+                )
+            )
+            await session.execute(delete(CoreFetchReplica).where(CoreFetchReplica.heartbeat_at < expired))
+            res = await session.execute(select(CoreFetchReplica.replica_id).order_by(CoreFetchReplica.replica_id))
+            replicas = [row[0] for row in res.all()]
+            await session.commit()
+
+        if self.replica_id not in replicas:
+            replicas.append(self.replica_id)
+        replicas = sorted(replicas)
+        if replicas == self.replicas:
+            return
+
+        log.info(f"🧩 Replica set changed: {self.replicas} → {replicas} (me={self.replica_id})")
+        self.replicas = replicas
+        for listener in self._listeners:
+            try:
+                await listener()
+            except Exception as e:
+                log.warning(f"⚠️ Rebalance listener {listener} failed: {e}")
+
+    # ---------- ownership ----------
+    @staticmethod
+    def _score(replica_id: str, key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(f"{replica_id}|{key}".encode(), digest_size=8).digest(), "big")
+
+    def owner(self, key: str) -> str:
+        return max(self.replicas, key=lambda r: self._score(r, key))
+
+    def owns(self, key: str) -> bool:
+        if not self.enabled or len(self.replicas) <= 1:
+            return True
+        return self.owner(key) == self.replica_id
+
+    def owns_exchange(self, exchange_id: uuid.UUID) -> bool:
+        return self.owns(f"exchange:{exchange_id}")
+
+    def owns_symbol(self, exchange_id: uuid.UUID, symbol_id: str) -> bool:
+        """Символи біржі діляться на SHARD_SYMBOL_SHARDS шардів — так одну велику біржу тягнуть кілька реплік."""
+        shard = zlib.crc32(symbol_id.encode()) % max(settings.SHARD_SYMBOL_SHARDS, 1)
+        return self.owns(f"prices:{exchange_id}:{shard}")
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "replica_id": self.replica_id, "replicas": list(self.replicas)}
+
+
+coordinator = ReplicaCoordinator()
@@ -0,0 +1,267 @@
+import json
+import time
+import uuid
+import random
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set
+
+import websockets
+from sqlalchemy import select
+
+from common.deps.session import SessionLocal
+from common.deps.config import CoreFetchSettings
+from common.models.exchanges import Exchange, ExchangeSymbol
+from core_fetch.app.services.adapters import ExchangeAdapter, get_adapter
+from core_fetch.app.services.price_writer import price_writer, PriceTick
+from core_fetch.app.services.sharding import coordinator
+
+settings = CoreFetchSettings()
+log = logging.getLogger(__name__)
+
+
+class StreamConnection:
+    """
+    Одне WS-з'єднання з біржею, що мультиплексує групу символів.
+    Падіння → reconnect з експоненційним backoff + jitter і повторна підписка.
+    URL береться з Exchange.ws_public_url, тож для тестів його можна направити
+    на локальний websocket stand-in сервер (див. core_fetch/tests/test_streaming.py).
+    """
+
+    def __init__(self, adapter: ExchangeAdapter, exchange_id: uuid.UUID, url: str,
+                 symbols: Dict[str, uuid.UUID], name: str):
+        self.adapter = adapter
+        self.exchange_id = exchange_id
+        self.url = url
+        # {stream key → ExchangeSymbol.id}
+        self.symbols = symbols
+        self.name = name
+        self.last_message_at: Optional[float] = None
+        self.connected = False
+        self.reconnects = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected = False
+
+    async def _run(self) -> None:
+        backoff = settings.STREAM_RECONNECT_MIN_SEC
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, max_queue=None) as ws:
+                    for msg in self.adapter.subscribe_messages(list(self.symbols.keys())):
+                        await ws.send(json.dumps(msg))
+                    self.connected = True
+                    backoff = settings.STREAM_RECONNECT_MIN_SEC
+                    log.info(f"📡 {self.name} connected: {len(self.symbols)} symbols")
+
+                    async for raw in ws:
+                        self.last_message_at = time.monotonic()
+                        await self._handle(raw)
+
+                log.warning(f"⚠️ {self.name} closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.warning(f"⚠️ {self.name} error: {e}")
+
+            self.connected = False
+            self.reconnects += 1
+            delay = backoff * (0.5 + random.random())
+            log.info(f"🔁 {self.name} reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, settings.STREAM_RECONNECT_MAX_SEC)
+
+    async def _handle(self, raw) -> None:
+        try:
+            prices = self.adapter.parse_stream_message(json.loads(raw))
+        except Exception as e:
+            log.debug(f"{self.name}: unparsable message ({e}): {str(raw)[:200]}")
+            return
+        if not prices:
+            return
+
+        ts = datetime.now(timezone.utc)
+        ticks = [
+            PriceTick(timestamp=ts, exchange_id=self.exchange_id, symbol_id=self.symbols[key], price=price)
+            for key, price in prices.items()
+            if key in self.symbols
+        ]
+        # той самий шлях запису, що й у REST-фетчерів
+        await price_writer.submit_many(ticks)
+
+    def is_healthy(self) -> bool:
+        return (
+            self.connected
+            and self.last_message_at is not None
+            and time.monotonic() - self.last_message_at < settings.STREAM_STALE_SEC
+        )
+
+
+class StreamManager:
+    """
+    Тримає WS-з'єднання для всіх бірж з ws_public_url і адаптером, що підтримує streaming.
+    Символи біржі розкладені по з'єднаннях стабільно: при зміні набору перепідключаються
+    лише з'єднання, чий шматок змінився, решта стрімить далі.
+
+    Обсяг запису: miniTicker по всіх TRADING символах — ~1 тик на символ за секунду.
+    Тому з STREAMING_ENABLED deadband за замовчуванням tick (1 × tick_size) з heartbeat
+    PRICE_DEADBAND_HEARTBEAT_SEC, і в price_history потрапляють лише зміни ціни;
+    з PRICE_DEADBAND_MODE=off це ~86 400 рядків на символ за добу.
+    """
+
+    def __init__(self):
+        self.connections: Dict[uuid.UUID, List[StreamConnection]] = {}
+        # лічильник імен з'єднань біржі (ws_<CODE>_<n>)
+        self._conn_seq: Dict[uuid.UUID, int] = {}
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if not settings.STREAMING_ENABLED:
+            log.info("ℹ️ Streaming price ingestion disabled (STREAMING_ENABLED=false)")
+            return
+        self._sync_task = asyncio.create_task(self._sync_loop(), name="stream_sync")
+        # після ребалансу шардів — одразу перепідписатись на свою частку символів
+        coordinator.add_listener(self.sync)
+
+    async def stop(self) -> None:
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+            try:
+                await self._sync_task
+            except asyncio.CancelledError:
+                pass
+            self._sync_task = None
+        for exchange_id in list(self.connections):
+            await self._stop_exchange(exchange_id)
+
+    async def _sync_loop(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                log.exception(f"❌ Stream sync failed: {e}")
+            await asyncio.sleep(settings.STREAM_SYMBOL_SYNC_SEC)
+
+    async def sync(self) -> None:
+        """Звіряє активний набір символів з відкритими з'єднаннями."""
+        async with SessionLocal() as session:
+            res = await session.execute(
+                select(Exchange).where(Exchange.is_active == True, Exchange.ws_public_url.is_not(None))
+            )
+            exchanges = res.scalars().all()
+
+            wanted: Dict[uuid.UUID, tuple] = {}
+            for ex in exchanges:
+                adapter = get_adapter(ex.code)
+                if adapter is None or not adapter.capabilities.websocket:
+                    continue
+                res = await session.execute(
+                    select(ExchangeSymbol.symbol_id, ExchangeSymbol.symbol, ExchangeSymbol.id)
+                    .where(ExchangeSymbol.exchange_id == ex.id, ExchangeSymbol.status == "TRADING")
+                )
+                symbols = {
+                    adapter.stream_key(symbol_id, symbol): sym_uuid
+                    for symbol_id, symbol, sym_uuid in res.all()
+                    if coordinator.owns_symbol(ex.id, symbol_id)
+                }
+                wanted[ex.id] = (ex, adapter, symbols)
+
+        for exchange_id in list(self.connections):
+            if exchange_id not in wanted:
+                await self._stop_exchange(exchange_id)
+
+        for ex, adapter, symbols in wanted.values():
+            await self.apply(ex, adapter, symbols)
+
+    async def apply(self, ex: Exchange, adapter: ExchangeAdapter, symbols: Dict[str, uuid.UUID]) -> None:
+        """
+        Приводить з'єднання біржі до набору symbols {stream key → ExchangeSymbol.id}.
+        Зниклі символи вибувають зі своїх шматків, нові доливаються в шматки, що й так
+        змінюються, далі — в неповні, далі — в нові з'єднання; перезапускаються лише змінені.
+        """
+        url = adapter.stream_url(ex.ws_public_url)
+        per_conn = adapter.capabilities.max_streams_per_connection or max(len(symbols), 1)
+        current = self.connections.get(ex.id, [])
+        if any(conn.url != url for conn in current):
+            # змінився ws_public_url — перепідключаємо все
+            await self._stop_exchange(ex.id)
+            current = []
+
+        chunks = [{k: v for k, v in conn.symbols.items() if symbols.get(k) == v} for conn in current]
+        placed = {k for chunk in chunks for k in chunk}
+        fresh = [k for k in symbols if k not in placed]
+        changed = [chunk != conn.symbols for chunk, conn in zip(chunks, current)]
+        # спершу шматки, які перезапускаються в будь-якому разі
+        for i in sorted(range(len(chunks)), key=lambda i: not changed[i]):
+            while fresh and len(chunks[i]) < per_conn:
+                k = fresh.pop()
+                chunks[i][k] = symbols[k]
+                changed[i] = True
+        while fresh:
+            chunk = {k: symbols[k] for k in fresh[:per_conn]}
+            fresh = fresh[per_conn:]
+            chunks.append(chunk)
+            changed.append(True)
+
+        conns, restarted = [], 0
+        for i, chunk in enumerate(chunks):
+            old = current[i] if i < len(current) else None
+            if not changed[i]:
+                conns.append(old)
+                continue
+            if old is not None:
+                await old.stop()
+            if not chunk:
+                continue
+            conns.append(self._open(ex, adapter, url, chunk))
+            restarted += 1
+
+        if conns:
+            self.connections[ex.id] = conns
+        else:
+            self.connections.pop(ex.id, None)
+        if restarted:
+            log.info(
+                f"📡 Streaming {len(symbols)} {ex.code} symbols over {len(conns)} connections "
+                f"({restarted} (re)started)"
+            )
+
+    def _open(self, ex: Exchange, adapter: ExchangeAdapter, url: str, chunk: Dict[str, uuid.UUID]) -> StreamConnection:
+        seq = self._conn_seq.get(ex.id, 0)
+        self._conn_seq[ex.id] = seq + 1
+        conn = StreamConnection(adapter, ex.id, url, chunk, name=f"ws_{ex.code}_{seq}")
+        conn.start()
+        return conn
+
+    async def _stop_exchange(self, exchange_id: uuid.UUID) -> None:
+        for conn in self.connections.pop(exchange_id, []):
+            await conn.stop()
+
+    def is_healthy(self, exchange_id: uuid.UUID) -> bool:
+        """True, якщо всі з'єднання біржі живі й отримують дані — тоді REST-полінг можна пропустити."""
+        conns = self.connections.get(exchange_id)
+        return bool(conns) and all(c.is_healthy() for c in conns)
+
+    def streamed_symbols(self, exchange_id: uuid.UUID) -> Set[uuid.UUID]:
+        """ExchangeSymbol.id, ціни яких зараз надходять через живі з'єднання."""
+        return {
+            sym_uuid
+            for conn in self.connections.get(exchange_id, [])
+            if conn.is_healthy()
+            for sym_uuid in conn.symbols.values()
+        }
+
+
+stream_manager = StreamManager()
@@ -2,15 +2,21 @@ import uuid
 import logging
 from decimal import Decimal
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 
-import httpx
-from sqlalchemy import select, update
+from sqlalchemy import select, update, or_, literal_column
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import func
 
 from common.deps.session import SessionLocal
+from common.deps.clients import get_http_client
+from common.deps.config import CoreFetchSettings
+from common.utils.symbol_cache import symbol_cache
+from core_fetch.app.services import rate_limiter
+from core_fetch.app.services.adapters import require_adapter
+from core_fetch.app.services.price_writer import price_writer, PriceTick
+from core_fetch.app.services.backfill import backfill_engine
 from common.models import (
     Exchange,
     ExchangeSymbol,
@@ -18,8 +24,8 @@ from common.models import (
     ExchangeStatusHistory,
     ExchangeFee,
 )
-from common.models.markethistory import PriceHistory
 
+settings = CoreFetchSettings()
 log = logging.getLogger(__name__)
 
 # =========================
@@ -32,67 +38,147 @@ async def fetch_and_store_price(exchange: str, symbol: str) -> None:
     Saves PriceHistory.symbol as UUID (FK -> exchange_symbols.id).
     """
     ex_code = exchange.upper()
+    adapter = require_adapter(ex_code)
 
     # 1) отримуємо ціну
-    price: Optional[float] = None
-    if ex_code == "BINANCE":
-        url = f"https://api.binance.com/api/v3/ticker/price?symbol={symbol}"
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-            price = float(data["price"])
-
-    elif ex_code == "KRAKEN":
-        url = f"https://api.kraken.com/0/public/Ticker?pair={symbol}"
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-            data = resp.json()
-            result = data.get("result", {})
-            if not result:
-                raise ValueError(f"No ticker data for {symbol} from Kraken")
-            ticker = list(result.values())[0]
-            price = float(ticker["c"][0])  # last trade price
-
-    else:
-        raise ValueError(f"fetch_and_store_price not implemented for {exchange}")
-
+    price: Optional[float] = await adapter.fetch_price(get_http_client(ex_code), symbol)
     if price is None:
         raise ValueError(f"No price received for {exchange}:{symbol}")
 
-    # 2) пишемо у PriceHistory
+    # 2) ставимо у чергу write-behind запису PriceHistory
     async with SessionLocal() as session:
-        # lookup exchange_id
-        exch = await session.execute(
-            select(Exchange.id).where(Exchange.code == ex_code)
-        )
-        exchange_id = exch.scalar_one_or_none()
+        # lookup exchange_id / symbol UUID (in-memory кеш, БД лише на промах)
+        exchange_id = await symbol_cache.get_exchange_id(session, ex_code)
         if not exchange_id:
             raise ValueError(f"Exchange {exchange} not found in DB")
 
-        # lookup symbol UUID
-        sym = await session.execute(
-            select(ExchangeSymbol.id).where(
-                ExchangeSymbol.exchange_id == exchange_id,
-                ExchangeSymbol.symbol_id == symbol,
-            )
-        )
-        symbol_uuid = sym.scalar_one_or_none()
+        symbol_uuid = await symbol_cache.get_symbol_uuid(session, exchange_id, symbol)
         if not symbol_uuid:
             raise ValueError(f"Symbol {symbol} not found in DB for {exchange}")
 
-        session.add(
-            PriceHistory(
-                timestamp=datetime.now(timezone.utc),
-                exchange_id=exchange_id,
-                symbol_id=symbol_uuid,
-                price=price,
-            )
+    await price_writer.submit(
+        PriceTick(
+            timestamp=datetime.now(timezone.utc),
+            exchange_id=exchange_id,
+            symbol_id=symbol_uuid,
+            price=price,
+        )
+    )
+
+    log.debug(f"💾 Queued price {symbol}={price} ({exchange})")
+# =========================
+# fetch_and_store_prices_bulk
+# =========================
+async def fetch_and_store_prices_bulk(
+    exchange: str,
+    exchange_id: uuid.UUID,
+    symbols: Dict[str, uuid.UUID],
+    errors: Optional[Dict[str, str]] = None,
+) -> Tuple[int, List[str]]:
+    """
+    Bulk price mode: one exchange snapshot → one batch of ticks for the PriceHistory writer.
+    `symbols` maps exchange symbol code → ExchangeSymbol.id (already loaded by the caller).
+    Returns (stored count, list of symbol codes without a price in the snapshot);
+    pairs the exchange explicitly rejected are also added to `errors` as {code: exchange error}.
+    """
+    ex_code = exchange.upper()
+    prices = await require_adapter(ex_code).fetch_prices_bulk(get_http_client(ex_code), list(symbols.keys()), errors)
+
+    ts = datetime.now(timezone.utc)
+    ticks = [
+        PriceTick(
+            timestamp=ts,
+            exchange_id=exchange_id,
+            symbol_id=symbol_uuid,
+            price=prices[code],
+        )
+        for code, symbol_uuid in symbols.items()
+        if code in prices
+    ]
+    missing = [code for code in symbols if code not in prices]
+
+    await price_writer.submit_many(ticks)
+
+    log.debug(f"💾 Queued {len(ticks)} prices in bulk ({exchange}), {len(missing)} missing")
+    return len(ticks), missing
+# =========================
+# set-based upsert exchange_symbols
+# =========================
+# asyncpg має ліміт 32767 параметрів на запит; ~17 колонок × 1000 рядків вкладається
+SYMBOL_UPSERT_CHUNK_SIZE = 1000
+SYMBOL_KEY_FIELDS = ("exchange_id", "symbol_id")
+DELISTED_STATUS = "DELISTED"
+
+
+async def upsert_symbols(
+    session: AsyncSession,
+    exchange_id: uuid.UUID,
+    symbols: List[Dict[str, Any]],
+    added_symbols: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """
+    Multi-row INSERT ... ON CONFLICT DO UPDATE чанками.
+    Рядок оновлюється (і fetched_at зсувається) лише якщо хоч одне поле IS DISTINCT FROM
+    нового значення — незмінені символи не переписуються, що не роздуває таблицю та індекси.
+    Повертає {"added", "changed", "unchanged"}; біржові symbol_id нових символів дописуються в added_symbols.
+    """
+    # дублікати в одному INSERT ... ON CONFLICT дають помилку "cannot affect row a second time"
+    rows = list({sym["symbol_id"]: sym for sym in symbols}.values())
+    added = changed = 0
+
+    for i in range(0, len(rows), SYMBOL_UPSERT_CHUNK_SIZE):
+        chunk = rows[i:i + SYMBOL_UPSERT_CHUNK_SIZE]
+        content_fields = [k for k in chunk[0] if k not in SYMBOL_KEY_FIELDS]
+
+        stmt = insert(ExchangeSymbol).values(chunk)
+        table = ExchangeSymbol.__table__
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(SYMBOL_KEY_FIELDS),
+            set_={
+                **{k: stmt.excluded[k] for k in content_fields},
+                "fetched_at": func.now(),
+            },
+            where=or_(*[table.c[k].is_distinct_from(stmt.excluded[k]) for k in content_fields]),
+        ).returning(literal_column("(xmax = 0)").label("inserted"), ExchangeSymbol.symbol_id)
+
+        res = await session.execute(stmt)
+        for inserted, symbol_id in res.all():
+            if inserted:
+                added += 1
+                if added_symbols is not None:
+                    added_symbols.append(symbol_id)
+            else:
+                changed += 1
+
+    return {"added": added, "changed": changed, "unchanged": len(rows) - added - changed}
+
+
+async def mark_delisted_symbols(session: AsyncSession, exchange_id: uuid.UUID, listed: set) -> int:
+    """
+    Символи біржі, яких немає в новому знімку, помічаються як неактивні (без видалення).
+    listed — усі символи знімка, зокрема не TRADING: пауза торгів (BREAK / HALT) — не делістинг.
+    """
+    if not listed:
+        # порожній знімок — скоріше збій біржі, ніж делістинг усього
+        return 0
+    res = await session.execute(
+        update(ExchangeSymbol)
+        .where(
+            ExchangeSymbol.exchange_id == exchange_id,
+            ExchangeSymbol.is_active == True,
+            ExchangeSymbol.type != "service",
+            ExchangeSymbol.symbol_id.not_in(listed),
         )
-        await session.commit()
+        .values(is_active=False, status=DELISTED_STATUS, fetched_at=func.now())
+    )
+    return res.rowcount or 0
+
 
-    log.debug(f"💾 Stored price {symbol}={price} ({exchange})")
+def _format_symbol_counts(counts: Dict[str, int]) -> str:
+    return (
+        f"symbols: {counts['added']} added, {counts['changed']} changed, "
+        f"{counts['unchanged']} unchanged, {counts.get('delisted', 0)} delisted"
+    )
 # =========================
 # refresh_symbols
 # =========================
@@ -102,112 +188,19 @@ async def refresh_symbols(client: Dict[str, Any], exchange_id: uuid.UUID) -> Non
     Uniqueness: (exchange_id, symbol_id [exchange-level string ID]).
     """
     log.info(f"🔄 [START] refresh_symbols for {client['exchange_code']}")
-    symbols: List[Dict[str, Any]] = []
 
     try:
         ex_code = client["exchange_code"].upper()
 
-        # ---- Binance ----
-        if ex_code == "BINANCE":
-            url = "/api/v3/exchangeInfo"
-            resp = await client["http"].get(url)
-            data = resp.json()
-
-            for s in data.get("symbols", []):
-                if s.get("status") != "TRADING":
-                    continue
-
-                filters = {f["filterType"]: f for f in s.get("filters", [])}
-
-                min_notional = None
-                max_notional = None
-                if "MIN_NOTIONAL" in filters:
-                    min_notional = filters["MIN_NOTIONAL"].get("minNotional")
-                elif "NOTIONAL" in filters:
-                    min_notional = filters["NOTIONAL"].get("minNotional")
-                    max_notional = filters["NOTIONAL"].get("maxNotional")
-
-                sym_row = dict(
-                    exchange_id=exchange_id,
-                    symbol_id=s["symbol"],                           # біржовий рядковий ID (e.g. "BTCUSDT")
-                    symbol=f"{s['baseAsset']}/{s['quoteAsset']}",    # людиночитний
-                    base_asset=s["baseAsset"],
-                    quote_asset=s["quoteAsset"],
-                    status=s["status"],
-                    type="spot",
-                    base_precision=s.get("baseAssetPrecision"),
-                    quote_precision=s.get("quotePrecision"),
-                    step_size=filters.get("LOT_SIZE", {}).get("stepSize"),
-                    tick_size=filters.get("PRICE_FILTER", {}).get("tickSize"),
-                    min_qty=filters.get("LOT_SIZE", {}).get("minQty"),
-                    max_qty=filters.get("LOT_SIZE", {}).get("maxQty"),
-                    min_notional=min_notional,
-                    max_notional=max_notional,
-                    filters=s.get("filters", []),
-                )
-                symbols.append(sym_row)
-
-        # ---- Kraken ----
-        elif ex_code == "KRAKEN":
-            url = "/0/public/AssetPairs"
-            resp = await client["http"].get(url)
-            data = resp.json()
-
-            for key, s in data.get("result", {}).items():
-                lot_decimals = int(s.get("lot_decimals", 0))
-                pair_decimals = int(s.get("pair_decimals", lot_decimals))
-
-                # Numeric-типи бажано як Decimal/str (сумісно з Numeric у моделі)
-                step_size: Optional[str] = None
-                tick_size: Optional[str] = None
-                if lot_decimals:
-                    step_size = f"1e-{lot_decimals}"
-                if pair_decimals:
-                    tick_size = f"1e-{pair_decimals}"
-
-                min_qty = s.get("ordermin")
-                min_qty = str(Decimal(min_qty)) if min_qty else None
-
-                sym_row = dict(
-                    exchange_id=exchange_id,
-                    symbol_id=key,                                      # біржовий рядковий ID Kraken (e.g. "XXBTZUSD")
-                    symbol=s.get("wsname") or s.get("altname") or key,  # людиночитний
-                    base_asset=s.get("base"),
-                    quote_asset=s.get("quote"),
-                    status="TRADING",
-                    type="spot",
-                    base_precision=s.get("pair_decimals"),
-                    quote_precision=s.get("lot_decimals"),
-                    step_size=step_size,
-                    tick_size=tick_size,
-                    min_qty=min_qty,
-                    max_qty=None,
-                    min_notional=None,
-                    max_notional=None,
-                    filters=s,
-                )
-                symbols.append(sym_row)
-
-        else:
-            log.warning(f"❌ refresh_symbols не реалізовано для {client['exchange_code']}")
-            return
+        symbols = await require_adapter(ex_code).fetch_symbols(client["http"], exchange_id)
 
         # ---- Upsert into DB ----
+        added_symbols: List[str] = []
         async with SessionLocal() as session:
-            for sym in symbols:
-                # не оновлюємо ключі у set_: exchange_id, symbol_id
-                set_fields = {k: v for k, v in sym.items() if k not in ("exchange_id", "symbol_id")}
-                set_fields["fetched_at"] = func.now()
-
-                stmt = (
-                    insert(ExchangeSymbol)
-                    .values(**sym)
-                    .on_conflict_do_update(
-                        index_elements=["exchange_id", "symbol_id"],
-                        set_=set_fields,
-                    )
-                )
-                await session.execute(stmt)
+            counts = await upsert_symbols(session, exchange_id, symbols, added_symbols)
+            counts["delisted"] = await mark_delisted_symbols(
+                session, exchange_id, {sym["symbol_id"] for sym in symbols}
+            )
 
             await session.execute(
                 update(Exchange)
@@ -223,13 +216,22 @@ async def refresh_symbols(client: Dict[str, Any], exchange_id: uuid.UUID) -> Non
                     exchange_id=exchange_id,
                     event="symbols_refresh",
                     status="ok",
-                    message=f"{len(symbols)} symbols оновлено/додано",
+                    message=_format_symbol_counts(counts),
                 )
             )
 
             await session.commit()
 
-        log.info(f"✅ [DONE] {len(symbols)} symbols оновлено/додано")
+            # нові/змінені символи одразу доступні для запису цін
+            if counts["added"] or counts["changed"] or counts["delisted"]:
+                await symbol_cache.refresh_exchange(session, exchange_id)
+
+        log.info(f"✅ [DONE] refresh_symbols {client['exchange_code']}: {_format_symbol_counts(counts)}")
+
+        # нові символи не чекають днями на історію — свічки підтягуються з klines біржі
+        if settings.BACKFILL_NEW_SYMBOLS and added_symbols:
+            run_id = backfill_engine.submit(ex_code, symbols=added_symbols)
+            log.info(f"📚 Backfill {run_id} queued for {len(added_symbols)} new {ex_code} symbols")
 
     except Exception as e:
         log.exception(f"❌ refresh_symbols error: {e}")
@@ -257,34 +259,7 @@ async def refresh_limits(client: Dict[str, Any], exchange_id: uuid.UUID) -> None
     try:
         ex_code = client["exchange_code"].upper()
 
-        if ex_code == "BINANCE":
-            url = "/api/v3/exchangeInfo"
-            resp = await client["http"].get(url)
-            data = resp.json()
-
-            for rl in data.get("rateLimits", []):
-                limits.append(
-                    dict(
-                        exchange_id=exchange_id,
-                        limit_type=rl["rateLimitType"],
-                        interval_unit=rl["interval"],
-                        interval_num=rl["intervalNum"],
-                        limit=rl["limit"],
-                        raw_json=rl,
-                    )
-                )
-
-        elif ex_code == "KRAKEN":
-            limits.append(
-                dict(
-                    exchange_id=exchange_id,
-                    limit_type="REQUEST_WEIGHT",
-                    interval_unit="SECOND",
-                    interval_num=1,
-                    limit=15,
-                    raw_json={"docs": "https://support.kraken.com/..."},
-                )
-            )
+        limits = await require_adapter(ex_code).fetch_limits(client["http"], exchange_id)
 
         async with SessionLocal() as session:
             for lim in limits:
@@ -326,6 +301,7 @@ async def refresh_limits(client: Dict[str, Any], exchange_id: uuid.UUID) -> None
 
             await session.commit()
 
+        rate_limiter.invalidate_bucket(ex_code)
         log.info(f"✅ [DONE] {len(limits)} limits оновлено/додано")
 
     except Exception as e:
@@ -361,131 +337,66 @@ async def refresh_fees(client: Dict[str, Any], exchange_id: uuid.UUID) -> None:
 
         ex_code = client["exchange_code"].upper()
 
-        # ---------------- BINANCE ----------------
-        if ex_code == "BINANCE":
-            url = "/api/v3/account"
-            resp = await client["http"].get(url)
-            data = resp.json()
-            maker = float(data.get("makerCommission", 10)) / 10000
-            taker = float(data.get("takerCommission", 10)) / 10000
+        adapter = require_adapter(ex_code)
+        tiers = await adapter.fetch_fees(client["http"])
 
-            if use_service:
-                async with SessionLocal() as session:
-                    service_id = await ensure_service_symbol(session, exchange_id)
+        per_symbol = [t for t in tiers if t.symbol_id is not None]
+        global_tiers = [t for t in tiers if t.symbol_id is None]
+
+        # ---------------- PER-SYMBOL (Kraken) ----------------
+        symbol_map: Dict[str, uuid.UUID] = {}
+        if per_symbol:
+            async with SessionLocal() as session:
+                # 1) мапа symbol_id → uuid одним запитом
+                symbol_map = await _load_symbol_map(session, exchange_id)
+
+                # 2) відсутні символи створюємо одним batch upsert (метадані вже в кеші)
+                missing = {t.symbol_id for t in per_symbol} - symbol_map.keys()
+                if missing:
+                    rows = [r for r in await adapter.fetch_symbols(client["http"], exchange_id)
+                            if r["symbol_id"] in missing]
+                    await upsert_symbols(session, exchange_id, rows)
+                    symbol_map = await _load_symbol_map(session, exchange_id)
                     await session.commit()
+                    await symbol_cache.refresh_exchange(session, exchange_id)
+
+            for t in per_symbol:
+                symbol_uuid = symbol_map.get(t.symbol_id)
+                if not symbol_uuid:
+                    continue
                 fees_to_insert.append(
                     dict(
                         exchange_id=exchange_id,
-                        symbol_id=service_id,
-                        volume_threshold=Decimal(0),
-                        maker_fee=Decimal(maker),
-                        taker_fee=Decimal(taker),
+                        symbol_id=symbol_uuid,
+                        volume_threshold=t.volume_threshold,
+                        maker_fee=t.maker_fee,
+                        taker_fee=t.taker_fee,
                     )
                 )
-            else:
-                # логіка як у Kraken: можна робити на всі символи (але Binance не віддає fees по символах)
-                # тоді залишаємо один запис з symbol_id=None (fallback)
+
+        # ---------------- EXCHANGE-WIDE (Binance) ----------------
+        if global_tiers:
+            # use_service_symbol → пишемо в сервісний символ, інакше symbol_id=None (fallback)
+            service_id = None
+            if use_service:
+                async with SessionLocal() as session:
+                    service_id = await ensure_service_symbol(session, exchange_id)
+                    await session.commit()
+
+            for t in global_tiers:
                 fees_to_insert.append(
                     dict(
                         exchange_id=exchange_id,
-                        symbol_id=None,
-                        volume_threshold=Decimal(0),
-                        maker_fee=Decimal(maker),
-                        taker_fee=Decimal(taker),
+                        symbol_id=service_id,
+                        volume_threshold=t.volume_threshold,
+                        maker_fee=t.maker_fee,
+                        taker_fee=t.taker_fee,
                     )
                 )
 
-        # ---------------- KRAKEN ----------------
-        elif ex_code == "KRAKEN":
-            url = "/0/public/AssetPairs"
-            resp = await client["http"].get(url)
-            data = resp.json()
-
-            async with SessionLocal() as session:
-                for key, s in data.get("result", {}).items():
-                    symbol_obj = await session.execute(
-                        select(ExchangeSymbol.id).where(
-                            ExchangeSymbol.exchange_id == exchange_id,
-                            ExchangeSymbol.symbol_id == key,
-                        )
-                    )
-                    symbol_uuid = symbol_obj.scalar_one_or_none()
-
-                    if not symbol_uuid:
-                        # створюємо символ якщо немає
-                        lot_decimals = int(s.get("lot_decimals", 0))
-                        pair_decimals = int(s.get("pair_decimals", lot_decimals))
-                        step_size = f"1e-{lot_decimals}" if lot_decimals else None
-                        tick_size = f"1e-{pair_decimals}" if pair_decimals else None
-                        min_qty = s.get("ordermin")
-                        min_qty = str(Decimal(min_qty)) if min_qty else None
-
-                        new_symbol = dict(
-                            exchange_id=exchange_id,
-                            symbol_id=key,
-                            symbol=s.get("wsname") or s.get("altname") or key,
-                            base_asset=s.get("base"),
-                            quote_asset=s.get("quote"),
-                            status="TRADING",
-                            type="spot",
-                            base_precision=s.get("pair_decimals"),
-                            quote_precision=s.get("lot_decimals"),
-                            step_size=step_size,
-                            tick_size=tick_size,
-                            min_qty=min_qty,
-                            max_qty=None,
-                            min_notional=None,
-                            max_notional=None,
-                            filters=s,
-                        )
-
-                        stmt = (
-                            insert(ExchangeSymbol)
-                            .values(**new_symbol)
-                            .on_conflict_do_update(
-                                index_elements=["exchange_id", "symbol_id"],
-                                set_={**{k: v for k, v in new_symbol.items() if k not in ("exchange_id", "symbol_id")},
-                                      "fetched_at": func.now()}
-                            )
-                            .returning(ExchangeSymbol.id)
-                        )
-                        res = await session.execute(stmt)
-                        symbol_uuid = res.scalar_one()
-
-                    fees = s.get("fees", [])
-                    fees_maker = s.get("fees_maker", [])
-
-                    for idx, level in enumerate(fees):
-                        volume, taker = level
-                        maker = fees_maker[idx][1] if idx < len(fees_maker) else None
-
-                        fees_to_insert.append(
-                            dict(
-                                exchange_id=exchange_id,
-                                symbol_id=symbol_uuid,
-                                volume_threshold=Decimal(volume),
-                                maker_fee=Decimal(maker) if maker is not None else None,
-                                taker_fee=Decimal(taker),
-                            )
-                        )
-
         # ---------------- SAVE ----------------
         async with SessionLocal() as session:
-            for fee in fees_to_insert:
-                stmt = (
-                    insert(ExchangeFee)
-                    .values(**fee)
-                    .on_conflict_do_update(
-                        index_elements=["exchange_id", "symbol_id", "volume_threshold"],
-                        set_={
-                            "volume_threshold": fee["volume_threshold"],
-                            "maker_fee": fee["maker_fee"],
-                            "taker_fee": fee["taker_fee"],
-                            "fetched_at": func.now(),
-                        },
-                    )
-                )
-                await session.execute(stmt)
+            await upsert_fees(session, fees_to_insert)
 
             await session.execute(
                 update(Exchange).where(Exchange.id == exchange_id).values(
@@ -519,6 +430,34 @@ async def refresh_fees(client: Dict[str, Any], exchange_id: uuid.UUID) -> None:
             )
             await session.commit()
 
+# 5 параметрів на рядок → 5000 рядків на запит у межах ліміту asyncpg
+FEE_UPSERT_CHUNK_SIZE = 5000
+
+
+async def upsert_fees(session: AsyncSession, fees: List[Dict[str, Any]]) -> None:
+    """Усі fee tiers одним (чанкованим) multi-row upsert."""
+    # у межах одного INSERT ... ON CONFLICT ключ має бути унікальним
+    rows = list({(f["symbol_id"], f["volume_threshold"]): f for f in fees}.values())
+    for i in range(0, len(rows), FEE_UPSERT_CHUNK_SIZE):
+        stmt = insert(ExchangeFee).values(rows[i:i + FEE_UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["exchange_id", "symbol_id", "volume_threshold"],
+            set_={
+                "maker_fee": stmt.excluded.maker_fee,
+                "taker_fee": stmt.excluded.taker_fee,
+                "fetched_at": func.now(),
+            },
+        )
+        await session.execute(stmt)
+
+
+async def _load_symbol_map(session: AsyncSession, exchange_id: uuid.UUID) -> Dict[str, uuid.UUID]:
+    res = await session.execute(
+        select(ExchangeSymbol.symbol_id, ExchangeSymbol.id).where(ExchangeSymbol.exchange_id == exchange_id)
+    )
+    return {symbol_id: sym_uuid for symbol_id, sym_uuid in res.all()}
+
+
 async def ensure_service_symbol(session: AsyncSession, exchange_id: uuid.UUID) -> uuid.UUID:
     """Знаходить або створює сервісний символ (__SERVICE__) для біржі."""
     res = await session.execute(
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# тести запускаються з services/: python -m pytest core_fetch/tests
+SERVICES_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+if SERVICES_DIR not in sys.path:
+    sys.path.insert(0, SERVICES_DIR)
@@ -0,0 +1,86 @@
+"""
+Локальний fake-сервер klines API: Binance /api/v3/klines і Kraken /0/public/OHLC
+з детермінованими свічками для будь-якого символу.
+
+У тестах — через httpx.ASGITransport(app=FakeExchange().app); для CLI — окремим процесом:
+
+    python -m core_fetch.tests.fake_exchange --port 8081
+    python -m core_fetch.app.cli backfill --exchange BINANCE --days 7 --base-url http://localhost:8081
+"""
+import asyncio
+import argparse
+from typing import List, Optional, Tuple
+
+from fastapi import FastAPI
+
+BINANCE_INTERVALS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "8h": 28800, "12h": 43200,
+    "1d": 86400, "3d": 259200, "1w": 604800,
+}
+# як і справжній OHLC: не більше 720 свічок на відповідь
+KRAKEN_MAX_CANDLES = 720
+
+
+def candle(open_time: int, seconds: int) -> Tuple[str, str, str, str, str]:
+    """(open, high, low, close, volume) свічки, що залежить лише від її open_time."""
+    base = 100 + (open_time // seconds) % 50
+    return str(base), str(base + 2), str(base - 1), str(base + 1), "10"
+
+
+class FakeExchange:
+    """
+    Віддає свічки і записує кожен запит як (exchange, symbol, start у секундах).
+    stall_after=N — після N відповідей наступні запити зависають (імітація обриву запуску),
+    stalled виставляється, коли перший з них прийшов.
+    """
+
+    def __init__(self, stall_after: Optional[int] = None):
+        self.stall_after = stall_after
+        self.requests: List[Tuple[str, str, int]] = []
+        self.served = 0
+        self.stalled = asyncio.Event()
+        self.app = FastAPI()
+        self.app.get("/api/v3/klines")(self.binance_klines)
+        self.app.get("/0/public/OHLC")(self.kraken_ohlc)
+
+    async def _gate(self, exchange: str, symbol: str, start: int) -> None:
+        self.requests.append((exchange, symbol, start))
+        if self.stall_after is not None and self.served >= self.stall_after:
+            self.stalled.set()
+            await asyncio.Future()
+        self.served += 1
+
+    async def binance_klines(self, symbol: str, interval: str, startTime: int, endTime: int, limit: int = 500):
+        seconds = BINANCE_INTERVALS[interval]
+        first = -(-startTime // 1000 // seconds) * seconds
+        await self._gate("BINANCE", symbol, first)
+        rows = []
+        for open_time in range(first, endTime // 1000 + 1, seconds)[:limit]:
+            o, h, l, c, v = candle(open_time, seconds)
+            rows.append([open_time * 1000, o, h, l, c, v, (open_time + seconds) * 1000 - 1])
+        return rows
+
+    async def kraken_ohlc(self, pair: str, interval: int, since: int = 0):
+        seconds = interval * 60
+        first = (since // seconds + 1) * seconds
+        await self._gate("KRAKEN", pair, first)
+        rows = []
+        for open_time in range(first, first + seconds * KRAKEN_MAX_CANDLES, seconds):
+            o, h, l, c, v = candle(open_time, seconds)
+            rows.append([open_time, o, h, l, c, c, v, 1])
+        return {"error": [], "result": {pair: rows, "last": rows[-1][0]}}
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(prog="fake_exchange")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    uvicorn.run(FakeExchange().app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
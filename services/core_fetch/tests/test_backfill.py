@@ -0,0 +1,100 @@
+"""
+BackfillEngine проти fake-сервера klines (fake_exchange): запуск обривається посеред діапазону,
+наступний продовжує з watermark у backfill_checkpoints без повторного завантаження свічок.
+Сховище — у пам'яті замість price_candles / backfill_checkpoints.
+"""
+import uuid
+import asyncio
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from core_fetch.app.services import backfill, rate_limiter
+from core_fetch.app.services.adapters import require_adapter
+from core_fetch.tests.fake_exchange import FakeExchange
+
+START = datetime(2026, 1, 1, tzinfo=timezone.utc)
+END = START + timedelta(days=4)
+PER_REQUEST = 24
+
+
+class MemoryBackfill(backfill.BackfillEngine):
+    """BackfillEngine, чиї checkpoint-и і свічки живуть у спільному dict-сховищі."""
+
+    def __init__(self, store: SimpleNamespace):
+        super().__init__()
+        self.store = store
+
+    async def _load_targets(self, ex_code, symbols, timeframes):
+        store = self.store
+        return store.exchange, [("1h", 1.0, None)], [(store.symbol_uuid, store.symbol)]
+
+    async def _load_checkpoints(self, symbol_ids, timeframes):
+        return {key: SimpleNamespace(**cp) for key, cp in self.store.checkpoints.items()}
+
+    async def _start_checkpoints(self, exchange_id, pairs):
+        for p in pairs:
+            self.store.checkpoints[(p.symbol_id, p.timeframe)] = dict(
+                symbol_id=p.symbol_id, timeframe=p.timeframe, range_start=p.range_start,
+                range_end=p.range_end, watermark=p.resume_from, status=backfill.RUNNING,
+            )
+
+    async def _store_chunk(self, pair, rows, watermark):
+        cp = self.store.checkpoints[(pair.symbol_id, pair.timeframe)]
+        self.store.writes.update(row["bucket_start"] for row in rows)
+        cp["watermark"] = max(cp["watermark"], watermark)
+
+    async def _finish(self, pairs):
+        for pair in pairs:
+            cp = self.store.checkpoints[(pair.symbol_id, pair.timeframe)]
+            cp["watermark"] = max(cp["watermark"], pair.watermark())
+            cp["status"] = backfill.DONE if len(pair.done) == pair.chunks else backfill.ERROR
+
+
+@pytest.mark.parametrize("exchange_code, symbol", [("BINANCE", "BTCUSDT"), ("KRAKEN", "XBTUSD")])
+def test_interrupted_backfill_resumes_from_watermark(monkeypatch, exchange_code, symbol):
+    adapter = require_adapter(exchange_code)
+    monkeypatch.setattr(adapter, "capabilities", replace(adapter.capabilities, klines_max_per_request=PER_REQUEST))
+    # один чанк за раз — обрив припадає рівно на третій запит
+    monkeypatch.setattr(backfill.settings, "BACKFILL_CONCURRENCY", 1)
+    monkeypatch.setitem(rate_limiter._buckets, exchange_code, rate_limiter.build_bucket(exchange_code, [], None))
+
+    async def scenario():
+        store = SimpleNamespace(
+            exchange=SimpleNamespace(id=uuid.uuid4(), code=exchange_code),
+            symbol_uuid=uuid.uuid4(), symbol=symbol, checkpoints={}, writes=Counter(),
+        )
+        key = (store.symbol_uuid, "1h")
+        fake = FakeExchange(stall_after=2)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=fake.app), base_url="http://fake") as http:
+            first = asyncio.create_task(MemoryBackfill(store).run(exchange_code, start=START, end=END, http=http))
+            await asyncio.wait_for(fake.stalled.wait(), 5)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+            watermark = START + timedelta(hours=2 * PER_REQUEST)
+            assert store.checkpoints[key]["watermark"] == watermark
+            assert store.checkpoints[key]["status"] == backfill.RUNNING
+            assert len(store.writes) == 2 * PER_REQUEST
+
+            fake.stall_after = None
+            resumed_from = len(fake.requests)
+            state = await MemoryBackfill(store).run(exchange_code, start=START, end=END, http=http)
+
+        assert state["status"] == backfill.DONE
+        assert state["chunks"] == 2
+        # перший запит нового запуску — з watermark, а не з початку діапазону
+        assert fake.requests[resumed_from] == (exchange_code, symbol, int(watermark.timestamp()))
+        assert store.checkpoints[key]["watermark"] == END
+        assert store.checkpoints[key]["status"] == backfill.DONE
+        # кожна свічка [START, END) записана рівно один раз за обидва запуски
+        expected = {START + timedelta(hours=h) for h in range(int((END - START) / timedelta(hours=1)))}
+        assert set(store.writes) == expected
+        assert max(store.writes.values()) == 1
+
+    asyncio.run(scenario())
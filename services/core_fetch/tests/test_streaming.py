@@ -0,0 +1,163 @@
+"""
+StreamManager / StreamConnection проти локального websocket stand-in сервера
+(той самий протокол, що й Binance miniTicker: SUBSCRIBE-фрейми, події 24hrMiniTicker).
+"""
+import json
+import uuid
+import asyncio
+from dataclasses import replace
+from types import SimpleNamespace
+
+import websockets
+
+from core_fetch.app.services import streaming
+from core_fetch.app.services.adapters.binance import BinanceAdapter
+from core_fetch.app.services.price_writer import price_writer
+
+
+class StandInServer:
+    """Приймає SUBSCRIBE і шле по тику на кожен підписаний символ; першу сесію кожного символу рве."""
+
+    def __init__(self, drop_after: float = 0.1):
+        # кожне прийняте з'єднання → множина підписаних символів
+        self.sessions = []
+        self.drop_after = drop_after
+        self._dropped = set()
+        self._server = None
+
+    async def __aenter__(self):
+        self._server = await websockets.serve(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"ws://{host}:{port}"
+
+    async def _handle(self, ws):
+        subscribed = set()
+        self.sessions.append(subscribed)
+        dropper = None
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                if msg.get("method") != "SUBSCRIBE":
+                    continue
+                symbols = [stream.split("@")[0].upper() for stream in msg["params"]]
+                subscribed.update(symbols)
+                await ws.send(json.dumps({"result": None, "id": msg["id"]}))
+                for symbol in symbols:
+                    await ws.send(json.dumps({"e": "24hrMiniTicker", "s": symbol, "c": "101.5"}))
+                if dropper is None:
+                    # усі SUBSCRIBE-фрейми сесії приходять одразу після connect
+                    dropper = asyncio.create_task(self._drop_first(ws, subscribed))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if dropper is not None:
+                await dropper
+
+    async def _drop_first(self, ws, subscribed):
+        await asyncio.sleep(self.drop_after)
+        if not subscribed & self._dropped:
+            self._dropped.update(subscribed)
+            await ws.close()
+
+
+def _adapter(per_conn: int, per_subscribe: int) -> BinanceAdapter:
+    adapter = BinanceAdapter()
+    adapter.capabilities = replace(
+        adapter.capabilities, max_streams_per_connection=per_conn, max_streams_per_subscribe=per_subscribe,
+    )
+    return adapter
+
+
+def _symbols(*keys):
+    return {k: uuid.uuid4() for k in keys}
+
+
+async def _wait_for(predicate, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_stream_multiplexes_delivers_ticks_and_resubscribes(monkeypatch):
+    monkeypatch.setattr(streaming.settings, "STREAM_RECONNECT_MIN_SEC", 0.01)
+    monkeypatch.setattr(streaming.settings, "STREAM_RECONNECT_MAX_SEC", 0.05)
+    ticks = []
+
+    async def scenario():
+        async with StandInServer() as server:
+            ex = SimpleNamespace(id=uuid.uuid4(), code="BINANCE", ws_public_url=server.url)
+            symbols = _symbols("BTCUSDT", "ETHUSDT", "SOLUSDT", "XRPUSDT", "ADAUSDT")
+            manager = streaming.StreamManager()
+            await manager.apply(ex, _adapter(per_conn=2, per_subscribe=1), symbols)
+            conns = manager.connections[ex.id]
+            chunks = [frozenset(c.symbols) for c in conns]
+            try:
+                # кожен шматок: обірване перше з'єднання + перепідключене
+                await _wait_for(lambda: len(server.sessions) >= 2 * len(conns)
+                                and all(c.connected for c in conns))
+                await _wait_for(lambda: {t.symbol_id for t in ticks} == set(symbols.values()))
+            finally:
+                await manager._stop_exchange(ex.id)
+
+            # 5 символів по 2 на з'єднання → 3 з'єднання, шматки не перетинаються
+            assert len(conns) == 3
+            assert sorted(len(c) for c in chunks) == [1, 2, 2]
+            assert frozenset().union(*chunks) == frozenset(symbols)
+            # кожна сесія підписалась рівно на свій шматок, і кожен шматок — двічі (resubscribe)
+            assert all(frozenset(s) in chunks for s in server.sessions)
+            for chunk in chunks:
+                assert [frozenset(s) for s in server.sessions].count(chunk) >= 2
+            assert all(c.reconnects >= 1 for c in conns)
+            assert all(t.exchange_id == ex.id and t.price == 101.5 for t in ticks)
+
+    price_writer.add_listener(ticks.append)
+    try:
+        asyncio.run(scenario())
+    finally:
+        price_writer._listeners.remove(ticks.append)
+
+
+def test_apply_restarts_only_changed_connections(monkeypatch):
+    started = []
+    monkeypatch.setattr(streaming.StreamConnection, "start", lambda self: started.append(self.name))
+
+    async def scenario():
+        ex = SimpleNamespace(id=uuid.uuid4(), code="BINANCE", ws_public_url="ws://stand-in")
+        adapter = _adapter(per_conn=2, per_subscribe=2)
+        manager = streaming.StreamManager()
+        symbols = _symbols("A", "B", "C", "D", "E")
+        await manager.apply(ex, adapter, symbols)
+        before = list(manager.connections[ex.id])
+
+        # той самий набір — нічого не перезапускається
+        started.clear()
+        await manager.apply(ex, adapter, dict(symbols))
+        assert manager.connections[ex.id] == before and started == []
+
+        # новий символ доливається в неповне з'єднання, повні стрімлять далі
+        symbols["F"] = uuid.uuid4()
+        await manager.apply(ex, adapter, symbols)
+        after = manager.connections[ex.id]
+        assert len(started) == 1
+        assert sum(c in before for c in after) == 2
+        assert frozenset().union(*(c.symbols for c in after)) == frozenset(symbols)
+
+        # видалення символу перезапускає лише його з'єднання
+        started.clear()
+        owner = next(c for c in after if "A" in c.symbols)
+        del symbols["A"]
+        await manager.apply(ex, adapter, symbols)
+        assert len(started) == 1
+        assert owner not in manager.connections[ex.id]
+        assert sum(c in after for c in manager.connections[ex.id]) == 2
+
+    asyncio.run(scenario())
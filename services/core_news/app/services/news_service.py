@@ -3,7 +3,8 @@ import httpx
 import uuid
 import os
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List
+from decimal import Decimal
+from typing import Optional, List, Tuple
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
 
 from sqlalchemy import select, func
@@ -12,9 +13,9 @@ import sqlalchemy as sa
 import datetime as dt
 
 from common.models.markethistory import NewsSentiment, PriceHistory
-from common.models.exchanges import ExchangeSymbol
 from common.deps.config import CoreNewsSettings
 from common.utils.config_resolver import ConfigResolver
+from common.utils.symbol_cache import symbol_cache
 
 # === дефолти з BaseSettings ===
 settings = CoreNewsSettings()
@@ -121,16 +122,8 @@ def detect_symbol_from_news(title: str, summary: str, KEYWORD_TO_SYMBOL: dict) -
 async def get_symbol_id_by_code(session: AsyncSession, symbol_code: str) -> str | None:
     base, _, quote = symbol_code.partition("/")
     if not quote:
-        q = (
-            select(ExchangeSymbol.id)
-            .where(ExchangeSymbol.symbol.like(f"{base}/USDT"))
-            .limit(1)
-        )
-    else:
-        q = select(ExchangeSymbol.id).where(ExchangeSymbol.symbol == symbol_code).limit(1)
-
-    res = await session.execute(q)
-    return res.scalar_one_or_none()
+        symbol_code = f"{base}/USDT"
+    return await symbol_cache.get_symbol_uuid_by_display(session, symbol_code)
 
 async def save_news_to_db(news_items: List[dict], session: AsyncSession) -> None:
     """Зберігає новини у NewsSentiment (idempotent по published_at + title)."""
@@ -175,24 +168,47 @@ async def save_news_to_db(news_items: List[dict], session: AsyncSession) -> None
     await session.commit()
     log.info("✅ Inserted %s news into DB (with symbols)", inserted_count)
 
-async def _get_price_at(session: AsyncSession, symbol_id: uuid.UUID, target_ts: datetime, before: bool = False) -> Optional[float]:
-    """Отримати найближчу ціну до часу target_ts."""
-    if before:
-        q = (
-            select(PriceHistory.price)
-            .where(PriceHistory.symbol_id == symbol_id, PriceHistory.timestamp <= target_ts)
-            .order_by(PriceHistory.timestamp.desc())
-            .limit(1)
-        )
-    else:
-        q = (
+PRICE_LOOKUP_CHUNK = 2000
+
+
+async def _get_prices_at(
+    session: AsyncSession, points: List[Tuple[uuid.UUID, datetime]], before: bool = False
+) -> List[Optional[Decimal]]:
+    """
+    Найближчі ціни для багатьох (symbol_id, час) одним запитом на чанк:
+    VALUES з точками + корельований LIMIT 1, який іде index-only scan-ом
+    по (symbol_id, timestamp DESC) INCLUDE (price). Пошук обмежено вікном
+    NEWS_PRICE_LOOKUP_WINDOW_HOURS, щоб відсікались зайві партиції.
+    """
+    window = timedelta(hours=settings.NEWS_PRICE_LOOKUP_WINDOW_HOURS)
+    prices: List[Optional[Decimal]] = [None] * len(points)
+    for offset in range(0, len(points), PRICE_LOOKUP_CHUNK):
+        chunk = points[offset:offset + PRICE_LOOKUP_CHUNK]
+        pts = sa.values(
+            sa.column("idx", sa.Integer),
+            sa.column("symbol_id", PriceHistory.symbol_id.type),
+            sa.column("ts", PriceHistory.timestamp.type),
+            name="pts",
+        ).data([(offset + i, symbol_id, ts) for i, (symbol_id, ts) in enumerate(chunk)])
+
+        if before:
+            bounds = (PriceHistory.timestamp <= pts.c.ts, PriceHistory.timestamp > pts.c.ts - window)
+            order = PriceHistory.timestamp.desc()
+        else:
+            bounds = (PriceHistory.timestamp >= pts.c.ts, PriceHistory.timestamp < pts.c.ts + window)
+            order = PriceHistory.timestamp.asc()
+        nearest = (
             select(PriceHistory.price)
-            .where(PriceHistory.symbol_id == symbol_id, PriceHistory.timestamp >= target_ts)
-            .order_by(PriceHistory.timestamp.asc())
+            .where(PriceHistory.symbol_id == pts.c.symbol_id, *bounds)
+            .order_by(order)
             .limit(1)
+            .correlate(pts)
+            .scalar_subquery()
         )
-    res = await session.execute(q)
-    return res.scalar_one_or_none()
+        res = await session.execute(select(pts.c.idx, nearest))
+        for idx, price in res.all():
+            prices[idx] = price
+    return prices
 
 async def update_news_prices(session: AsyncSession) -> None:
     """Проставляє ціни до/після для новин останніх 2 днів і прораховує % зміни."""
@@ -200,17 +216,18 @@ async def update_news_prices(session: AsyncSession) -> None:
 
     q = select(NewsSentiment).where(NewsSentiment.published_at >= now - dt.timedelta(days=2))
     results = (await session.execute(q)).scalars().all()
+    priced = [news for news in results if news.symbol_id]
 
-    for news in results:
-        if not news.symbol_id:
-            continue
-
-        ts = news.published_at
+    # усі точки циклу — двома батч-запитами замість чотирьох запитів на новину
+    before = await _get_prices_at(session, [(n.symbol_id, n.published_at) for n in priced], before=True)
+    after = await _get_prices_at(
+        session,
+        [(n.symbol_id, n.published_at + dt.timedelta(hours=h)) for n in priced for h in (1, 6, 24)],
+    )
 
-        price_before = await _get_price_at(session, news.symbol_id, ts, before=True)
-        price_after_1h = await _get_price_at(session, news.symbol_id, ts + dt.timedelta(hours=1))
-        price_after_6h = await _get_price_at(session, news.symbol_id, ts + dt.timedelta(hours=6))
-        price_after_24h = await _get_price_at(session, news.symbol_id, ts + dt.timedelta(hours=24))
+    for i, news in enumerate(priced):
+        price_before = before[i]
+        price_after_1h, price_after_6h, price_after_24h = after[3 * i:3 * i + 3]
 
         news.price_before = price_before
         news.price_after_1h = price_after_1h
@@ -1,3 +1,4 @@
+import re
 import sys
 import os
 from logging.config import fileConfig
@@ -24,6 +25,19 @@ if config.config_file_name is not None:
 # Метадані для автогенерації
 target_metadata = Base.metadata
 
+# Партиції price_history (legacy, default, pYYYYMM[DD]) створює міграція 7c2e4a9d1f30
+# і PartitionManager core_fetch, а не моделі — autogenerate не повинен їх видаляти
+PARTITION_TABLE = re.compile(r"^price_history_(legacy|default|p\d{6}(\d{2})?)$")
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    if type_ == "table":
+        return not PARTITION_TABLE.match(name)
+    # індекси партицій (автоіменовані, attached до індексів price_history, та legacy-ні)
+    if type_ in ("index", "unique_constraint") and obj.table is not None:
+        return not PARTITION_TABLE.match(obj.table.name)
+    return True
+
 
 def run_migrations_offline():
     """Run migrations in 'offline' mode."""
@@ -35,6 +49,7 @@ def run_migrations_offline():
         dialect_opts={"paramstyle": "named"},
         compare_type=True,
         compare_server_default=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -55,6 +70,7 @@ def run_migrations_online():
             target_metadata=target_metadata,
             compare_type=True,
             compare_server_default=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
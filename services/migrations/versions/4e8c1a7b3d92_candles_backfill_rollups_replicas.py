@@ -0,0 +1,122 @@
+"""price_candles, price_rollups, backfill_checkpoints, retention_watermarks, core_fetch_replicas
+
+Revision ID: 4e8c1a7b3d92
+Revises: 9b41d6e2c8a5
+Create Date: 2026-10-18 14:00:00
+
+Таблиці core_fetch: свічки живої агрегації й бекфілу klines, тири tiered retention,
+прогрес бекфілу по (символ, таймфрейм), watermark згортки сирих тиків і lease-рядки
+реплік для шардування. Схема збігається з моделями common.models.markethistory / scheduler.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '4e8c1a7b3d92'
+down_revision = '9b41d6e2c8a5'
+branch_labels = None
+depends_on = None
+
+
+def _symbol_fk():
+    return sa.Column(
+        "symbol_id", postgresql.UUID(as_uuid=True),
+        sa.ForeignKey("exchange_symbols.id", ondelete="CASCADE"), nullable=False,
+    )
+
+
+def _exchange_fk():
+    return sa.Column(
+        "exchange_id", postgresql.UUID(as_uuid=True),
+        sa.ForeignKey("exchanges.id", ondelete="CASCADE"), nullable=False,
+    )
+
+
+def _ohlc():
+    return [
+        sa.Column("open", sa.Numeric(18, 8), nullable=False),
+        sa.Column("high", sa.Numeric(18, 8), nullable=False),
+        sa.Column("low", sa.Numeric(18, 8), nullable=False),
+        sa.Column("close", sa.Numeric(18, 8), nullable=False),
+    ]
+
+
+def _tick_bounds():
+    return [
+        sa.Column("tick_count", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("first_tick_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("last_tick_at", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "price_candles",
+        _symbol_fk(),
+        sa.Column("timeframe", sa.Text(), nullable=False),
+        sa.Column("bucket_start", sa.TIMESTAMP(timezone=True), nullable=False),
+        _exchange_fk(),
+        *_ohlc(),
+        sa.Column("volume", sa.Numeric(28, 8), nullable=True),
+        *_tick_bounds(),
+        sa.PrimaryKeyConstraint("symbol_id", "timeframe", "bucket_start"),
+    )
+
+    op.create_table(
+        "price_rollups",
+        _symbol_fk(),
+        sa.Column("tier", sa.Text(), nullable=False),
+        sa.Column("bucket_start", sa.TIMESTAMP(timezone=True), nullable=False),
+        _exchange_fk(),
+        *_ohlc(),
+        *_tick_bounds(),
+        sa.PrimaryKeyConstraint("symbol_id", "tier", "bucket_start"),
+    )
+    op.create_index("ix_price_rollups_tier_bucket_start", "price_rollups", ["tier", "bucket_start"])
+
+    op.create_table(
+        "backfill_checkpoints",
+        _symbol_fk(),
+        sa.Column("timeframe", sa.Text(), nullable=False),
+        _exchange_fk(),
+        sa.Column("range_start", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("range_end", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("watermark", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("status", sa.Text(), server_default=sa.text("'pending'"), nullable=False),
+        sa.Column("candles_loaded", sa.BigInteger(), server_default=sa.text("0"), nullable=False),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("symbol_id", "timeframe"),
+    )
+    op.create_index("ix_backfill_checkpoints_exchange_id", "backfill_checkpoints", ["exchange_id"])
+
+    op.create_table(
+        "retention_watermarks",
+        sa.Column("source", sa.Text(), nullable=False),
+        sa.Column("rolled_until", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+    op.create_table(
+        "core_fetch_replicas",
+        sa.Column("replica_id", sa.String(191), nullable=False),
+        sa.Column("hostname", sa.String(255), nullable=True),
+        sa.Column("started_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("heartbeat_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("replica_id"),
+    )
+    op.create_index("ix_core_fetch_replicas_heartbeat_at", "core_fetch_replicas", ["heartbeat_at"])
+
+
+def downgrade():
+    op.drop_index("ix_core_fetch_replicas_heartbeat_at", table_name="core_fetch_replicas")
+    op.drop_table("core_fetch_replicas")
+    op.drop_table("retention_watermarks")
+    op.drop_index("ix_backfill_checkpoints_exchange_id", table_name="backfill_checkpoints")
+    op.drop_table("backfill_checkpoints")
+    op.drop_index("ix_price_rollups_tier_bucket_start", table_name="price_rollups")
+    op.drop_table("price_rollups")
+    op.drop_table("price_candles")
@@ -0,0 +1,96 @@
+"""partition price_history by range on timestamp
+
+Revision ID: 7c2e4a9d1f30
+Revises:
+Create Date: 2026-10-18 12:00:00
+
+Існуюча таблиця не копіюється: вона перейменовується в price_history_legacy і приєднується
+до нового партиційованого price_history як партиція FROM (MINVALUE) TO (cutover), де cutover —
+наступна північ UTC після найновішого тику. Єдиний повний прохід по старих даних — побудова
+unique-індексу (id, timestamp) і перевірка межі партиції під час ATTACH.
+
+Ревізія створює лише legacy і default партиції й не залежить від env оболонки, що запускає
+alembic: партиції періодів (day / month, PRICE_HISTORY_PARTITION) створює PartitionManager
+core_fetch при старті, підрізаючи першу по cutover, і переносить у неї рядки, що встигли
+потрапити в default. Retention прибирає legacy-партицію цілком, коли cutover стане старшим
+за PRICE_HISTORY_RETENTION_DAYS.
+
+Автогенерація не бачить партиціювання, тож ревізія написана вручну.
+"""
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '7c2e4a9d1f30'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXED = ("exchange_id", "symbol_id", "timestamp")
+
+
+def _next_midnight(ts: datetime) -> datetime:
+    ts = ts.astimezone(timezone.utc)
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # ---- стара таблиця → legacy ----
+    op.execute("ALTER TABLE price_history RENAME TO price_history_legacy")
+    op.execute("ALTER TABLE price_history_legacy RENAME CONSTRAINT price_history_pkey TO price_history_legacy_pkey")
+    for col in INDEXED:
+        op.execute(f"ALTER INDEX IF EXISTS ix_price_history_{col} RENAME TO ix_price_history_legacy_{col}")
+
+    # ---- партиційований батько ----
+    op.execute("""
+        CREATE TABLE price_history (
+            id BIGINT NOT NULL DEFAULT nextval('price_history_id_seq'),
+            exchange_id UUID NOT NULL REFERENCES exchanges (id) ON DELETE CASCADE,
+            symbol_id UUID NOT NULL REFERENCES exchange_symbols (id) ON DELETE CASCADE,
+            price NUMERIC(18, 8) NOT NULL,
+            "timestamp" TIMESTAMPTZ NOT NULL DEFAULT now(),
+            CONSTRAINT price_history_pkey PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id")
+    for col in INDEXED:
+        op.execute(f'CREATE INDEX ix_price_history_{col} ON price_history ("{col}")')
+
+    # ---- legacy як одна партиція до cutover ----
+    now = datetime.now(timezone.utc)
+    max_ts = bind.execute(sa.text('SELECT max("timestamp") FROM price_history_legacy')).scalar()
+    cutover = _next_midnight(max(now, max_ts) if max_ts else now)
+    # FK і індекси exchange_id/symbol_id/timestamp legacy вже має — ATTACH їх перевикористає
+    op.execute('CREATE UNIQUE INDEX price_history_legacy_id_timestamp ON price_history_legacy (id, "timestamp")')
+    op.execute(
+        f"ALTER TABLE price_history ATTACH PARTITION price_history_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')"
+    )
+
+    # ---- default до першого запуску PartitionManager ----
+    op.execute("CREATE TABLE price_history_default PARTITION OF price_history DEFAULT")
+
+
+def downgrade():
+    # зворотно — звичайна heap-таблиця; дані копіюються, тож на великих обсягах це довго
+    op.execute("CREATE TABLE price_history_flat (LIKE price_history INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO price_history_flat SELECT * FROM price_history")
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY NONE")
+    op.execute("DROP TABLE price_history")
+    op.execute("ALTER TABLE price_history_flat RENAME TO price_history")
+    op.execute("ALTER TABLE price_history ADD CONSTRAINT price_history_pkey PRIMARY KEY (id)")
+    op.execute("ALTER SEQUENCE price_history_id_seq OWNED BY price_history.id")
+    op.execute(
+        "ALTER TABLE price_history ADD CONSTRAINT price_history_exchange_id_fkey "
+        "FOREIGN KEY (exchange_id) REFERENCES exchanges (id) ON DELETE CASCADE"
+    )
+    op.execute(
+        "ALTER TABLE price_history ADD CONSTRAINT price_history_symbol_id_fkey "
+        "FOREIGN KEY (symbol_id) REFERENCES exchange_symbols (id) ON DELETE CASCADE"
+    )
+    for col in INDEXED:
+        op.execute(f'CREATE INDEX ix_price_history_{col} ON price_history ("{col}")')
@@ -0,0 +1,66 @@
+"""price_history: (symbol_id, timestamp DESC) INCLUDE (price) and BRIN on timestamp
+
+Revision ID: 9b41d6e2c8a5
+Revises: 7c2e4a9d1f30
+Create Date: 2026-10-18 13:00:00
+
+Індекс на партиційованій таблиці не можна будувати CONCURRENTLY, тому батьківський індекс
+створюється ON ONLY (невалідний), індекс кожної партиції — CONCURRENTLY без блокування
+запису, і далі приєднується через ATTACH PARTITION; батьківський стає валідним, коли
+приєднано всі. Нові партиції PartitionManager отримують індекси автоматично.
+
+Одноколонкові ix_price_history_symbol_id (покривається композитним) і
+ix_price_history_timestamp (замінено BRIN) видаляються. ix_price_history_exchange_id
+лишається — на ньому тримається ON DELETE CASCADE від exchanges.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '9b41d6e2c8a5'
+down_revision = '7c2e4a9d1f30'
+branch_labels = None
+depends_on = None
+
+COMPOSITE = "ix_price_history_symbol_id_timestamp"
+BRIN = "ix_price_history_timestamp_brin"
+
+
+def _partitions():
+    res = op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'price_history'"
+    ))
+    return [row[0] for row in res.all()]
+
+
+def upgrade():
+    partitions = _partitions()
+
+    op.execute(f'CREATE INDEX IF NOT EXISTS {COMPOSITE} ON ONLY price_history (symbol_id, "timestamp" DESC) INCLUDE (price)')
+    op.execute(f'CREATE INDEX IF NOT EXISTS {BRIN} ON ONLY price_history USING brin ("timestamp") WITH (pages_per_range = 32)')
+
+    with op.get_context().autocommit_block():
+        for part in partitions:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {part}_symbol_id_timestamp_idx '
+                f'ON {part} (symbol_id, "timestamp" DESC) INCLUDE (price)'
+            )
+            op.execute(f"ALTER INDEX {COMPOSITE} ATTACH PARTITION {part}_symbol_id_timestamp_idx")
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {part}_timestamp_brin '
+                f'ON {part} USING brin ("timestamp") WITH (pages_per_range = 32)'
+            )
+            op.execute(f"ALTER INDEX {BRIN} ATTACH PARTITION {part}_timestamp_brin")
+
+    op.execute("DROP INDEX IF EXISTS ix_price_history_symbol_id")
+    op.execute("DROP INDEX IF EXISTS ix_price_history_timestamp")
+
+
+def downgrade():
+    op.execute('CREATE INDEX IF NOT EXISTS ix_price_history_symbol_id ON price_history (symbol_id)')
+    op.execute('CREATE INDEX IF NOT EXISTS ix_price_history_timestamp ON price_history ("timestamp")')
+    op.execute(f"DROP INDEX IF EXISTS {BRIN}")
+    op.execute(f"DROP INDEX IF EXISTS {COMPOSITE}")